@@ -0,0 +1,2 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
@@ -0,0 +1,68 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import random
+import timeit
+
+from src.area_codes.area_index import AreaIndex
+
+"""
+AreaIndex 與線性掃描 AREA_CODES 的查詢效能比較
+
+    python -m benchmarks.bench_area_index
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def linear_by_zip_code(area_codes: dict, zip_code: str) -> list:
+    return [v for v in area_codes.values() if v["zip_code"] == zip_code]
+
+
+def linear_by_geo_code(area_codes: dict, geo_code_103: str) -> dict | None:
+    for v in area_codes.values():
+        if v["geo_code_103"] == geo_code_103:
+            return v
+    return None
+
+
+def linear_by_name(area_codes: dict, name: str) -> dict | None:
+    for v in area_codes.values():
+        if v["area_name"] == name or v["area_name_en"] == name:
+            return v
+    return None
+
+
+def main(number: int = 20000) -> None:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+
+    build_time = timeit.timeit(lambda: AreaIndex(area_codes), number=100) / 100
+    index = AreaIndex(area_codes)
+    print(f"build index: {build_time * 1e6:.1f} us")
+
+    rng = random.Random(0)
+    areas = list(area_codes.values())
+    zips = [rng.choice(areas)["zip_code"] for _ in range(number)]
+    geos = [rng.choice(areas)["geo_code_103"] for _ in range(number)]
+    names = [rng.choice(areas)["area_name"] for _ in range(number)]
+
+    cases = [
+        ("zip_code", lambda: [linear_by_zip_code(area_codes, z) for z in zips],
+         lambda: [index.get_by_zip_code(z) for z in zips]),
+        ("geo_code_103", lambda: [linear_by_geo_code(area_codes, g) for g in geos],
+         lambda: [index.get_by_geo_code(g) for g in geos]),
+        ("area_name", lambda: [linear_by_name(area_codes, n) for n in names],
+         lambda: [index.get_by_name(n) for n in names]),
+    ]
+
+    print(f"{'lookup':<14}{'linear (us/op)':>16}{'index (us/op)':>16}{'speedup':>10}")
+    for name, linear, indexed in cases:
+        t_linear = min(timeit.repeat(linear, number=1, repeat=3)) / number
+        t_index = min(timeit.repeat(indexed, number=1, repeat=3)) / number
+        print(f"{name:<14}{t_linear * 1e6:>16.3f}{t_index * 1e6:>16.3f}{t_linear / t_index:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
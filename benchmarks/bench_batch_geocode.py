@@ -0,0 +1,54 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import csv
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+
+from src.area_codes.batch_geocode import geocode_file
+from src.area_codes.reverse_geocode import ReverseGeocoder, haversine
+
+"""
+批次反查 CSV 的吞吐量 (rows/s)，與逐筆以 Python 計算全部 371 個中心點距離的比較
+
+    python -m benchmarks.bench_batch_geocode
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def write_points(file_path: str, count: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(21.9, 25.3, count).round(6)
+    lngs = rng.uniform(120.0, 122.0, count).round(6)
+    with open(file_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "latitude", "longitude", "value"])
+        writer.writerows((i, lat, lng, i % 97) for i, (lat, lng) in enumerate(zip(lats.tolist(), lngs.tolist())))
+
+
+def main(count: int = 1_000_000, naive_count: int = 2_000) -> None:
+    geocoder = ReverseGeocoder.from_json(AREA_CODES_JSON)
+    points = list(zip(geocoder.latitudes.tolist(), geocoder.longitudes.tolist()))
+    rng = np.random.default_rng(1)
+    sample = zip(rng.uniform(21.9, 25.3, naive_count).tolist(), rng.uniform(120.0, 122.0, naive_count).tolist())
+    start = time.perf_counter()
+    for lat, lng in sample:
+        min(range(len(points)), key=lambda i: haversine(lat, lng, *points[i]))
+    print(f"per-point Python over all centroids: {naive_count / (time.perf_counter() - start):,.0f} rows/s")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "points.csv")
+        write_points(input_path, count)
+        print(f"input: {count:,} rows, {os.path.getsize(input_path) / 2 ** 20:.1f} MB")
+        for workers in sorted({0, min(4, os.cpu_count() or 1)}):
+            stats = geocode_file(input_path, os.path.join(tmp_dir, "out.csv"), AREA_CODES_JSON, workers=workers)
+            print(f"geocode_file workers={workers}: {stats['rows_per_second']:,.0f} rows/s")
+    print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
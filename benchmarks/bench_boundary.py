@@ -0,0 +1,74 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import time
+
+import numpy as np
+
+from src.area_codes.boundary import BoundaryGeocoder, points_in_ring
+
+"""
+BoundaryGeocoder 批次查詢與逐一比對所有 polygon 的效能比較
+
+沒有實際的界線檔時，以每個行政區中心點為圓心產生 64 邊形作為合成界線
+
+    python -m benchmarks.bench_boundary
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def synthetic_boundaries(area_codes: dict, radius: float = 0.03, sides: int = 64) -> dict[str, list[np.ndarray]]:
+    angles = np.linspace(0, 2 * np.pi, sides, endpoint=False)
+    return {a["geo_code_103"]: [np.column_stack([a["longitude"] + radius * np.cos(angles),
+                                                 a["latitude"] + radius * np.sin(angles)])]
+            for a in area_codes.values() if a["geo_code_103"]}
+
+
+def brute_force(geocoder: BoundaryGeocoder, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    indices = np.full(lat.size, -1, dtype=np.intp)
+    for ring, area in zip(geocoder._rings, geocoder._ring_areas):
+        inside = points_in_ring(ring, lng, lat) & (indices < 0)
+        indices[inside] = area
+    return indices
+
+
+def main(n_points: int = 1_000_000, n_brute: int = 20_000) -> None:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+
+    start = time.perf_counter()
+    geocoder = BoundaryGeocoder(area_codes, synthetic_boundaries(area_codes))
+    print(f"build: {(time.perf_counter() - start) * 1e3:.1f} ms, {len(geocoder.tree)} rings, "
+          f"{len(geocoder.tree.levels)} levels")
+
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(21.9, 25.3, n_points)
+    lng = rng.uniform(120.0, 122.0, n_points)
+
+    start = time.perf_counter()
+    indices, inside = geocoder.query(lat, lng)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = brute_force(geocoder, lat[:n_brute], lng[:n_brute])
+    brute_time = time.perf_counter() - start
+    hit = expected >= 0
+    assert np.array_equal(inside[:n_brute], hit)
+    assert np.array_equal(indices[:n_brute][hit], expected[hit])
+
+    start = time.perf_counter()
+    for i in range(1000):
+        geocoder.locate(lat[i], lng[i])
+    single_time = (time.perf_counter() - start) / 1000
+
+    print(f"{n_points:,} points, {inside.mean() * 100:.1f}% inside a polygon")
+    print(f"{'method':<34}{'points/s':>14}")
+    print(f"{'brute force (all rings)':<34}{n_brute / brute_time:>14,.0f}")
+    print(f"{'BoundaryGeocoder.query':<34}{n_points / batch_time:>14,.0f}")
+    print(f"{'BoundaryGeocoder.locate':<34}{1 / single_time:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
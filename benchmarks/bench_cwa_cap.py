@@ -0,0 +1,80 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import random
+import time
+
+from src.area_codes.cwa_cap import CwaCAP
+
+"""
+CwaCAP 與巢狀迴圈展開 CAP 警報 geocode 的效能比較
+
+合成警報串流：70% 為 1~20 個鄉鎮、25% 為 1~5 個縣市、5% 為全台所有縣市
+
+    python -m benchmarks.bench_cwa_cap
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def nested_loops(area_codes: dict, geocodes: list[str]) -> tuple[set, set]:
+    zip_codes, geo_codes = set(), set()
+    for geocode in geocodes:
+        for area in area_codes.values():
+            if area["geo_code_103"] and geocode in (area["geo_code_103"], area["county_geo_code_103"]):
+                zip_codes.add(area["zip_code"])
+                geo_codes.add(area["geo_code_103"])
+    return zip_codes, geo_codes
+
+
+def alert_stream(area_codes: dict, count: int, seed: int = 0) -> list[list[str]]:
+    rng = random.Random(seed)
+    townships = sorted({a["geo_code_103"] for a in area_codes.values()} - {""})
+    counties = sorted({a["county_geo_code_103"] for a in area_codes.values()} - {""})
+    alerts = []
+    for _ in range(count):
+        r = rng.random()
+        if r < 0.7:
+            alerts.append(rng.sample(townships, rng.randint(1, 20)))
+        elif r < 0.95:
+            alerts.append(rng.sample(counties, rng.randint(1, 5)))
+        else:
+            alerts.append(list(counties))
+    return alerts
+
+
+def main(count: int = 20000) -> None:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+    alerts = alert_stream(area_codes, count)
+
+    start = time.perf_counter()
+    cap = CwaCAP(area_codes)
+    print(f"build: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+    start = time.perf_counter()
+    expected = [nested_loops(area_codes, geocodes) for geocodes in alerts]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = cap.resolve_batch(alerts)
+    cap_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    masks = [cap.mask(geocodes)[0] for geocodes in alerts]
+    mask_time = time.perf_counter() - start
+
+    assert all(set(r.zip_codes) == z and set(r.geo_codes) == g for r, (z, g) in zip(results, expected))
+    assert all(r.mask == m for r, m in zip(results, masks))
+
+    everywhere = [a for a in alerts if len(a) > 20]
+    print(f"{count:,} alerts ({len(everywhere):,} covering all of Taiwan)")
+    print(f"{'method':<32}{'total ms':>12}{'us/alert':>12}")
+    for name, t in (("nested loops", loop_time), ("CwaCAP.resolve_batch", cap_time), ("CwaCAP.mask only", mask_time)):
+        print(f"{name:<32}{t * 1e3:>12.1f}{t / count * 1e6:>12.2f}")
+    print(f"speedup: {loop_time / cap_time:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
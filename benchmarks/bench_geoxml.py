@@ -0,0 +1,79 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import os
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+import xmltodict
+
+from src.area_codes.convert import fetch_geoxml, iter_geoxml
+
+"""
+fetch_geoxml() (iterparse 單次解析) 與原本 ET.fromstring + xmltodict 兩次解析的比較
+
+除了內附的 371 筆 `行政區經緯度` 檔案外，另以相同資料重複 scale 倍產生較大的 XML，
+量測時間與 tracemalloc 的記憶體峰值
+
+    python -m benchmarks.bench_geoxml
+"""
+
+GEOXML = os.path.join(os.path.dirname(__file__), "..", "tests", "test_area_codes", "1050812_行政區經緯度(toPost).xml")
+RECORD_TAG = "_x0031_050429_行政區經緯度_x0028_toPost_x0029_"
+
+
+def legacy_fetch_geoxml(file_path: str) -> list:
+    with open(file_path, "r", encoding="utf-8") as input_file:
+        content = input_file.read()
+    xml_root = ET.fromstring(content)
+    ns = xml_root.tag[xml_root.tag.find("{") + 1: xml_root.tag.find("}")] if xml_root.tag.startswith("{") else ""
+    root_dict = xmltodict.parse(content, process_namespaces=True, namespaces={ns: None})
+    return sorted(root_dict.get("dataroot", {}).get(RECORD_TAG, []), key=lambda x: x['_x0033_碼郵遞區號'])
+
+
+def scaled_geoxml(scale: int, out_path: str) -> None:
+    with open(GEOXML, "r", encoding="utf-8") as input_file:
+        content = input_file.read()
+    head, rest = content.split(f"<{RECORD_TAG}>", 1)
+    body, tail = rest.rsplit(f"</{RECORD_TAG}>", 1)
+    record = f"<{RECORD_TAG}>{body}</{RECORD_TAG}>"
+    with open(out_path, "w", encoding="utf-8") as output_file:
+        output_file.write(head)
+        for _ in range(scale):
+            output_file.write(record)
+        output_file.write(tail)
+
+
+def measure(func, *args) -> tuple[float, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, count
+
+
+def main(scales: tuple = (1, 10, 100)) -> None:
+    cases = (
+        ("legacy fromstring + xmltodict", lambda p: len(legacy_fetch_geoxml(p))),
+        ("fetch_geoxml (iterparse)", lambda p: len(fetch_geoxml(p))),
+        ("iter_geoxml (streaming)", lambda p: sum(1 for _ in iter_geoxml(p))),
+    )
+    print(f"{'scale':>6}{'records':>10}  {'method':<32}{'seconds':>10}{'peak MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in scales:
+            path = GEOXML
+            if scale > 1:
+                path = os.path.join(tmp_dir, f"geoxml_{scale}.xml")
+                scaled_geoxml(scale, path)
+            for name, func in cases:
+                elapsed, peak, count = measure(func, path)
+                print(f"{scale:>5}x{count:>10}  {name:<32}{elapsed:>10.3f}{peak:>10.1f}")
+
+
+if __name__ == '__main__':
+    import logging
+    logging.disable(logging.DEBUG)
+    main()
@@ -0,0 +1,62 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import os
+import statistics
+import subprocess
+import sys
+
+"""
+src.area_codes.convert 的 import 時間與 convert() 端對端時間
+
+每次量測都在新的子行程中執行，import 時間包含相依套件的載入；
+端對端時間為以測試資料夾的三個來源檔執行 convert(write_file=False)，
+分別量測未設定 logging (預設 WARNING) 與 CLI -v (DEBUG，輸出導向 /dev/null) 兩種情況
+
+    python -m benchmarks.bench_import
+"""
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+FIXTURES = os.path.join(ROOT, "tests", "test_area_codes")
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import src.area_codes.convert
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("requests", "xlrd", "openpyxl", "xmltodict") if m in sys.modules]
+print(elapsed, ",".join(heavy) or "-")
+"""
+
+CONVERT_SCRIPT = """
+import logging, os, sys, time
+if sys.argv[1] == "debug":
+    logging.basicConfig(level=logging.DEBUG, stream=open(os.devnull, "w"))
+start = time.perf_counter()
+from src.area_codes import convert
+convert.convert(geoxml_path=os.path.join(sys.argv[2], "1050812_行政區經緯度(toPost).xml"),
+                areacode_path=os.path.join(sys.argv[2], "行政區代碼表_Taiwan_Geocode.xlsx"),
+                enname_path=os.path.join(sys.argv[2], "county_h_10706.xls"),
+                write_file=False)
+print(time.perf_counter() - start)
+"""
+
+
+def _run(script: str, *args: str) -> list[str]:
+    result = subprocess.run([sys.executable, "-c", script, *args], cwd=ROOT, check=True,
+                            capture_output=True, text=True)
+    return result.stdout.split()
+
+
+def main(repeat: int = 7) -> None:
+    samples = [_run(IMPORT_SCRIPT) for _ in range(repeat)]
+    import_time = statistics.median(float(s[0]) for s in samples)
+    print(f"import src.area_codes.convert: {import_time * 1e3:.1f} ms (median of {repeat}), "
+          f"heavy modules loaded: {samples[0][1]}")
+
+    for mode in ("default", "debug"):
+        times = [float(_run(CONVERT_SCRIPT, mode, FIXTURES)[0]) for _ in range(repeat)]
+        print(f"import + convert() on fixtures, logging {mode}: {statistics.median(times) * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import time
+
+import numpy as np
+
+from src.area_codes.area_index import AreaIndex
+from src.area_codes.lookup_cache import CachedLookup
+from src.area_codes.reverse_geocode import ReverseGeocoder
+
+"""
+Zipf 分佈查詢 (郵遞區號、geo_code_103、四捨五入到小數 3 位的 GPS 位置) 下，
+每次以 AreaIndex / ReverseGeocoder 查詢並組出 JSON 回應，與 CachedLookup 的吞吐量與命中率比較
+
+    python -m benchmarks.bench_lookup_cache
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def _zipf_choice(rng: np.random.Generator, population: list, count: int, a: float) -> list:
+    ranks = rng.zipf(a, count * 2)
+    ranks = ranks[ranks <= len(population)][:count] - 1
+    order = rng.permutation(len(population))
+    return [population[order[r]] for r in ranks]
+
+
+def make_queries(area_codes: dict, count: int, a: float = 1.2, points: int = 20_000, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    zip_codes = sorted({area["zip_code"] for area in area_codes.values()})
+    geo_codes = sorted({area["geo_code_103"] for area in area_codes.values() if area["geo_code_103"]})
+    locations = list(zip(rng.uniform(21.9, 25.3, points).round(3).tolist(),
+                         rng.uniform(120.0, 122.0, points).round(3).tolist()))
+    kinds = rng.choice(3, count, p=[0.4, 0.2, 0.4])
+    pools = [iter(_zipf_choice(rng, zip_codes, count, a)), iter(_zipf_choice(rng, geo_codes, count, a)),
+             iter(_zipf_choice(rng, locations, count, a))]
+    return [(int(kind), next(pools[kind])) for kind in kinds]
+
+
+def main(count: int = 200_000, sizes: tuple = (256, 1024, 4096)) -> None:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+    queries = make_queries(area_codes, count)
+
+    index = AreaIndex(area_codes)
+    geocoder = ReverseGeocoder(area_codes)
+    ids = {id(area): int(key) for key, area in area_codes.items()}
+
+    def dumps(value) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def record(area):
+        return None if area is None else {"id": ids[id(area)], **area}
+
+    start = time.perf_counter()
+    for kind, query in queries:
+        if kind == 0:
+            dumps([record(area) for area in index.get_by_zip_code(query)])
+        elif kind == 1:
+            dumps(record(index.get_by_geo_code(query)))
+        else:
+            dumps(record(geocoder.get_data_by_latlng(*query)))
+    uncached = count / (time.perf_counter() - start)
+    print(f"queries: {count:,} (40% zip_code, 20% geo_code_103, 40% GPS), zipf a=1.2")
+    print(f"{'':<24}{'qps':>12}{'hit rate':>10}{'evictions':>11}")
+    print(f"{'uncached + json.dumps':<24}{uncached:>12,.0f}")
+
+    for maxsize in sizes:
+        lookup = CachedLookup(area_codes, maxsize=maxsize)
+        methods = (lookup.get_by_zip_code_json, lookup.get_by_geo_code_json)
+        start = time.perf_counter()
+        for kind, query in queries:
+            if kind == 2:
+                lookup.get_data_by_latlng_json(*query)
+            else:
+                methods[kind](query)
+        qps = count / (time.perf_counter() - start)
+        stats = lookup.stats()
+        print(f"{f'CachedLookup({maxsize})':<24}{qps:>12,.0f}{stats['hit_rate']:>10.1%}{stats['evictions']:>11,}")
+
+
+if __name__ == '__main__':
+    main()
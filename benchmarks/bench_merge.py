@@ -0,0 +1,103 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import logging
+import time
+
+from src.area_codes.convert import merge
+
+"""
+merge() 與原本 O(n·m) 英文名稱合併迴圈的效能比較
+
+以合成資料模擬 1x ~ 100x 現有來源 (371 個行政區) 的規模，
+舊版迴圈在 max_legacy_scale 以上的規模不執行 (時間為平方成長)
+
+    python -m benchmarks.bench_merge
+"""
+
+BASE_SIZE = 371
+
+
+def synthetic_sources(n: int) -> tuple[list, list, dict]:
+    area_list, enname_list, geo_code_103 = [], [], {}
+    for i in range(n):
+        name = f"縣市{i // 12:05d}鄉鎮{i:06d}"
+        area_list.append({
+            "_x0033_碼郵遞區號": f"{100 + i % 900}",
+            "行政區名": name,
+            "中心點經度": f"{120 + (i % 1000) / 1000}",
+            "中心點緯度": f"{22 + (i % 3000) / 1000}",
+        })
+        enname_list.append([f"{100 + i % 900}", name, f"Area {i}, County {i // 12}"])
+        geo_code_103[name] = {
+            "geo_code_103": f"{6300000 + i}",
+            "area_name": f"鄉鎮{i:06d}",
+            "area_name_en": f"Area {i}",
+            "county_name": f"縣市{i // 12:05d}",
+            "county_full_name": f"縣市{i // 12:05d}",
+            "county_name_en": f"County {i // 12}",
+            "county_geo_code_103": f"{i // 12}",
+        }
+    # 英文名稱表與經緯度表的順序不同，避免舊版迴圈總是在第一筆就命中
+    enname_list.reverse()
+    return area_list, enname_list, geo_code_103
+
+
+def legacy_merge(area_list: list, enname_list: list, geo_code_103: dict) -> dict:
+    area_code = {}
+    for c in range(0, len(area_list)):
+        area_code[f"{c+1}"] = {
+            "zip_code": area_list[c]["_x0033_碼郵遞區號"],
+            "area_name": area_list[c]["行政區名"],
+            "area_name_en": "",
+            "geo_code_103": "",
+            "county_name": "",
+            "county_name_en": "",
+            "county_geo_code_103": "",
+            "county_full_name": "",
+            "city_name": "",
+            "city_name_en": "",
+            "longitude": float(area_list[c]["中心點經度"]),
+            "latitude": float(area_list[c]["中心點緯度"]),
+        }
+
+    for c in range(0, len(enname_list)):
+        for k, v in area_code.items():
+            if v.get("area_name") == enname_list[c][1]:
+                area_code[k]["area_name_en"] = enname_list[c][2]
+                break
+
+    for k, v in area_code.items():
+        area_name = v["area_name"]
+        area_code[k]["county_name"] = geo_code_103.get(area_name, {}).get("county_name", "")
+        area_code[k]["county_name_en"] = geo_code_103.get(area_name, {}).get("county_name_en", "")
+        area_code[k]["county_geo_code_103"] = geo_code_103.get(area_name, {}).get("county_geo_code_103", "")
+        area_code[k]["county_full_name"] = geo_code_103.get(area_name, {}).get("county_full_name", "")
+        area_code[k]["city_name"] = geo_code_103.get(area_name, {}).get("area_name", "")
+        area_code[k]["city_name_en"] = geo_code_103.get(area_name, {}).get("area_name_en", "")
+        area_code[k]["geo_code_103"] = geo_code_103.get(area_name, {}).get("geo_code_103", "")
+    return area_code
+
+
+def main(scales: tuple = (1, 10, 30, 100), max_legacy_scale: int = 30) -> None:
+    logging.disable(logging.INFO)
+    print(f"{'scale':>6}{'areas':>10}{'legacy (s)':>14}{'merge (s)':>12}{'speedup':>10}")
+    for scale in scales:
+        sources = synthetic_sources(BASE_SIZE * scale)
+
+        start = time.perf_counter()
+        result, report = merge(*sources)
+        t_merge = time.perf_counter() - start
+        assert report.is_clean()
+
+        if scale <= max_legacy_scale:
+            start = time.perf_counter()
+            expected = legacy_merge(*sources)
+            t_legacy = time.perf_counter() - start
+            assert result == expected, "result mismatch"
+            print(f"{scale:>5}x{len(result):>10}{t_legacy:>14.3f}{t_merge:>12.4f}{t_legacy / t_merge:>9.0f}x")
+        else:
+            print(f"{scale:>5}x{len(result):>10}{'skipped':>14}{t_merge:>12.4f}{'':>10}")
+
+
+if __name__ == '__main__':
+    main()
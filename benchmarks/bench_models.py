@@ -0,0 +1,50 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import tracemalloc
+
+from src.area_codes.models import AreaTable
+
+"""
+AREA_CODES 不同資料模型的記憶體用量 (tracemalloc)
+
+模擬同一行程內保存多份資料 (例如多個版本或多個服務實例)，分別量測：
+- dict of dicts: json.load 的結果
+- list of Area: 由 AreaTable 產生的 __slots__ 物件，共用 County
+- AreaTable: 欄位式容器
+
+    python -m benchmarks.bench_models
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def measure(build, copies: int) -> float:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        text = f.read()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = [build(text) for _ in range(copies)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return (after - before) / copies / 1024
+
+
+def main(copies: int = 200) -> None:
+    cases = (
+        ("dict of dicts (json.load)", lambda text: json.loads(text)),
+        ("list of Area (__slots__)", lambda text: list(AreaTable.from_dict(json.loads(text)))),
+        ("AreaTable (columnar)", lambda text: AreaTable.from_dict(json.loads(text))),
+    )
+    baseline = None
+    print(f"{'model':<28}{'KB per copy':>14}{'vs dict':>10}")
+    for name, build in cases:
+        kb = measure(build, copies)
+        baseline = baseline or kb
+        print(f"{name:<28}{kb:>14.1f}{kb / baseline:>9.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import difflib
+import json
+import os
+import random
+import time
+
+from src.area_codes.name_search import NameIndex, area_names
+
+"""
+NameIndex 與逐一以 difflib 比對所有行政區名稱的吞吐量比較
+
+合成查詢：由行政區名稱隨機產生 臺/台 替換、前綴、刪字、相鄰字元交換、全小寫等變形
+
+    python -m benchmarks.bench_name_search
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def make_queries(area_codes: dict, count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    names = [name for area in area_codes.values() for name in area_names(area)]
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names).replace("臺", "台") if rng.random() < 0.5 else rng.choice(names)
+        r = rng.random()
+        if r < 0.3 and len(name) > 3:
+            name = name[: rng.randint(2, len(name) - 1)]
+        elif r < 0.5 and len(name) > 3:
+            i = rng.randrange(len(name))
+            name = name[:i] + name[i + 1:]
+        elif r < 0.7 and len(name) > 3:
+            i = rng.randrange(len(name) - 1)
+            name = name[:i] + name[i + 1] + name[i] + name[i + 2:]
+        elif r < 0.8:
+            name = name.lower()
+        queries.append(name)
+    return queries
+
+
+def difflib_search(candidates: list[tuple[str, str]], query: str, limit: int = 10) -> list[tuple[float, str]]:
+    scored = []
+    for key, name in candidates:
+        matcher = difflib.SequenceMatcher(None, query, name)
+        if matcher.real_quick_ratio() >= 0.3 and matcher.quick_ratio() >= 0.3:
+            scored.append((matcher.ratio(), key))
+    return sorted(scored, reverse=True)[:limit]
+
+
+def main(count: int = 100_000, n_difflib: int = 1_000) -> None:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+    queries = make_queries(area_codes, count)
+
+    start = time.perf_counter()
+    index = NameIndex(area_codes)
+    print(f"build: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    candidates = [(key, name) for key, area in area_codes.items()
+                  for name in (area["area_name"], area["area_name_en"], area["city_name_en"])]
+    start = time.perf_counter()
+    for query in queries[:n_difflib]:
+        difflib_search(candidates, query)
+    difflib_qps = n_difflib / (time.perf_counter() - start)
+
+    results = {}
+    for name, func in (("NameIndex.prefix", index.prefix), ("NameIndex.fuzzy", index.fuzzy),
+                       ("NameIndex.search", index.search)):
+        start = time.perf_counter()
+        found = sum(1 for query in queries if func(query))
+        results[name] = (count / (time.perf_counter() - start), found)
+
+    print(f"{count:,} queries (difflib on the first {n_difflib:,})")
+    print(f"{'method':<28}{'queries/s':>14}{'with result':>14}")
+    print(f"{'difflib over all names':<28}{difflib_qps:>14,.0f}{'':>14}")
+    for name, (qps, found) in results.items():
+        print(f"{name:<28}{qps:>14,.0f}{found / count:>14.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.area_codes.neighbors import NeighborIndex, distance_matrix, sorted_neighbors, write_neighbors
+from src.area_codes.reverse_geocode import haversine
+
+"""
+距離矩陣與鄰近清單的建立時間 (向量運算 vs 逐對 haversine)、mmap 開啟時間，
+以及 k 近鄰 / 半徑查詢與每次以 haversine 計算全部中心點距離再排序的比較
+
+    python -m benchmarks.bench_neighbors
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def _per_call(func, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count
+
+
+def main(count: int = 2_000) -> None:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+    areas = list(area_codes.values())
+    lats = [a["latitude"] for a in areas]
+    lngs = [a["longitude"] for a in areas]
+    geo_codes = [a["geo_code_103"] for a in areas if a["geo_code_103"]]
+
+    def python_build():
+        matrix = [[haversine(lat1, lng1, lat2, lng2) for lat2, lng2 in zip(lats, lngs)] for lat1, lng1 in zip(lats, lngs)]
+        return [sorted(range(len(row)), key=row.__getitem__) for row in matrix]
+
+    print(f"{len(areas)} districts")
+    print(f"build, pairwise haversine + sort:   {_per_call(python_build, 3) * 1e3:8.1f} ms")
+    lat_array, lng_array = np.array(lats), np.array(lngs)
+    print(f"build, vectorized:                  "
+          f"{_per_call(lambda: sorted_neighbors(distance_matrix(lat_array, lng_array)), 20) * 1e3:8.1f} ms")
+
+    by_code = {a["geo_code_103"]: a for a in areas if a["geo_code_103"]}
+
+    def python_k_nearest(code: str, k: int = 5) -> list:
+        source = by_code[code]
+        km = [(haversine(source["latitude"], source["longitude"], a["latitude"], a["longitude"]), i)
+              for i, a in enumerate(areas) if a is not source]
+        return sorted(km)[:k]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "AREA_CODES.neighbors.bin")
+        print(f"write_neighbors:                    {_per_call(lambda: write_neighbors(area_codes, path), 5) * 1e3:8.1f} ms"
+              f"  ({os.path.getsize(path) / 1024:.0f} KB)")
+        print(f"NeighborIndex.open:                 {_per_call(lambda: NeighborIndex.open(path).close(), 50) * 1e3:8.2f} ms")
+
+        with NeighborIndex.open(path) as neighbors:
+            codes = [geo_codes[i % len(geo_codes)] for i in range(count)]
+            it = iter(codes)
+            naive = _per_call(lambda: python_k_nearest(next(it)), count)
+            it = iter(codes)
+            k_nearest = _per_call(lambda: neighbors.k_nearest(next(it), 5), count)
+            it = iter(codes)
+            within = _per_call(lambda: neighbors.within_radius(next(it), 20.0), count)
+            print(f"k=5, haversine over all per request: {naive * 1e6:7.1f} us")
+            print(f"k=5, NeighborIndex.k_nearest:        {k_nearest * 1e6:7.1f} us")
+            print(f"R=20km, NeighborIndex.within_radius: {within * 1e6:7.1f} us")
+
+
+if __name__ == '__main__':
+    main()
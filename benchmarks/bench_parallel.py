@@ -0,0 +1,82 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import os
+import re
+import tempfile
+import time
+import zipfile
+
+from benchmarks.bench_geoxml import scaled_geoxml
+from src.area_codes.convert import convert
+from src.area_codes.xlsx_reader import XlsxReader
+
+"""
+convert() 依序解析與 parallel=True (process pool 平行解析) 的比較
+
+除了內附的來源檔外，另將 `行政區經緯度` XML 與 `行政區代碼表` 的 `縣市`、`鄉鎮` 頁籤重複 scale 倍
+產生較大的來源檔 (沒有 xlwt，英文名稱的 .xls 維持原大小)
+
+平行的上限為最慢的來源 (行政區代碼表) 的解析時間，加上 process 啟動與結果 pickle 的成本；
+單核心的環境沒有加速，只會看到額外的成本
+
+    python -m benchmarks.bench_parallel
+"""
+
+BASE = os.path.join(os.path.dirname(__file__), "..", "tests", "test_area_codes")
+GEOXML = os.path.join(BASE, "1050812_行政區經緯度(toPost).xml")
+AREACODE = os.path.join(BASE, "行政區代碼表_Taiwan_Geocode.xlsx")
+ENNAME = os.path.join(BASE, "county_h_10706.xls")
+
+_ROW_NUMBER = re.compile(r'(<row\b[^>]*?)\s+r="\d+"')
+
+
+def scaled_xlsx(scale: int, out_path: str, sheet_names: tuple = ("縣市", "鄉鎮")) -> None:
+    """
+    將指定頁籤第一列以外的資料列重複 scale 倍，列號改由讀取端依序計算
+    """
+    with XlsxReader(AREACODE) as reader:
+        sheets, _ = reader._read_workbook()
+    targets = {sheets[name] for name in sheet_names}
+    with zipfile.ZipFile(AREACODE) as source, zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as output:
+        for info in source.infolist():
+            data = source.read(info.filename)
+            if info.filename in targets:
+                content = _ROW_NUMBER.sub(r"\1", data.decode("utf-8"))
+                head, rest = content.split("<sheetData>", 1)
+                body, tail = rest.split("</sheetData>", 1)
+                header_end = body.index("</row>") + len("</row>")
+                data = f"{head}<sheetData>{body[:header_end]}{body[header_end:] * scale}</sheetData>{tail}".encode()
+            output.writestr(info, data)
+
+
+def best_of(repeat: int, **kwargs) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        convert(write_file=False, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(scales: tuple = (1, 10, 50), repeat: int = 3) -> None:
+    print(f"cpu count: {os.cpu_count()}")
+    print(f"{'scale':>6}{'geoxml MB':>11}{'xlsx MB':>9}{'serial ms':>11}{'parallel ms':>13}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in scales:
+            if scale == 1:
+                geoxml_path, areacode_path = GEOXML, AREACODE
+            else:
+                geoxml_path = os.path.join(tmp_dir, f"geoxml_{scale}.xml")
+                areacode_path = os.path.join(tmp_dir, f"areacode_{scale}.xlsx")
+                scaled_geoxml(scale, geoxml_path)
+                scaled_xlsx(scale, areacode_path)
+            paths = dict(geoxml_path=geoxml_path, areacode_path=areacode_path, enname_path=ENNAME)
+            serial = best_of(repeat, **paths)
+            parallel = best_of(repeat, parallel=True, **paths)
+            print(f"{scale:>6}{os.path.getsize(geoxml_path) / 2 ** 20:>11.1f}"
+                  f"{os.path.getsize(areacode_path) / 2 ** 20:>9.1f}{serial * 1e3:>11.1f}{parallel * 1e3:>13.1f}"
+                  f"{serial / parallel:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
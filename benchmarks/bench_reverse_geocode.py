@@ -0,0 +1,73 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import time
+
+import numpy as np
+
+from src.area_codes.reverse_geocode import ReverseGeocoder, haversine
+
+"""
+ReverseGeocoder 與逐點 haversine 迴圈的效能比較 (預設 1M 個點)
+
+逐點迴圈全量執行需要數十分鐘，因此只量測 sample 個點後換算成 1M 點的時間，
+並以同一批 sample 驗證兩者結果一致
+
+    python -m benchmarks.bench_reverse_geocode [points] [sample]
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def brute_force_loop(areas: list, lat: float, lng: float) -> int:
+    best, best_km = -1, float("inf")
+    for i, area in enumerate(areas):
+        km = haversine(lat, lng, area["latitude"], area["longitude"])
+        if km < best_km:
+            best, best_km = i, km
+    return best
+
+
+def main(points: int = 1_000_000, sample: int = 5_000) -> None:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+    areas = list(area_codes.values())
+
+    start = time.perf_counter()
+    geocoder = ReverseGeocoder(area_codes)
+    print(f"build index: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(21.8, 25.4, points)
+    lng = rng.uniform(119.3, 122.1, points)
+
+    start = time.perf_counter()
+    expected = [brute_force_loop(areas, a, b) for a, b in zip(lat[:sample].tolist(), lng[:sample].tolist())]
+    t_loop = (time.perf_counter() - start) / sample * points
+
+    start = time.perf_counter()
+    single = [geocoder.nearest(a, b)[0] for a, b in zip(lat[:sample].tolist(), lng[:sample].tolist())]
+    t_single = (time.perf_counter() - start) / sample * points
+
+    start = time.perf_counter()
+    indices, _ = geocoder.query(lat, lng)
+    t_batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    geocoder.query_k(lat, lng, k=5)
+    t_batch_k = time.perf_counter() - start
+
+    assert single == expected and indices[:sample].tolist() == expected, "result mismatch"
+
+    print(f"{'method':<36}{'seconds / ' + format(points, ','):>20}{'points/s':>14}")
+    for name, t in (("brute-force haversine loop (est.)", t_loop),
+                    ("ReverseGeocoder.nearest (est.)", t_single),
+                    ("ReverseGeocoder.query", t_batch),
+                    ("ReverseGeocoder.query_k (k=5)", t_batch_k)):
+        print(f"{name:<36}{t:>20.2f}{points / t:>14,.0f}")
+
+
+if __name__ == '__main__':
+    import sys
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,56 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import tempfile
+import timeit
+
+from src.area_codes.snapshot import Snapshot, json_to_snapshot
+
+"""
+AREA_CODES.json (json.load) 與二進位快照 (Snapshot.open, mmap) 的載入時間比較
+
+    python -m benchmarks.bench_snapshot
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def load_json() -> dict:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(number: int = 200) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "AREA_CODES.bin")
+        json_to_snapshot(AREA_CODES_JSON, path)
+        print(f"size: json {os.path.getsize(AREA_CODES_JSON):,} bytes, snapshot {os.path.getsize(path):,} bytes")
+
+        def open_close():
+            Snapshot.open(path).close()
+
+        def open_lookup():
+            with Snapshot.open(path) as snapshot:
+                snapshot["100"]
+
+        def open_column():
+            with Snapshot.open(path) as snapshot:
+                snapshot.column("geo_code_103")
+
+        def open_to_dict():
+            with Snapshot.open(path) as snapshot:
+                snapshot.to_dict()
+
+        print(f"{'operation':<34}{'us/op':>12}")
+        for name, func in (("json.load", load_json),
+                           ("Snapshot.open + close", open_close),
+                           ("Snapshot.open + one lookup", open_lookup),
+                           ("Snapshot.open + one column", open_column),
+                           ("Snapshot.open + to_dict()", open_to_dict)):
+            t = min(timeit.repeat(func, number=number, repeat=3)) / number
+            print(f"{name:<34}{t * 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.area_codes.area_index import AreaIndex
+from src.area_codes.sqlite_db import AreaDatabase, write_sqlite
+
+"""
+SQLite 資料庫與各行程載入 AREA_CODES.json 的比較
+
+- 開啟：AreaDatabase 開啟唯讀連線 vs json.load + AreaIndex
+- 查詢：郵遞區號、縣市、經緯度範圍查詢的單次延遲
+- 多行程：N 個行程各自開啟連線，同時查詢的總吞吐量
+
+    python -m benchmarks.bench_sqlite
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def _per_call(func, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count
+
+
+def _reader(path: str, zip_codes: list[str], count: int) -> int:
+    with AreaDatabase(path) as db:
+        return sum(len(db.get_by_zip_code(zip_codes[i % len(zip_codes)])) for i in range(count))
+
+
+def main(processes: int = os.cpu_count() or 4, count: int = 50_000) -> None:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+    zip_codes = sorted({area["zip_code"] for area in area_codes.values()})
+    random.Random(0).shuffle(zip_codes)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "AREA_CODES.sqlite")
+        start = time.perf_counter()
+        write_sqlite(area_codes, path)
+        print(f"write: {(time.perf_counter() - start) * 1e3:.1f} ms, {os.path.getsize(path) / 1024:.0f} KB")
+
+        def load_json():
+            with open(AREA_CODES_JSON, "r", encoding="utf-8") as input_file:
+                AreaIndex(json.load(input_file))
+
+        print(f"open: AreaDatabase {_per_call(lambda: AreaDatabase(path).close(), 200) * 1e3:.3f} ms, "
+              f"json.load + AreaIndex {_per_call(load_json, 50) * 1e3:.3f} ms")
+
+        with AreaDatabase(path) as db:
+            for name, func in (("get_by_zip_code", lambda: db.get_by_zip_code("300")),
+                               ("get_by_county_geo_code", lambda: db.get_by_county_geo_code("63")),
+                               ("within_bbox", lambda: db.within_bbox(24.9, 121.4, 25.2, 121.7))):
+                print(f"{name:<24}{_per_call(func, 5_000) * 1e6:>10.1f} us")
+
+        for workers in sorted({1, processes}):
+            with ProcessPoolExecutor(workers) as pool:
+                start = time.perf_counter()
+                list(pool.map(_reader, [path] * workers, [zip_codes] * workers, [count] * workers))
+                elapsed = time.perf_counter() - start
+            print(f"{workers} reader process(es): {workers * count / elapsed:,.0f} queries/s")
+
+
+if __name__ == '__main__':
+    main()
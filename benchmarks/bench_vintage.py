@@ -0,0 +1,85 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import copy
+import datetime
+import json
+import os
+import random
+import tempfile
+import time
+
+from src.area_codes.vintage import VintageStore
+
+"""
+VintageStore 與保存多份完整 AREA_CODES.json 的比較
+
+以 AREA_CODES.json 為起點合成 30 個 vintage (每個 vintage 修改 2% 的行政區、刪除與新增各 1 筆)，
+比較檔案大小與 "某日當時" 的郵遞區號查詢吞吐量
+
+    python -m benchmarks.bench_vintage
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def synthetic_vintages(area_codes: dict, count: int, seed: int = 0) -> list[tuple[str, dict]]:
+    rng = random.Random(seed)
+    current = copy.deepcopy(area_codes)
+    next_geo_code = 9000000
+    date = datetime.date(2010, 1, 1)
+    vintages = []
+    for _ in range(count):
+        current = dict(current)
+        keys = list(current)
+        for key in rng.sample(keys, len(keys) // 50):
+            current[key] = {**current[key], "longitude": f"{float(current[key]['longitude']) + 0.001:.7f}"}
+        current.pop(rng.choice(keys))
+        template = current[rng.choice(list(current))]
+        current[str(max(int(k) for k in current) + 1)] = {**template, "geo_code_103": str(next_geo_code)}
+        next_geo_code += 1
+        vintages.append((date.isoformat(), current))
+        date += datetime.timedelta(days=120)
+    return vintages
+
+
+def main(count: int = 30, queries: int = 100_000) -> None:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+    vintages = synthetic_vintages(area_codes, count)
+
+    start = time.perf_counter()
+    store = VintageStore()
+    for date, data in vintages:
+        store.add_vintage(data, date)
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "vintages.json")
+        store.save(path)
+        store_size = os.path.getsize(path)
+        full_size = sum(len(json.dumps(data, ensure_ascii=False, indent=4).encode("utf-8")) for _, data in vintages)
+
+        start = time.perf_counter()
+        VintageStore.from_json(path)
+        load = time.perf_counter() - start
+
+    rng = random.Random(1)
+    zip_codes = sorted({a["zip_code"] for a in area_codes.values()})
+    first, last = datetime.date.fromisoformat(vintages[0][0]), datetime.date.fromisoformat(vintages[-1][0])
+    dates = [(first + datetime.timedelta(days=rng.randrange((last - first).days + 200))).isoformat()
+             for _ in range(queries)]
+    samples = [rng.choice(zip_codes) for _ in range(queries)]
+
+    start = time.perf_counter()
+    found = sum(len(store.get_by_zip_code(zip_code, date)) for zip_code, date in zip(samples, dates))
+    qps = queries / (time.perf_counter() - start)
+
+    print(f"{count} vintages, {len(store.records):,} distinct records "
+          f"(full copies hold {sum(len(data) for _, data in vintages):,})")
+    print(f"build {build * 1e3:.1f} ms, load {load * 1e3:.1f} ms")
+    print(f"file size: store {store_size / 2 ** 20:.2f} MB vs {count} full JSON copies {full_size / 2 ** 20:.2f} MB")
+    print(f"get_by_zip_code as of date: {qps:,.0f} queries/s ({found / queries:.2f} areas per query)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import tempfile
+import time
+
+from src.area_codes.writer import FORMATS, write_output
+
+"""
+各輸出格式的寫入時間與檔案大小，以及內容未變動時略過寫入的時間
+
+    python -m benchmarks.bench_writer
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def _per_call(func, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count
+
+
+def main(count: int = 50) -> None:
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "baseline.json")
+
+        def json_dump():
+            with open(path, "w", encoding="utf-8") as output_file:
+                json.dump(area_codes, output_file, ensure_ascii=False, indent=4)
+
+        print(f"{'format':<28}{'size KB':>10}{'write ms':>10}{'unchanged ms':>14}")
+        print(f"{'json.dump(indent=4)':<28}{'':>10}{_per_call(json_dump, count) * 1e3:>10.2f}")
+        for output_format in FORMATS:
+            path = os.path.join(tmp_dir, f"{output_format}.json")
+            changed = [{**area_codes, "1": {**area_codes["1"], "zip_code": str(i)}} for i in range(count)]
+            start = time.perf_counter()
+            for data in changed:
+                write_output(data, path, output_format)
+            write = (time.perf_counter() - start) / count
+            write_output(area_codes, path, output_format)
+            unchanged = _per_call(lambda: write_output(area_codes, path, output_format), count)
+            print(f"{output_format:<28}{os.path.getsize(path) / 1024:>10.1f}{write * 1e3:>10.2f}{unchanged * 1e3:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import os
+import subprocess
+import sys
+
+"""
+fetch_areacode() 讀取 `行政區代碼表_Taiwan_Geocode.xlsx` 的時間與記憶體比較
+
+- openpyxl full:       原本的 load_workbook() 完整載入
+- openpyxl read_only:  load_workbook(read_only=True) 串流讀取
+- XlsxReader:          直接從 zip 內串流讀取 `縣市`、`鄉鎮` 工作表 XML (目前 fetch_areacode 的作法)
+
+每種方式在獨立的子行程中冷啟動執行，峰值 RSS 取自子行程的 ru_maxrss，並扣除只 import 模組的基準值
+
+    python -m benchmarks.bench_xlsx
+"""
+
+GEOCODE_XLSX = os.path.join(os.path.dirname(__file__), "..", "tests", "test_area_codes", "行政區代碼表_Taiwan_Geocode.xlsx")
+
+SCRIPTS = {
+    "baseline (imports only)": "",
+    "openpyxl full": """
+wb = load_workbook(path)
+rows = [r for name, a, b in (("縣市", 6, 9), ("鄉鎮", 5, 9))
+        for r in wb[name].iter_rows(min_row=2, max_row=wb[name].max_row, min_col=a, max_col=b, values_only=True)]
+""",
+    "openpyxl read_only": """
+wb = load_workbook(path, read_only=True)
+rows = [r for name, a, b in (("縣市", 6, 9), ("鄉鎮", 5, 9))
+        for r in wb[name].iter_rows(min_row=2, min_col=a, max_col=b, values_only=True)]
+wb.close()
+""",
+    "XlsxReader": """
+with XlsxReader(path) as wb:
+    rows = [r for name, a, b in (("縣市", 6, 9), ("鄉鎮", 5, 9))
+            for r in wb.iter_rows(name, min_row=2, min_col=a, max_col=b)]
+""",
+}
+
+PRELUDE = """
+import resource, sys, time
+from openpyxl import load_workbook
+from src.area_codes.xlsx_reader import XlsxReader
+path = sys.argv[1]
+start = time.perf_counter()
+rows = []
+{body}
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, len(rows))
+"""
+
+
+def run(body: str) -> tuple[float, float, int]:
+    root = os.path.join(os.path.dirname(__file__), "..")
+    output = subprocess.run([sys.executable, "-c", PRELUDE.format(body=body), GEOCODE_XLSX],
+                            cwd=root, capture_output=True, text=True, check=True).stdout.split()
+    # Linux 的 ru_maxrss 單位為 KB
+    return float(output[0]), int(output[1]) / 1024, int(output[2])
+
+
+def main(repeat: int = 3) -> None:
+    print(f"{'method':<26}{'rows':>6}{'seconds':>10}{'peak RSS MB':>14}{'RSS over baseline':>20}")
+    baseline = None
+    for name, body in SCRIPTS.items():
+        results = [run(body) for _ in range(repeat)]
+        elapsed = min(r[0] for r in results)
+        rss = min(r[1] for r in results)
+        baseline = rss if baseline is None else baseline
+        print(f"{name:<26}{results[0][2]:>6}{elapsed:>10.3f}{rss:>14.1f}{rss - baseline:>20.1f}")
+
+
+if __name__ == '__main__':
+    main()
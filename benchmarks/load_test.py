@@ -0,0 +1,135 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+"""
+AREA_CODES 查詢 API (src/area_codes/server.py) 的負載測試
+
+未指定 --port 時會以子行程在 localhost 啟動 server，測試結束後關閉；
+每個連線使用 keep-alive 連續送出請求，請求路徑依比例混合四個 URI
+
+    python -m benchmarks.load_test [--port 8080] [--connections 32] [--duration 10] [--gzip]
+"""
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "AREA_CODES.json")
+
+
+def request_paths(area_codes: dict, count: int = 10000, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    areas = list(area_codes.values())
+    paths = []
+    for _ in range(count):
+        area = rng.choice(areas)
+        r = rng.random()
+        if r < 0.01:
+            paths.append("/allareas")
+        elif r < 0.4:
+            paths.append(f"/get_data_by_zip_code/{area['zip_code']}")
+        elif r < 0.7:
+            paths.append(f"/get_geo_103_by_zip_code/{area['zip_code']}")
+        else:
+            lat = area["latitude"] + rng.uniform(-0.05, 0.05)
+            lng = area["longitude"] + rng.uniform(-0.05, 0.05)
+            paths.append(f"/get_data_by_latlng/{lat:.5f}/{lng:.5f}")
+    return paths
+
+
+async def _client(port: int, paths: list[str], deadline: float, use_gzip: bool,
+                  latencies: list[float], errors: list[int]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    extra = "Accept-Encoding: gzip\r\n" if use_gzip else ""
+    i = random.randrange(len(paths))
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{extra}\r\n".encode("ascii"))
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(1)
+    finally:
+        writer.close()
+
+
+def _percentile(values: list[float], p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run(port: int, paths: list[str], connections: int, duration: float, use_gzip: bool) -> None:
+    latencies: list[float] = []
+    errors: list[int] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(port, paths, start + duration, use_gzip, latencies, errors)
+                           for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"connections {connections}, duration {elapsed:.1f}s, gzip {use_gzip}")
+    print(f"requests    {len(latencies):,} ({len(errors)} non-200)")
+    print(f"RPS         {len(latencies) / elapsed:,.0f}")
+    print(f"p50         {_percentile(latencies, 0.5) * 1e3:.2f} ms")
+    print(f"p99         {_percentile(latencies, 0.99) * 1e3:.2f} ms")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Server on port {port} did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Load test the AREA_CODES API server')
+    parser.add_argument("--port", type=int, default=None, help="Port of a running server. default: start one")
+    parser.add_argument("-f", "--file", default=AREA_CODES_JSON, help="AREA_CODES.json used to build request paths")
+    parser.add_argument("--connections", type=int, default=32, help="Concurrent keep-alive connections. default: 32")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run. default: 10")
+    parser.add_argument("--gzip", action="store_true", help="Send Accept-Encoding: gzip")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        paths = request_paths(json.load(f))
+
+    process = None
+    port = args.port
+    if port is None:
+        port = _free_port()
+        process = subprocess.Popen([sys.executable, "-m", "src.area_codes.server", "-f", args.file,
+                                    "--port", f"{port}", "--reload-interval", "0"],
+                                   cwd=os.path.join(os.path.dirname(__file__), ".."))
+        _wait_for_port(port)
+    try:
+        asyncio.run(run(port, paths, args.connections, args.duration, args.gzip))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Collection
+
+import numpy as np
+
+from benchmarks.bench_geoxml import scaled_geoxml
+from benchmarks.bench_merge import synthetic_sources
+from src.area_codes import convert
+from src.area_codes.area_index import AreaIndex
+from src.area_codes.cwa_cap import CwaCAP
+from src.area_codes.name_search import NameIndex
+from src.area_codes.reverse_geocode import ReverseGeocoder
+from src.area_codes.server import AreaDataset
+from src.area_codes.snapshot import Snapshot, write_snapshot
+
+"""
+效能回歸測試
+
+以 tests/test_area_codes 內附的來源檔與放大後的合成資料，量測匯入、合併、JSON 讀寫與各查詢 API，
+結果輸出為 JSON，compare 與基準檔比較，任一項目變慢超過門檻時以 exit code 1 結束
+
+    python -m benchmarks.suite run -o results.json                   # 全部項目
+    python -m benchmarks.suite run -k lookup -o results.json         # 名稱包含 lookup 的項目
+    python -m benchmarks.suite compare benchmarks/baseline.json results.json --threshold 0.25
+    python -m benchmarks.suite run --compare benchmarks/baseline.json
+
+每個項目先自動決定每輪的執行次數 (每輪至少 min_time 秒)，再重複 repeat 輪，記錄每次呼叫的中位數與最小值；
+比較時使用最小值 (受其他行程干擾最少，微秒等級的項目也較穩定)；每個項目執行前先量測一次固定的純 Python 校正工作量
+(calibration)，以校正耗時的比例換算，抵銷整台機器變快或變慢 (CPU 頻率、共用主機負載) 的影響，
+原始與換算後的結果都超過門檻才視為回歸；
+run --compare 時被判定為回歸的項目會再重跑 --retries 次並保留最好的一次，避免單次干擾造成誤判；基準檔仍與機器相關，更換機器或 Python 版本時需以 run -o benchmarks/baseline.json 重新產生
+"""
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+FIXTURES = os.path.join(ROOT, "tests", "test_area_codes")
+GEOXML = os.path.join(FIXTURES, "1050812_行政區經緯度(toPost).xml")
+ENNAME = os.path.join(FIXTURES, "county_h_10706.xls")
+AREACODE = os.path.join(FIXTURES, "行政區代碼表_Taiwan_Geocode.xlsx")
+AREA_CODES_JSON = os.path.join(ROOT, "AREA_CODES.json")
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+GEOXML_SCALE = 20
+MERGE_SCALE = 20
+BATCH_POINTS = 100_000
+
+
+def _cases(tmp_dir: str) -> dict[str, Callable[[], object]]:
+    """
+    :return: {項目名稱: 無參數的 callable}，名稱格式為 "類別/項目"
+    """
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        text = f.read()
+    area_codes = json.loads(text)
+
+    geoxml_scaled = os.path.join(tmp_dir, "geoxml_scaled.xml")
+    scaled_geoxml(GEOXML_SCALE, geoxml_scaled)
+    merge_sources = synthetic_sources(371 * MERGE_SCALE)
+    snapshot_path = os.path.join(tmp_dir, "AREA_CODES.bin")
+    write_snapshot(area_codes, snapshot_path)
+
+    index = AreaIndex(area_codes)
+    geocoder = ReverseGeocoder(area_codes)
+    cap = CwaCAP(area_codes)
+    names = NameIndex(area_codes)
+    dataset = AreaDataset(area_codes)
+
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(21.9, 25.3, BATCH_POINTS)
+    lngs = rng.uniform(120.0, 122.0, BATCH_POINTS)
+    counties = sorted({a["county_geo_code_103"] for a in area_codes.values()} - {""})
+    townships = [a["geo_code_103"] for a in area_codes.values() if a["geo_code_103"]]
+
+    def open_snapshot():
+        with Snapshot.open(snapshot_path) as snapshot:
+            return snapshot["100"]
+
+    return {
+        "ingest/fetch_geoxml": lambda: convert.fetch_geoxml(GEOXML),
+        f"ingest/fetch_geoxml_x{GEOXML_SCALE}": lambda: convert.fetch_geoxml(geoxml_scaled),
+        "ingest/fetch_enname": lambda: convert.fetch_enname(ENNAME),
+        "ingest/fetch_areacode": lambda: convert.fetch_areacode(AREACODE),
+        f"merge/merge_x{MERGE_SCALE}": lambda: convert.merge(*merge_sources),
+        "convert/end_to_end": lambda: convert.convert(geoxml_path=GEOXML, areacode_path=AREACODE,
+                                                      enname_path=ENNAME, write_file=False),
+        "json/dumps_indent4": lambda: json.dumps(area_codes, ensure_ascii=False, indent=4),
+        "json/loads": lambda: json.loads(text),
+        "json/snapshot_open_lookup": open_snapshot,
+        "lookup/area_index_zip_code": lambda: index.get_by_zip_code("300"),
+        "lookup/area_index_geo_code": lambda: index.get_by_geo_code("6300500"),
+        "lookup/reverse_geocode_single": lambda: geocoder.nearest(25.0324, 121.5198),
+        f"lookup/reverse_geocode_batch_{BATCH_POINTS // 1000}k": lambda: geocoder.query(lats, lngs),
+        "lookup/cwa_cap_all_counties": lambda: cap.mask(counties),
+        "lookup/cwa_cap_townships": lambda: cap.mask(townships[::7]),
+        "lookup/name_prefix": lambda: names.prefix("台北市中"),
+        "lookup/name_fuzzy": lambda: names.fuzzy("Jhongzheng Dist"),
+        "lookup/server_route_zip_code": lambda: dataset.route("/get_data_by_zip_code/300"),
+        "lookup/server_route_latlng": lambda: dataset.route("/get_data_by_latlng/25.0324/121.5198"),
+    }
+
+
+def _calibration() -> int:
+    """
+    校正用的固定工作量：dict/str/int 操作，與查詢路徑的負載相近
+    """
+    table = {}
+    for i in range(2000):
+        table[str(i)] = i * i
+    return sum(table[str(i)] for i in range(0, 2000, 3))
+
+
+def measure(func: Callable[[], object], repeat: int = 7, min_time: float = 0.1) -> dict:
+    """
+    與 timeit 相同，量測期間停用 gc，避免前面項目留下的物件數影響分配較多的項目
+
+    :return: {"median", "min", "stdev" (每次呼叫秒數), "loops" (每輪次數), "repeat"}
+    """
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _measure(func, repeat, min_time)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _measure(func: Callable[[], object], repeat: int, min_time: float) -> dict:
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    return {"median": statistics.median(samples), "min": min(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0, "loops": loops, "repeat": repeat}
+
+
+def run(pattern: str | None = None, repeat: int = 7, min_time: float = 0.1,
+        names: Collection[str] | None = None) -> dict:
+    """
+    :param pattern: 只執行名稱包含此字串的項目
+    :param names: 只執行這些項目 (優先於 pattern)
+    :return: {"machine": {...}, "results": {項目名稱: measure() 的結果加上 "calibration" (校正工作量耗時)}}
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, func in _cases(tmp_dir).items():
+            if (name not in names) if names is not None else (pattern and pattern not in name):
+                continue
+            calibration = measure(_calibration, repeat, min_time / 2)["min"]
+            results[name] = {**measure(func, repeat, min_time), "calibration": calibration}
+            print(f"{name:<40}{results[name]['min'] * 1e3:>12.4f} ms", file=sys.stderr)
+    return {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor(), "numpy": np.__version__},
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.25) -> tuple[str, list[str]]:
+    """
+    :param baseline: run() 的結果 (基準)
+    :param current: run() 的結果
+    :param threshold: 容許變慢的比例，0.25 表示最小值 (原始與以校正工作量換算後皆) 超過基準 1.25 倍即為回歸
+    :return: (比較表, 回歸的項目名稱)
+    """
+    lines = [f"{'benchmark':<40}{'baseline ms':>14}{'current ms':>14}{'change':>10}{'adjusted':>10}"]
+    regressions = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            lines.append(f"{name:<40}{'-':>14}{result['min'] * 1e3:>14.4f}{'':>10}{'new':>10}")
+            continue
+        before = baseline["results"][name]["min"]
+        # 兩邊都有校正值時，以校正耗時的比例換算目前的結果
+        speed = 1.0
+        if baseline["results"][name].get("calibration") and result.get("calibration"):
+            speed = baseline["results"][name]["calibration"] / result["calibration"]
+        change = result["min"] / before - 1
+        adjusted = result["min"] * speed / before - 1
+        flag = ""
+        # 校正值本身也有誤差，原始與換算後的結果都超過門檻才視為回歸
+        if min(change, adjusted) > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        lines.append(f"{name:<40}{before * 1e3:>14.4f}{result['min'] * 1e3:>14.4f}{change:>+10.1%}"
+                     f"{adjusted:>+10.1%}{flag}")
+    return "\n".join(lines), regressions
+
+
+def _relative(result: dict) -> float:
+    return result["min"] / result.get("calibration", 1.0)
+
+
+def _load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="AREA_CODES benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("-o", "--output", default=None, help="Write the results JSON to this file")
+    run_parser.add_argument("-k", "--filter", default=None, help="Only run benchmarks whose name contains this")
+    run_parser.add_argument("--repeat", type=int, default=7, help="Rounds per benchmark. default: 7")
+    run_parser.add_argument("--min-time", type=float, default=0.1, help="Minimum seconds per round. default: 0.1")
+    run_parser.add_argument("--compare", default=None, help="Compare with this baseline JSON after running")
+    run_parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown ratio. default: 0.25")
+    run_parser.add_argument("--retries", type=int, default=3,
+                            help="Re-run benchmarks flagged as regressions this many times. default: 3")
+
+    compare_parser = commands.add_parser("compare", help="Compare two results JSON files")
+    compare_parser.add_argument("baseline", help=f"Baseline results JSON, e.g. {os.path.relpath(BASELINE, ROOT)}")
+    compare_parser.add_argument("current", help="Current results JSON")
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown ratio. default: 0.25")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        current = run(args.filter, args.repeat, args.min_time)
+        if args.compare:
+            baseline = _load(args.compare)
+            for _ in range(args.retries):
+                _, regressions = compare(baseline, current, args.threshold)
+                if not regressions:
+                    break
+                rerun = run(repeat=args.repeat, min_time=args.min_time, names=regressions)["results"]
+                for name, result in rerun.items():
+                    if _relative(result) < _relative(current["results"][name]):
+                        current["results"][name] = result
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=4)
+        if not args.compare:
+            return 0
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+
+    table, regressions = compare(baseline, current, args.threshold)
+    print(table)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
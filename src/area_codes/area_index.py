@@ -0,0 +1,121 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import logging
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+"""
+AREA_CODES 記憶體索引
+
+convert() 的輸出以 "1".."371" 序號為 key，查詢時若逐筆比對 zip_code / geo_code_103 / area_name
+每次都需要線性掃描全部行政區，AreaIndex 於載入時一次建立 hash 索引，之後的查詢皆為 O(1)
+
+    index = AreaIndex.from_json("AREA_CODES.json")
+    index.get_by_zip_code("300")        # 郵遞區號可能重複，回傳 list
+    index.get_by_geo_code("6300500")
+    index.get_by_county_geo_code("63")  # 縣市底下所有鄉鎮
+    index.get_by_name("臺北市中正區")     # 中文或英文名稱皆可
+"""
+
+Area = dict[str, Any]
+
+
+class AreaIndex:
+    """
+    以 convert() 輸出建立的唯讀查詢索引
+
+    索引內保存的是原始 area dict 的參考，不會複製資料，呼叫端不應修改回傳的 dict
+    """
+
+    def __init__(self, area_codes: dict[str, Area]):
+        """
+        :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+        """
+        self._areas: dict[str, Area] = dict(area_codes)
+        self._by_zip_code: dict[str, list[Area]] = {}
+        self._by_geo_code: dict[str, Area] = {}
+        self._by_county_geo_code: dict[str, list[Area]] = {}
+        self._by_name: dict[str, Area] = {}
+
+        for key, area in self._areas.items():
+            self._by_zip_code.setdefault(area.get("zip_code", ""), []).append(area)
+
+            # geo_code_103 為空字串表示行政區代碼表中找不到該地區，不列入索引
+            geo_code = area.get("geo_code_103", "")
+            if geo_code:
+                if geo_code in self._by_geo_code:
+                    logger.warning(f"Duplicate geo_code_103 {geo_code}: serial {key}")
+                self._by_geo_code.setdefault(geo_code, area)
+
+            county_geo_code = area.get("county_geo_code_103", "")
+            if county_geo_code:
+                self._by_county_geo_code.setdefault(county_geo_code, []).append(area)
+
+            for name in (area.get("area_name", ""), area.get("area_name_en", "")):
+                if name:
+                    self._by_name.setdefault(name, area)
+
+        logger.debug(f"AreaIndex built: {len(self._areas)} areas, {len(self._by_zip_code)} zip codes, "
+                     f"{len(self._by_geo_code)} geo codes, {len(self._by_county_geo_code)} counties")
+
+    @classmethod
+    def from_json(cls, file_path: str) -> AreaIndex:
+        """
+        由 AREA_CODES.json 建立索引
+
+        :param file_path: JSON 檔案路徑
+        :return: AreaIndex
+        """
+        with open(file_path, "r", encoding="utf-8") as input_file:
+            return cls(json.load(input_file))
+
+    def __len__(self) -> int:
+        return len(self._areas)
+
+    def __iter__(self) -> Iterator[Area]:
+        return iter(self._areas.values())
+
+    def get_by_id(self, serial: str | int) -> Area | None:
+        """
+        :param serial: AREA_CODES.json 的序號 key
+        :return: area dict，找不到時回傳 None
+        """
+        return self._areas.get(f"{serial}")
+
+    def get_by_zip_code(self, zip_code: str) -> list[Area]:
+        """
+        部份地區的郵遞區號相同 (例如 300 新竹市東區/北區/香山區)，因此回傳 list
+
+        :param zip_code: 3 碼郵遞區號
+        :return: list of area dict，找不到時回傳空 list
+        """
+        return self._by_zip_code.get(zip_code, [])
+
+    def get_by_geo_code(self, geo_code_103: str) -> Area | None:
+        """
+        :param geo_code_103: Taiwan_Geocode_103 鄉鎮代碼
+        :return: area dict，找不到時回傳 None
+        """
+        return self._by_geo_code.get(geo_code_103)
+
+    def get_by_county_geo_code(self, county_geo_code_103: str) -> list[Area]:
+        """
+        :param county_geo_code_103: Taiwan_Geocode_103 縣市代碼
+        :return: 該縣市所有鄉鎮的 area dict，找不到時回傳空 list
+        """
+        return self._by_county_geo_code.get(county_geo_code_103, [])
+
+    def get_by_name(self, name: str) -> Area | None:
+        """
+        :param name: 中文行政區名 (area_name) 或英文名稱 (area_name_en)
+        :return: area dict，找不到時回傳 None
+        """
+        return self._by_name.get(name)
+
+    def zip_codes(self) -> list[str]:
+        return list(self._by_zip_code.keys())
+
+    def geo_codes(self) -> list[str]:
+        return list(self._by_geo_code.keys())
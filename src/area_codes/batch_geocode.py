@@ -0,0 +1,338 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Iterator
+
+import numpy as np
+
+try:
+    from .reverse_geocode import ReverseGeocoder
+except ImportError:
+    from reverse_geocode import ReverseGeocoder
+
+logger = logging.getLogger(__name__)
+
+"""
+大量經緯度資料的批次反查 (CSV / Parquet)
+
+逐段 (chunk_size 筆) 讀取輸入檔，以 ReverseGeocoder.query 對預先建立的中心點陣列做 NumPy 向量化的最近行政區計算，
+再逐段寫出加上 zip_code、geo_code_103 等欄位的輸出檔；同時只保留少數幾段資料在記憶體中，記憶體用量與檔案大小無關
+
+- CSV 以標準函式庫 csv 讀寫，其餘欄位原樣保留
+- Parquet 需要 pyarrow (未安裝時會提示)，輸出保留原本的欄位型別
+- --workers N 時以 N 個 process 計算最近行政區，主行程負責讀寫；同時處理中的段數上限為 2N，輸出順序與輸入相同
+- 經緯度空白或不合法的列，加上的欄位為空字串 (Parquet 為 null)
+- 輸出先寫入暫存檔，完成後才取代輸出檔
+
+    python src/area_codes/batch_geocode.py readings.csv readings_geocoded.csv --lat lat --lng lon
+    python src/area_codes/batch_geocode.py checkins.parquet out.parquet --workers 4 --chunk-size 500000
+
+    stats = geocode_file("readings.csv", "out.csv", lat_column="lat", lng_column="lon")
+    stats["rows_per_second"]
+"""
+
+AREA_CODES_JSON = "AREA_CODES.json"
+DEFAULT_COLUMNS = ("zip_code", "geo_code_103", "area_name")
+DISTANCE_COLUMN = "distance_km"
+
+# 子行程內的 ReverseGeocoder，由 _init_worker 建立
+_worker_geocoder: ReverseGeocoder | None = None
+
+
+def _init_worker(area_codes_path: str) -> None:
+    global _worker_geocoder
+    _worker_geocoder = ReverseGeocoder.from_json(area_codes_path)
+
+
+def _worker_query(lat: np.ndarray, lng: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    return _worker_geocoder.query(lat, lng)
+
+
+def _to_float(values: list[str]) -> np.ndarray:
+    """
+    :return: float64 陣列，空白或不合法的值為 nan
+    """
+    try:
+        return np.asarray(values, dtype=np.str_).astype(np.float64)
+    except ValueError:
+        result = np.full(len(values), np.nan)
+        for i, value in enumerate(values):
+            try:
+                result[i] = float(value)
+            except ValueError:
+                pass
+        return result
+
+
+def _iter_csv(file_path: str, lat_column: str, lng_column: str, chunk_size: int,
+              delimiter: str) -> Iterator[tuple[list[str], list[list[str]], np.ndarray, np.ndarray]]:
+    """
+    :return: 逐段產生 (header, 各列, 緯度陣列, 經度陣列)
+    """
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as input_file:
+        reader = csv.reader(input_file, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        for column in (lat_column, lng_column):
+            if column not in header:
+                raise ValueError(f"Column {column!r} not found in {file_path}: {header}")
+        lat_index, lng_index = header.index(lat_column), header.index(lng_column)
+        while True:
+            rows = [row for _, row in zip(range(chunk_size), reader)]
+            if not rows:
+                return
+            width = len(header)
+            lat = _to_float([row[lat_index] if len(row) == width else "" for row in rows])
+            lng = _to_float([row[lng_index] if len(row) == width else "" for row in rows])
+            yield header, rows, lat, lng
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet input/output requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _iter_parquet(file_path: str, lat_column: str, lng_column: str,
+                  chunk_size: int) -> Iterator[tuple[Any, np.ndarray, np.ndarray]]:
+    """
+    :return: 逐段產生 (pyarrow.RecordBatch, 緯度陣列, 經度陣列)
+    """
+    pa = _import_pyarrow()
+    parquet_file = pa.parquet.ParquetFile(file_path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        coordinates = []
+        for column in (lat_column, lng_column):
+            if column not in batch.schema.names:
+                raise ValueError(f"Column {column!r} not found in {file_path}: {batch.schema.names}")
+            array = batch.column(column).cast(pa.float64(), safe=False)
+            coordinates.append(array.to_numpy(zero_copy_only=False).astype(np.float64))
+        yield batch, coordinates[0], coordinates[1]
+
+
+class BatchGeocoder:
+    """
+    將最近行政區的欄位加到一段段的資料上
+    """
+
+    def __init__(self, area_codes_path: str = AREA_CODES_JSON, columns: tuple[str, ...] = DEFAULT_COLUMNS,
+                 distance: bool = True, workers: int = 0):
+        """
+        :param area_codes_path: AREA_CODES.json
+        :param columns: 要加上的 area 欄位
+        :param distance: 是否加上與中心點的距離 (公里)
+        :param workers: 計算最近行政區的 process 數，0 表示在主行程計算
+        """
+        self.area_codes_path = area_codes_path
+        self.geocoder = ReverseGeocoder.from_json(area_codes_path)
+        self.columns = tuple(columns)
+        self.distance = distance
+        self.workers = workers
+        # 每個欄位的值陣列，最後一個為查無行政區 (index -1) 時的空值
+        self._values = {column: np.array([str(area.get(column, "")) for area in self.geocoder.areas] + [""],
+                                         dtype=object)
+                        for column in self.columns}
+
+    @property
+    def output_columns(self) -> list[str]:
+        return list(self.columns) + ([DISTANCE_COLUMN] if self.distance else [])
+
+    def lookup(self, indices: np.ndarray, km: np.ndarray) -> dict[str, np.ndarray]:
+        """
+        :return: {欄位名稱: 值陣列}，查無行政區的列為空字串，距離為 nan
+        """
+        result = {column: values[indices] for column, values in self._values.items()}
+        if self.distance:
+            result[DISTANCE_COLUMN] = np.round(km, 3)
+        return result
+
+    def _map(self, chunks: Iterator[tuple], executor: ProcessPoolExecutor | None) -> Iterator[tuple]:
+        """
+        依輸入順序產生 (chunk, indices, km)，使用 process pool 時同時處理中的段數上限為 2 * workers
+        """
+        if executor is None:
+            for chunk in chunks:
+                yield (chunk, *self.geocoder.query(chunk[-2], chunk[-1]))
+            return
+
+        pending: deque[tuple[tuple, Future]] = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(_worker_query, chunk[-2], chunk[-1])))
+            if len(pending) >= 2 * self.workers:
+                done, future = pending.popleft()
+                yield (done, *future.result())
+        while pending:
+            done, future = pending.popleft()
+            yield (done, *future.result())
+
+    def geocode_file(self, input_path: str, output_path: str, lat_column: str = "latitude",
+                     lng_column: str = "longitude", chunk_size: int = 100_000, delimiter: str = ",") -> dict:
+        """
+        :param input_path: CSV 或 Parquet (.parquet / .pq) 檔案
+        :param output_path: 輸出檔案，格式依副檔名決定
+        :param lat_column: 緯度欄位名稱
+        :param lng_column: 經度欄位名稱
+        :param chunk_size: 每段筆數
+        :param delimiter: CSV 分隔字元
+        :return: {"rows", "matched", "seconds", "rows_per_second"}
+        """
+        parquet_input = input_path.endswith((".parquet", ".pq"))
+        parquet_output = output_path.endswith((".parquet", ".pq"))
+        if parquet_input:
+            chunks = _iter_parquet(input_path, lat_column, lng_column, chunk_size)
+        else:
+            chunks = _iter_csv(input_path, lat_column, lng_column, chunk_size, delimiter)
+
+        executor = None
+        if self.workers > 0:
+            executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                           initargs=(self.area_codes_path,))
+        tmp_path = f"{output_path}.tmp"
+        rows = matched = 0
+        start = time.perf_counter()
+        try:
+            with _Writer(tmp_path, parquet_output, self.output_columns, delimiter) as writer:
+                for chunk, indices, km in self._map(chunks, executor):
+                    writer.write(chunk, parquet_input, self.lookup(indices, km))
+                    rows += indices.size
+                    matched += int((indices >= 0).sum())
+                    logger.debug(f"{rows:,} rows, {rows / (time.perf_counter() - start):,.0f} rows/s")
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        seconds = time.perf_counter() - start
+        stats = {"rows": rows, "matched": matched, "seconds": seconds,
+                 "rows_per_second": rows / seconds if seconds > 0 else 0.0}
+        logger.info(f"Geocoded {rows:,} rows ({matched:,} matched) in {seconds:.2f} s: "
+                    f"{stats['rows_per_second']:,.0f} rows/s")
+        return stats
+
+
+class _Writer:
+    """
+    逐段寫出 CSV 或 Parquet
+    """
+
+    def __init__(self, file_path: str, parquet: bool, columns: list[str], delimiter: str):
+        self.file_path = file_path
+        self.parquet = parquet
+        self.columns = columns
+        self.delimiter = delimiter
+        self._file = None
+        self._csv = None
+        self._parquet_writer = None
+
+    def __enter__(self) -> _Writer:
+        if not self.parquet:
+            self._file = open(self.file_path, "w", encoding="utf-8", newline="")
+            self._csv = csv.writer(self._file, delimiter=self.delimiter)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._file is not None:
+            self._file.close()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+    def write(self, chunk: tuple, parquet_input: bool, values: dict[str, np.ndarray]) -> None:
+        if self.parquet:
+            self._write_parquet(chunk, parquet_input, values)
+            return
+
+        if parquet_input:
+            batch = chunk[0]
+            header = batch.schema.names
+            rows = [list(row.values()) for row in batch.to_pylist()]
+        else:
+            header, rows = chunk[0], chunk[1]
+        if self._csv is not None and self._file.tell() == 0:
+            self._csv.writerow(list(header) + self.columns)
+        extra = []
+        for column in self.columns:
+            array = values[column]
+            if column == DISTANCE_COLUMN:
+                missing = np.isnan(array)
+                array = array.astype(object)
+                array[missing] = ""
+            extra.append(array.tolist())
+        self._csv.writerows(row + list(added) for row, added in zip(rows, zip(*extra)))
+
+    def _write_parquet(self, chunk: tuple, parquet_input: bool, values: dict[str, np.ndarray]) -> None:
+        pa = _import_pyarrow()
+        if parquet_input:
+            batch = chunk[0]
+            arrays, names = list(batch.columns), list(batch.schema.names)
+        else:
+            header, rows = chunk[0], chunk[1]
+            arrays = [pa.array([row[i] if i < len(row) else None for row in rows], pa.string())
+                      for i in range(len(header))]
+            names = list(header)
+        for column in self.columns:
+            if column == DISTANCE_COLUMN:
+                km = values[column]
+                arrays.append(pa.array(km, pa.float64(), mask=np.isnan(km)))
+            else:
+                arrays.append(pa.array([value or None for value in values[column]], pa.string()))
+            names.append(column)
+        table = pa.Table.from_arrays(arrays, names=names)
+        if self._parquet_writer is None:
+            self._parquet_writer = pa.parquet.ParquetWriter(self.file_path, table.schema)
+        self._parquet_writer.write_table(table)
+
+
+def geocode_file(input_path: str, output_path: str, area_codes_path: str = AREA_CODES_JSON,
+                 lat_column: str = "latitude", lng_column: str = "longitude", chunk_size: int = 100_000,
+                 workers: int = 0, columns: tuple[str, ...] = DEFAULT_COLUMNS, distance: bool = True,
+                 delimiter: str = ",") -> dict:
+    """
+    批次反查輸入檔每一列的最近行政區 (參數見 BatchGeocoder)
+
+    :return: {"rows", "matched", "seconds", "rows_per_second"}
+    """
+    geocoder = BatchGeocoder(area_codes_path, columns, distance, workers)
+    return geocoder.geocode_file(input_path, output_path, lat_column, lng_column, chunk_size, delimiter)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Tag CSV/Parquet rows with the nearest district of their coordinates")
+    parser.add_argument("input", help="Input CSV or Parquet (.parquet) file")
+    parser.add_argument("output", help="Output CSV or Parquet (.parquet) file")
+    parser.add_argument("-f", "--file", default=AREA_CODES_JSON,
+                        help=f"AREA_CODES.json path. default: {AREA_CODES_JSON}")
+    parser.add_argument("--lat", default="latitude", help="Latitude column. default: latitude")
+    parser.add_argument("--lng", default="longitude", help="Longitude column. default: longitude")
+    parser.add_argument("--columns", default=",".join(DEFAULT_COLUMNS),
+                        help=f"Area fields to add, comma separated. default: {','.join(DEFAULT_COLUMNS)}")
+    parser.add_argument("--no-distance", action="store_true", help=f"Do not add the {DISTANCE_COLUMN} column")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per chunk. default: 100000")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Processes computing the nearest district, 0 to compute in the main process. default: 0")
+    parser.add_argument("--delimiter", default=",", help="CSV delimiter. default: ,")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log progress of every chunk")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    stats = geocode_file(args.input, args.output, area_codes_path=args.file, lat_column=args.lat,
+                         lng_column=args.lng, chunk_size=args.chunk_size, workers=args.workers,
+                         columns=tuple(c for c in args.columns.split(",") if c), distance=not args.no_distance,
+                         delimiter=args.delimiter)
+    print(json.dumps(stats))
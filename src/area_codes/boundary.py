@@ -0,0 +1,378 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import logging
+import math
+import os
+import struct
+from typing import Any, Iterable
+
+import numpy as np
+
+try:
+    from .reverse_geocode import ReverseGeocoder
+except ImportError:
+    from reverse_geocode import ReverseGeocoder
+
+logger = logging.getLogger(__name__)
+
+"""
+以行政區界線 (polygon) 反查經緯度所在的行政區
+
+ReverseGeocoder 以最近的中心點判斷行政區，在行政區交界附近或狹長的鄉鎮會判斷錯誤；
+BoundaryGeocoder 使用另外提供的行政區界線檔 (GeoJSON 或 shapefile，以 geo_code_103 為 key)：
+
+- 每個 ring (外框、內洞、多個島嶼各自為一個 ring) 的外接矩形以 STR (Sort-Tile-Recursive) 打包成 R-tree
+- 查詢時以 R-tree 找出外接矩形包含該點的 ring，再以 ray casting 判斷點是否在 ring 內，
+  同一行政區內包含該點的 ring 數為奇數時即在該行政區內 (even-odd rule，內洞與多島嶼都不需特別處理)
+- 不在任何 polygon 內 (界線檔未涵蓋、海上) 的點才改用 ReverseGeocoder 的最近中心點
+
+界線檔不隨套件提供，需自行下載放在本機，例如內政部國土測繪中心的鄉鎮市區界線；
+屬性欄位若不是 geo_code_103，以 code_property 指定
+
+    geocoder = BoundaryGeocoder.from_files(area_codes, ["towns.geojson"], code_property="geo_code_103")
+    geocoder.get_data_by_latlng(25.0324, 121.5198)           # area dict
+    indices, inside = geocoder.query(lat_array, lng_array)   # NumPy 批次查詢，inside 為是否落在 polygon 內
+"""
+
+Area = dict[str, Any]
+Ring = np.ndarray   # shape (n, 2)，(經度, 緯度)
+
+SHAPE_POLYGON_TYPES = (5, 15, 25)   # Polygon, PolygonZ, PolygonM
+
+
+def _geojson_rings(geometry: dict) -> list[Ring]:
+    geometry_type = geometry.get("type")
+    if geometry_type == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry_type == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    elif geometry_type == "GeometryCollection":
+        return [ring for g in geometry.get("geometries", []) for ring in _geojson_rings(g)]
+    else:
+        return []
+    return [np.asarray(ring, dtype=np.float64)[:, :2] for polygon in polygons for ring in polygon if len(ring) >= 3]
+
+
+def load_geojson(file_path: str, code_property: str = "geo_code_103") -> dict[str, list[Ring]]:
+    """
+    :param file_path: GeoJSON 檔案 (FeatureCollection 或單一 Feature)
+    :param code_property: properties 中行政區代碼的欄位名稱
+    :return: {行政區代碼: [ring, ...]}
+    """
+    with open(file_path, "r", encoding="utf-8") as input_file:
+        data = json.load(input_file)
+    features = data.get("features", []) if data.get("type") == "FeatureCollection" else [data]
+
+    boundaries: dict[str, list[Ring]] = {}
+    for feature in features:
+        code = (feature.get("properties") or {}).get(code_property)
+        if code is None or not feature.get("geometry"):
+            continue
+        boundaries.setdefault(f"{code}", []).extend(_geojson_rings(feature["geometry"]))
+    return boundaries
+
+
+def _read_dbf(file_path: str, encoding: str) -> list[dict[str, str]]:
+    with open(file_path, "rb") as input_file:
+        data = input_file.read()
+    count, header_size, record_size = struct.unpack_from("<IHH", data, 4)
+    fields = []
+    offset = 32
+    while data[offset] != 0x0D:
+        name = data[offset: offset + 11].split(b"\x00", 1)[0].decode("ascii")
+        fields.append((name, data[offset + 16]))
+        offset += 32
+
+    records = []
+    for i in range(count):
+        start = header_size + i * record_size
+        position = start + 1
+        record = {}
+        for name, length in fields:
+            record[name] = data[position: position + length].decode(encoding, errors="replace").strip()
+            position += length
+        records.append(record)
+    return records
+
+
+def _read_shp(file_path: str) -> list[list[Ring]]:
+    with open(file_path, "rb") as input_file:
+        data = input_file.read()
+    shapes = []
+    offset = 100
+    while offset + 8 <= len(data):
+        _, content_words = struct.unpack_from(">ii", data, offset)
+        content = offset + 8
+        offset = content + content_words * 2
+        shape_type = struct.unpack_from("<i", data, content)[0]
+        if shape_type not in SHAPE_POLYGON_TYPES:
+            shapes.append([])
+            continue
+        num_parts, num_points = struct.unpack_from("<ii", data, content + 36)
+        parts = list(struct.unpack_from(f"<{num_parts}i", data, content + 44)) + [num_points]
+        points = np.frombuffer(data, dtype="<f8", count=num_points * 2,
+                               offset=content + 44 + num_parts * 4).reshape(-1, 2)
+        shapes.append([points[parts[i]: parts[i + 1]].astype(np.float64)
+                       for i in range(num_parts) if parts[i + 1] - parts[i] >= 3])
+    return shapes
+
+
+def load_shapefile(file_path: str, code_property: str = "geo_code_103",
+                   encoding: str | None = None) -> dict[str, list[Ring]]:
+    """
+    讀取 Polygon shapefile (.shp 與同名的 .dbf)
+
+    :param file_path: .shp 檔案
+    :param code_property: .dbf 中行政區代碼的欄位名稱
+    :param encoding: .dbf 文字編碼，未指定時讀取 .cpg，沒有 .cpg 時為 utf-8
+    :return: {行政區代碼: [ring, ...]}
+    """
+    base = os.path.splitext(file_path)[0]
+    if encoding is None:
+        encoding = "utf-8"
+        if os.path.exists(f"{base}.cpg"):
+            with open(f"{base}.cpg", "r", encoding="ascii") as input_file:
+                encoding = input_file.read().strip() or encoding
+
+    boundaries: dict[str, list[Ring]] = {}
+    for record, rings in zip(_read_dbf(f"{base}.dbf", encoding), _read_shp(file_path)):
+        code = record.get(code_property)
+        if code:
+            boundaries.setdefault(code, []).extend(rings)
+    return boundaries
+
+
+def load_boundaries(paths: Iterable[str], code_property: str = "geo_code_103",
+                    encoding: str | None = None) -> dict[str, list[Ring]]:
+    """
+    依副檔名讀取 GeoJSON (.geojson、.json) 或 shapefile (.shp)
+
+    :return: {行政區代碼: [ring, ...]}，多個檔案中相同代碼的 ring 會合併
+    """
+    boundaries: dict[str, list[Ring]] = {}
+    for path in paths:
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".shp":
+            loaded = load_shapefile(path, code_property, encoding)
+        elif ext in (".geojson", ".json"):
+            loaded = load_geojson(path, code_property)
+        else:
+            raise ValueError(f"Unsupported boundary file: {path}")
+        for code, rings in loaded.items():
+            boundaries.setdefault(code, []).extend(rings)
+    return boundaries
+
+
+def _str_order(boxes: np.ndarray, node_size: int) -> np.ndarray:
+    """
+    STR 排序：依中心點經度切成 sqrt(節點數) 個直條，每個直條內再依緯度排序
+
+    :param boxes: shape (n, 4)，(min_x, min_y, max_x, max_y)
+    :return: 排序後的 index
+    """
+    n = len(boxes)
+    slab_count = math.ceil(math.sqrt(math.ceil(n / node_size)))
+    slab_size = slab_count * node_size
+    center_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    center_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    order = np.argsort(center_x, kind="stable")
+    for start in range(0, n, slab_size):
+        slab = order[start: start + slab_size]
+        order[start: start + slab_size] = slab[np.argsort(center_y[slab], kind="stable")]
+    return order
+
+
+class STRtree:
+    """
+    以 STR 打包的靜態 R-tree，只支援點查詢，查詢以 NumPy 逐層批次展開
+    """
+
+    def __init__(self, boxes: np.ndarray, node_size: int = 16):
+        """
+        :param boxes: shape (n, 4)，(min_x, min_y, max_x, max_y)
+        :param node_size: 每個節點的子節點數
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if not len(boxes):
+            raise ValueError("boxes is empty")
+        self.node_size = node_size
+        self._order = _str_order(boxes, node_size)
+        self._boxes = boxes[self._order]
+
+        # levels[0] 為葉節點，子節點範圍指向 self._boxes；最後一層只有 root
+        self.levels: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        items = self._boxes
+        while True:
+            starts = np.arange(0, len(items), node_size)
+            ends = np.minimum(starts + node_size, len(items))
+            node_boxes = np.column_stack([np.minimum.reduceat(items[:, 0], starts),
+                                          np.minimum.reduceat(items[:, 1], starts),
+                                          np.maximum.reduceat(items[:, 2], starts),
+                                          np.maximum.reduceat(items[:, 3], starts)])
+            if len(node_boxes) > 1:
+                order = _str_order(node_boxes, node_size)
+                node_boxes, starts, ends = node_boxes[order], starts[order], ends[order]
+            self.levels.append((node_boxes, starts, ends))
+            if len(node_boxes) == 1:
+                break
+            items = node_boxes
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    @staticmethod
+    def _contains(boxes: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return (boxes[:, 0] <= x) & (x <= boxes[:, 2]) & (boxes[:, 1] <= y) & (y <= boxes[:, 3])
+
+    def query_points(self, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :param x: 點的 x 座標陣列
+        :param y: 點的 y 座標陣列
+        :return: (點 index 陣列, box index 陣列)，每一對表示該點落在該 box 內
+        """
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        points = np.arange(x.size)
+        nodes = np.zeros(x.size, dtype=np.intp)
+        for node_boxes, starts, ends in reversed(self.levels):
+            keep = self._contains(node_boxes[nodes], x[points], y[points])
+            points, nodes = points[keep], nodes[keep]
+            counts = ends[nodes] - starts[nodes]
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            points = np.repeat(points, counts)
+            nodes = np.repeat(starts[nodes], counts) + offsets
+
+        keep = self._contains(self._boxes[nodes], x[points], y[points])
+        return points[keep], self._order[nodes[keep]]
+
+
+def points_in_ring(ring: Ring, x: np.ndarray, y: np.ndarray, chunk_size: int = 1 << 20) -> np.ndarray:
+    """
+    ray casting：自點往 +x 方向的射線與 ring 的邊相交奇數次即在 ring 內
+
+    :param ring: shape (n, 2)，首尾可相同也可不同
+    :param chunk_size: 每次計算的 點數 x 邊數 上限，用來限制暫存陣列的記憶體用量
+    :return: bool 陣列
+    """
+    x1, y1 = ring[:, 0], ring[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    inside = np.zeros(x.size, dtype=bool)
+    step = max(1, chunk_size // len(ring))
+    for start in range(0, x.size, step):
+        px, py = x[start: start + step, None], y[start: start + step, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crosses = ((y1 > py) != (y2 > py)) & (px < (x2 - x1) * (py - y1) / (y2 - y1) + x1)
+        inside[start: start + step] = crosses.sum(axis=1) % 2 == 1
+    return inside
+
+
+class BoundaryGeocoder:
+    """
+    以行政區界線判斷經緯度所在的行政區，不在任何界線內時改用最近中心點
+    """
+
+    def __init__(self, area_codes: dict[str, Area], boundaries: dict[str, list[Ring]], node_size: int = 16,
+                 fallback: ReverseGeocoder | None = None):
+        """
+        :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+        :param boundaries: {geo_code_103: [ring, ...]}，ring 為 (經度, 緯度) 的 shape (n, 2) 陣列
+        :param node_size: R-tree 每個節點的子節點數
+        :param fallback: 最近中心點查詢，未指定時以 area_codes 建立
+        """
+        self.keys: list[str] = list(area_codes.keys())
+        self.areas: list[Area] = list(area_codes.values())
+        self.fallback = fallback or ReverseGeocoder(area_codes)
+
+        area_by_code = {}
+        for i, area in enumerate(self.areas):
+            if area.get("geo_code_103"):
+                area_by_code.setdefault(area["geo_code_103"], i)
+
+        self._rings: list[Ring] = []
+        ring_areas = []
+        for code, rings in boundaries.items():
+            if code not in area_by_code:
+                logger.warning(f"Boundary {code} not in area codes, ignored")
+                continue
+            for ring in rings:
+                self._rings.append(np.asarray(ring, dtype=np.float64)[:, :2])
+                ring_areas.append(area_by_code[code])
+        if not self._rings:
+            raise ValueError("No boundary matches area codes")
+        self._ring_areas = np.array(ring_areas, dtype=np.intp)
+
+        boxes = np.array([(r[:, 0].min(), r[:, 1].min(), r[:, 0].max(), r[:, 1].max()) for r in self._rings])
+        self.tree = STRtree(boxes, node_size)
+        self.covered_codes = {self.areas[i]["geo_code_103"] for i in set(ring_areas)}
+        logger.debug(f"BoundaryGeocoder built: {len(self.covered_codes)} areas, {len(self._rings)} rings, "
+                     f"{len(self.tree.levels)} tree levels")
+
+    @classmethod
+    def from_files(cls, area_codes: dict[str, Area], paths: Iterable[str], code_property: str = "geo_code_103",
+                   encoding: str | None = None, **kwargs) -> BoundaryGeocoder:
+        """
+        :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+        :param paths: GeoJSON 或 shapefile 路徑
+        :param code_property: 界線檔中 geo_code_103 的欄位名稱
+        :param encoding: shapefile .dbf 的文字編碼
+        """
+        return cls(area_codes, load_boundaries(paths, code_property, encoding), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.areas)
+
+    def get_data_by_latlng(self, latitude: float, longitude: float) -> Area | None:
+        """
+        :return: 經緯度所在的行政區 area dict，不在界線內時為最近中心點的行政區，經緯度不合法時回傳 None
+        """
+        index, _ = self.locate(latitude, longitude)
+        return self.areas[index] if index >= 0 else None
+
+    def locate(self, latitude: float, longitude: float) -> tuple[int, bool]:
+        """
+        :return: (areas 中的 index, 是否落在 polygon 內)，經緯度不合法時回傳 (-1, False)
+        """
+        indices, inside = self.query(np.array([latitude]), np.array([longitude]))
+        return int(indices[0]), bool(inside[0])
+
+    def query(self, latitudes: np.ndarray, longitudes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        批次查詢
+
+        :param latitudes: 緯度陣列
+        :param longitudes: 經度陣列
+        :return: (areas 中的 index 陣列, 是否落在 polygon 內的 bool 陣列)，經緯度不合法的點 index 為 -1
+        """
+        lat = np.asarray(latitudes, dtype=np.float64).ravel()
+        lng = np.asarray(longitudes, dtype=np.float64).ravel()
+        if lat.shape != lng.shape:
+            raise ValueError(f"latitudes and longitudes shape mismatch: {lat.shape} != {lng.shape}")
+
+        points, rings = self.tree.query_points(lng, lat)
+        hit_points, hit_areas = [], []
+        if points.size:
+            order = np.argsort(rings, kind="stable")
+            points, rings = points[order], rings[order]
+            bounds = np.flatnonzero(np.diff(rings)) + 1
+            for group_points, ring in zip(np.split(points, bounds), rings[np.r_[0, bounds]]):
+                inside = points_in_ring(self._rings[ring], lng[group_points], lat[group_points])
+                hit_points.append(group_points[inside])
+                hit_areas.append(np.full(int(inside.sum()), self._ring_areas[ring], dtype=np.intp))
+
+        indices = np.full(lat.size, -1, dtype=np.intp)
+        inside = np.zeros(lat.size, dtype=bool)
+        if hit_points:
+            # 同一行政區內包含該點的 ring 數為奇數才算在該行政區內；重疊時取 index 較小的行政區
+            pairs, counts = np.unique(np.column_stack([np.concatenate(hit_points), np.concatenate(hit_areas)]),
+                                      axis=0, return_counts=True)
+            pairs = pairs[counts % 2 == 1]
+            if len(pairs):
+                first = np.r_[True, pairs[1:, 0] != pairs[:-1, 0]]
+                indices[pairs[first, 0]] = pairs[first, 1]
+                inside[pairs[first, 0]] = True
+
+        missing = np.flatnonzero(~inside)
+        if missing.size:
+            indices[missing], _ = self.fallback.query(lat[missing], lng[missing])
+        return indices, inside
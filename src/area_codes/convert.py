@@ -1,19 +1,34 @@
 # -*- coding:utf-8 -*-
 from __future__ import annotations
+import datetime
 import os
 from io import BytesIO
-import requests
 import json
 # import pandas as pd
-import xlrd
-from openpyxl import load_workbook
-import xmltodict
-import xml
+from typing import IO, Iterator, NamedTuple
 import xml.etree.ElementTree as ET
 import argparse
+import zipfile
+
+try:
+    from .download import DOWNLOAD_TIMEOUT, fetch_sources, is_unchanged, is_url, record_build
+    from .incremental import rebuild as incremental_rebuild, save_changeset, save_state
+    from .profiling import CountingReader, PipelineStats, StageStats
+    from .snapshot import write_snapshot
+    from .vintage import VintageStore
+    from .writer import FORMATS, load_output, write_output
+    from .xlsx_reader import XlsxReader
+except ImportError:
+    from download import DOWNLOAD_TIMEOUT, fetch_sources, is_unchanged, is_url, record_build
+    from incremental import rebuild as incremental_rebuild, save_changeset, save_state
+    from profiling import CountingReader, PipelineStats, StageStats
+    from snapshot import write_snapshot
+    from vintage import VintageStore
+    from writer import FORMATS, load_output, write_output
+    from xlsx_reader import XlsxReader
 
 import logging
-logging.basicConfig(level=logging.DEBUG)
+# logging 由呼叫端設定，CLI 執行時才在 __main__ 中設定
 logger = logging.getLogger(__name__)
 
 """
@@ -90,14 +105,71 @@ area_geo_code_file = "行政區代碼表_Taiwan_Geocode.xlsx"
 area_code_json_file = "AREA_CODES.json"
 
 
-def fetch_geoxml(file_path: str=g_path) -> list:
+class GeoArea(NamedTuple):
+    zip_code: str
+    area_name: str
+    longitude: float
+    latitude: float
+    tgos_url: str = ""
+
+
+def _local_name(tag: str) -> str:
+    return tag[tag.find("}") + 1:]
+
+
+def _iter_geoxml_rows(source: str | IO[bytes]) -> Iterator[dict]:
+    """
+    以 iterparse 逐筆讀取 `行政區經緯度` XML，每讀完一筆 `dataroot` 底下的資料即回傳並釋放該節點，
+    記憶體用量不隨檔案大小成長
+
+    :param source: 檔案路徑或 binary file object (例如 requests 的 response.raw)
+    :return: {"行政區名": ..., "_x0033_碼郵遞區號": ..., "中心點經度": ..., "中心點緯度": ..., "TGOS_URL": ...}
+    """
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 1:
+            row = {_local_name(child.tag): (child.text or "").strip() for child in elem}
+            root.clear()
+            if "_x0033_碼郵遞區號" in row:
+                yield row
+
+
+def iter_geoxml(source: str | bytes | IO[bytes], with_tgos_url: bool = False) -> Iterator[GeoArea]:
+    """
+    串流解析 `行政區經緯度` XML，依檔案順序回傳 GeoArea
+
+    :param source: 檔案路徑、bytes 或 binary file object (例如 requests 的 response.raw)
+    :param with_tgos_url: 是否保留 TGOS_URL 欄位
+    :return: Iterator[GeoArea]
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+
+    for row in _iter_geoxml_rows(source):
+        yield GeoArea(zip_code=row["_x0033_碼郵遞區號"],
+                      area_name=row.get("行政區名", ""),
+                      longitude=float(row["中心點經度"]),
+                      latitude=float(row["中心點緯度"]),
+                      tgos_url=row.get("TGOS_URL", "") if with_tgos_url else "")
+
+
+def fetch_geoxml(file_path: str=g_path, stage: StageStats | None = None) -> list:
     """
     Step 1
-    開啟 `行政區經緯度` 檔案，將 xml 轉為 dict 格式
+    開啟 `行政區經緯度` 檔案，以 iterparse 單次串流解析
     提取取出檔案中 `dataroot` 內的 `_x0031_050429_行政區經緯度_x0028_toPost_x0029_` 資料
     並依郵遞區號排序
 
     :param file_path: XML 檔案
+    :param stage: 量測用，記錄下載或讀取的 bytes 數
     :return: list
     [
         {
@@ -109,68 +181,58 @@ def fetch_geoxml(file_path: str=g_path) -> list:
         },...
     ]
     """
-
-    def _get_ns(_root: xml.etree.ElementTree.Element) -> str:
-        ret_ns = ""
-        if _root.tag.find("{") == 0 and _root.tag.find("}"):
-            ret_ns = xml_root.tag[xml_root.tag.find("{") + 1: xml_root.tag.find("}")]
-
-        return ret_ns
-
-    content = ""
-    if file_path.find("http") >= 0:
+    if is_url(file_path):
+        import requests
         logger.debug(f"Download GeoXML from: {file_path}")
-        response = requests.get(file_path)
+        response = requests.get(file_path, timeout=DOWNLOAD_TIMEOUT, stream=True)
         if response.status_code == 200:
-            content = response.content.decode("utf-8")
+            response.raw.decode_content = True
+            source = CountingReader(response.raw, stage)
         else:
             logger.debug(f"Download GeoXML error: {response.status_code}: {response.content}")
             exit(1)
     else:
         if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as input_file:
-                content = input_file.read()
+            source = file_path
+            if stage is not None:
+                stage.bytes_read += os.path.getsize(file_path)
         else:
             logger.debug(f"File not found: {file_path}")
             exit(1)
 
-    area_list = []
-    xml_root = None
-    if content:
-        if content.find("<?xml") != 0:
-            logger.error("XML format error")
-            exit(1)
-        else:
-            xml_root = ET.fromstring(content)
-
-        ns = _get_ns(xml_root)
-        root_dict = xmltodict.parse(content, process_namespaces=True, namespaces={ns: None})
-
-        area_list = sorted(root_dict.get("dataroot", {}).get("_x0031_050429_行政區經緯度_x0028_toPost_x0029_", []),
-                           key=lambda x: x['_x0033_碼郵遞區號'])
+    try:
+        area_list = sorted(_iter_geoxml_rows(source), key=lambda x: x['_x0033_碼郵遞區號'])
+    except ET.ParseError as e:
+        logger.error(f"XML format error: {e}")
+        exit(1)
 
     logger.debug(f"Total {len(area_list)} area codes.")
     return area_list
 
 
-def fetch_enname(file_path: str=e_path) -> list:
+def fetch_enname(file_path: str=e_path, stage: StageStats | None = None) -> list:
     """
     Step 2
     開啟 `county_h_10706.xls` 檔案，將 xls 轉為 list 格式
     提取取出檔案中 `鄉鎮` 頁籤內的 `A` 欄(郵遞區號)、`B` 欄(中文名稱)、`C` 欄(英文名稱) 欄位
 
     :param file_path: CSV 檔案
+    :param stage: 量測用，記錄下載或讀取的 bytes 數
     :return: list
     [[100, '臺北市中正區', 'Zhongzheng Dist., Taipei City'], [103, '臺北市大同區', 'Datong Dist., Taipei City'],...]
     """
+    import xlrd
 
-    if file_path.find("http") >= 0:
+    if is_url(file_path):
+        import requests
         logger.debug(f"Download English Name from: {file_path}")
-        response = requests.get(file_path)
+        response = requests.get(file_path, timeout=DOWNLOAD_TIMEOUT)
         response.raise_for_status()  # 確保請求成功
         if response.status_code == 200:
             # 使用BytesIO讀取下載的內容
             data = BytesIO(response.content)
+            if stage is not None:
+                stage.bytes_downloaded += len(response.content)
 
             # 使用xlrd讀取 XLS 文件
             workbook = xlrd.open_workbook(file_contents=data.read())
@@ -185,6 +247,8 @@ def fetch_enname(file_path: str=e_path) -> list:
     elif os.path.exists(file_path):
         # 使用pandas讀取 XLS 文件，指定用 usecols 參數只讀取 A、B、C 列
         workbook = xlrd.open_workbook(file_path)
+        if stage is not None:
+            stage.bytes_read += os.path.getsize(file_path)
         sheet_name = '縣市鄉鎮中英對照檔'
         sheet = workbook.sheet_by_name(sheet_name)
 
@@ -196,22 +260,27 @@ def fetch_enname(file_path: str=e_path) -> list:
     result_list = []
     # 將 sheet data 轉換 list
     column_indices = [0, 1, 2]
+    debug = logger.isEnabledFor(logging.DEBUG)
     for row_idx in range(sheet.nrows):
-        logger.debug(f"Row {row_idx + 1}: {[sheet.cell_value(row_idx, col_idx) for col_idx in column_indices]}")
-        result_list.append([sheet.cell_value(row_idx, col_idx) for col_idx in column_indices])
+        row = [sheet.cell_value(row_idx, col_idx) for col_idx in column_indices]
+        if debug:
+            logger.debug(f"Row {row_idx + 1}: {row}")
+        result_list.append(row)
 
     # 將 DataFrame 轉換 dlist to list
     # result_list = df.values.tolist()
     return result_list
 
 
-def fetch_areacode(file_path: str = a_path) -> dict:
+def fetch_areacode(file_path: str = a_path, stage: StageStats | None = None) -> dict:
     """
     Step 3
     開啟 `行政區代碼表` 檔案，將 excel 轉為 dict 格式
+    以 XlsxReader 唯讀串流讀取，只解壓縮 `縣市`、`鄉鎮` 兩個頁籤
     提取取出檔案中 `鄉鎮` 頁籤內的 `E` 欄(Taiwan_Geocode_103_鄉鎮代碼)、`G` 欄(Taiwan_Geocode_103_縣市鄉鎮名) 欄位
 
     :param file_path: Excel 檔案
+    :param stage: 量測用，記錄下載或讀取的 bytes 數
     :return: dict
     {
         "臺北市中正區": {
@@ -237,36 +306,42 @@ def fetch_areacode(file_path: str = a_path) -> dict:
     """
     logger.debug(f"Fetching area code from: {file_path}")
 
-    if file_path.startswith("http") >= 0:
+    if is_url(file_path):
+        import requests
         logger.debug(f"Download area data from: {file_path}")
-        response = requests.get(file_path)
+        response = requests.get(file_path, timeout=DOWNLOAD_TIMEOUT)
         response.raise_for_status()  # 確保請求成功
         if response.status_code == 200:
             # 使用BytesIO讀取下載的內容
             data = BytesIO(response.content)
-            # 打開 xlsx 檔案
-            workbook = load_workbook(filename=data)
-
+            if stage is not None:
+                stage.bytes_downloaded += len(response.content)
         else:
             logger.debug(f"Download 行政區代碼表 error: {response.status_code}: {response.content}")
             exit(1)
     elif os.path.exists(file_path):
-        workbook = load_workbook(file_path)
+        data = file_path
+        if stage is not None:
+            stage.bytes_read += os.path.getsize(file_path)
     else:
         logger.error(f"File not found: {file_path}")
         exit(1)
 
-    # 使用openpyxl讀取Excel文件
+    # 直接從 xlsx 的 zip 內串流讀取 `縣市`、`鄉鎮` 頁籤的指定欄位，不載入其他頁籤
+    try:
+        workbook = XlsxReader(data)
+    except (zipfile.BadZipFile, KeyError) as e:
+        logger.error(f"行政區代碼表 format error: {e}")
+        exit(1)
+
+    debug = logger.isEnabledFor(logging.DEBUG)
     county_data = {}
     sheet_name = '縣市'
-    sheet = workbook[sheet_name]
     # 讀取工作表中的指定欄位 (F, G, H, I)，忽略第一列
     # 縣市代碼|縣市英文名|縣市全名|縣市名
-    column_indices = [6, 7, 8, 9]  # F: 6, G: 7, H: 8, I: 9
-
-    # 忽略第一列，從第二列開始讀取資料
-    for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row, min_col=6, max_col=9, values_only=True):
-        logger.debug(row)
+    for row in workbook.iter_rows(sheet_name, min_row=2, min_col=6, max_col=9):
+        if debug:
+            logger.debug(row)
         county_data[row[3]] = {
             "geo_code_103": f"{row[0]}",
             "county_name_en": f"{row[1]}",
@@ -275,12 +350,9 @@ def fetch_areacode(file_path: str = a_path) -> dict:
 
     result_dict = {}
     sheet_name = '鄉鎮'
-    sheet = workbook[sheet_name]
     # 讀取工作表中的指定欄位 (E, F, G, H, I)，忽略第一列
     # 鄉鎮代碼|鄉鎮英文名|縣市鄉鎮名|縣市名|鄉鎮名
-    column_indices = [5, 6, 7, 8, 9]  # E: 5, F: 6, G: 7, H: 8, I: 9
-    # 忽略第一列，從第二列開始讀取資料
-    for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row, min_col=5, max_col=9, values_only=True):
+    for row in workbook.iter_rows(sheet_name, min_row=2, min_col=5, max_col=9):
         result_dict[row[2]] = {
             'geo_code_103': f"{row[0]}",
             'area_name': row[4],
@@ -290,13 +362,215 @@ def fetch_areacode(file_path: str = a_path) -> dict:
             'county_name_en': county_data.get(row[3], {}).get("county_name_en", ""),
             'county_geo_code_103': county_data.get(row[3], {}).get("geo_code_103", "")
         }
-        logger.debug(f"{row[2]} : {result_dict[row[2]]}")
+        if debug:
+            logger.debug(f"{row[2]} : {result_dict[row[2]]}")
+    workbook.close()
 
     return result_dict
 
 
+class MergeReport:
+    """
+    merge() 的比對結果
+
+    - geoxml_ambiguous: `行政區經緯度` 中重複出現的行政區名與次數
+    - enname_ambiguous: `縣市鄉鎮中英對照` 中重複出現的行政區名與次數 (以最後一筆為準)
+    - enname_unmatched_areas: 找不到英文名稱的行政區名
+    - enname_unmatched_rows: `縣市鄉鎮中英對照` 中沒有對應行政區的名稱
+    - areacode_unmatched_areas: 找不到行政區代碼的行政區名
+    - areacode_unmatched_rows: `行政區代碼表` 中沒有對應行政區的縣市鄉鎮名
+    """
+
+    def __init__(self):
+        self.geoxml_ambiguous: dict[str, int] = {}
+        self.enname_ambiguous: dict[str, int] = {}
+        self.enname_unmatched_areas: list[str] = []
+        self.enname_unmatched_rows: list[str] = []
+        self.areacode_unmatched_areas: list[str] = []
+        self.areacode_unmatched_rows: list[str] = []
+
+    def to_dict(self) -> dict:
+        return {
+            "geoxml_ambiguous": self.geoxml_ambiguous,
+            "enname_ambiguous": self.enname_ambiguous,
+            "enname_unmatched_areas": self.enname_unmatched_areas,
+            "enname_unmatched_rows": self.enname_unmatched_rows,
+            "areacode_unmatched_areas": self.areacode_unmatched_areas,
+            "areacode_unmatched_rows": self.areacode_unmatched_rows,
+        }
+
+    def summary(self) -> dict:
+        return {k: len(v) for k, v in self.to_dict().items()}
+
+    def is_clean(self) -> bool:
+        return not any(self.to_dict().values())
+
+
+def merge_geoxml(area_list: list, report: MergeReport) -> tuple[dict, dict[str, list[str]]]:
+    """
+    merge() 的第一步，以 fetch_geoxml() 的結果建立 AREA_CODES 的序號與座標，英文名稱與行政區代碼先留空
+
+    :param area_list: fetch_geoxml() 的回傳值
+    :param report: 記錄重複的行政區名
+    :return: (AREA_CODES dict, 行政區名 -> 序號 list)
+    """
+    area_code = {}
+    keys_by_name: dict[str, list[str]] = {}
+    for c, area in enumerate(area_list, start=1):
+        area_code[f"{c}"] = {
+            "zip_code": area["_x0033_碼郵遞區號"],
+            "area_name": area["行政區名"],
+            "area_name_en": "",
+            "geo_code_103": "",
+            "county_name": "",
+            "county_name_en": "",
+            "county_geo_code_103": "",
+            "county_full_name": "",
+            "city_name": "",
+            "city_name_en": "",
+            "longitude": float(area["中心點經度"]),
+            "latitude": float(area["中心點緯度"]),
+        }
+        keys_by_name.setdefault(area["行政區名"], []).append(f"{c}")
+    report.geoxml_ambiguous = {name: len(keys) for name, keys in keys_by_name.items() if len(keys) > 1}
+    return area_code, keys_by_name
+
+
+def merge_enname(area_code: dict, keys_by_name: dict[str, list[str]], enname_list: list,
+                 report: MergeReport) -> None:
+    """
+    merge() 的第二步，將 fetch_enname() 的英文名稱填入 area_code
+
+    :param area_code: merge_geoxml() 回傳的 AREA_CODES dict，直接修改
+    :param keys_by_name: merge_geoxml() 回傳的 行政區名 -> 序號 list
+    :param enname_list: fetch_enname() 的回傳值
+    :param report: 記錄重複與無法對應的行政區名
+    """
+    enname_by_name: dict[str, str] = {}
+    enname_count: dict[str, int] = {}
+    for row in enname_list:
+        enname_by_name[row[1]] = row[2]
+        enname_count[row[1]] = enname_count.get(row[1], 0) + 1
+    report.enname_ambiguous = {name: count for name, count in enname_count.items() if count > 1}
+    report.enname_unmatched_rows = [name for name in enname_by_name if name not in keys_by_name]
+
+    for area_name, keys in keys_by_name.items():
+        if area_name in enname_by_name:
+            for k in keys:
+                area_code[k]["area_name_en"] = enname_by_name[area_name]
+        else:
+            report.enname_unmatched_areas.append(area_name)
+
+
+def merge_areacode(area_code: dict, keys_by_name: dict[str, list[str]], geo_code_103: dict,
+                   report: MergeReport) -> None:
+    """
+    merge() 的第三步，將 fetch_areacode() 的縣市、鄉鎮名稱與行政區代碼填入 area_code
+
+    :param area_code: merge_geoxml() 回傳的 AREA_CODES dict，直接修改
+    :param keys_by_name: merge_geoxml() 回傳的 行政區名 -> 序號 list
+    :param geo_code_103: fetch_areacode() 的回傳值
+    :param report: 記錄無法對應的行政區名
+    """
+    for area_name, keys in keys_by_name.items():
+        if area_name in geo_code_103:
+            geo = geo_code_103[area_name]
+        else:
+            report.areacode_unmatched_areas.append(area_name)
+            geo = {}
+        for k in keys:
+            area_code[k]["county_name"] = geo.get("county_name", "")
+            area_code[k]["county_name_en"] = geo.get("county_name_en", "")
+            area_code[k]["county_geo_code_103"] = geo.get("county_geo_code_103", "")
+            area_code[k]["county_full_name"] = geo.get("county_full_name", "")
+            area_code[k]["city_name"] = geo.get("area_name", "")
+            area_code[k]["city_name_en"] = geo.get("area_name_en", "")
+            area_code[k]["geo_code_103"] = geo.get("geo_code_103", "")
+    report.areacode_unmatched_rows = [name for name in geo_code_103 if name not in keys_by_name]
+
+
+def merge(area_list: list, enname_list: list, geo_code_103: dict) -> tuple[dict, MergeReport]:
+    """
+    Step 4
+    以行政區名為 key 合併 fetch_geoxml()、fetch_enname()、fetch_areacode() 的結果
+
+    先以 `行政區經緯度` 建立 行政區名 -> 序號 的對照，再分別以 dict 查詢英文名稱與行政區代碼，
+    整體為 O(n + m)，並將兩邊無法對應或重複的 key 記錄在 MergeReport
+
+    :param area_list: fetch_geoxml() 的回傳值
+    :param enname_list: fetch_enname() 的回傳值
+    :param geo_code_103: fetch_areacode() 的回傳值
+    :return: (AREA_CODES dict, MergeReport)
+    """
+    report = MergeReport()
+    area_code, keys_by_name = merge_geoxml(area_list, report)
+    merge_enname(area_code, keys_by_name, enname_list, report)
+    merge_areacode(area_code, keys_by_name, geo_code_103, report)
+    return area_code, report
+
+
+def _write_extra_outputs(area_code: dict, snapshot_file: str | None = None, sqlite_file: str | None = None,
+                        neighbors_file: str | None = None, missing_only: bool = False) -> None:
+    """
+    輸出 snapshot、SQLite 資料庫與鄰近清單等附加檔案，寫入失敗時結束程式
+
+    :param area_code: AREA_CODES dict
+    :param missing_only: 只輸出尚不存在的檔案，用於 out_file 沒有變更 (來源未變更或 Changeset 為空) 時
+    """
+    if snapshot_file and not (missing_only and os.path.exists(snapshot_file)):
+        try:
+            content_hash = write_snapshot(area_code, snapshot_file)
+            logger.info(f"Snapshot {snapshot_file} written: {content_hash}")
+        except Exception as e:
+            logger.error(f"Write snapshot error: {e}")
+            exit(1)
+
+    if sqlite_file and not (missing_only and os.path.exists(sqlite_file)):
+        try:
+            from .sqlite_db import write_sqlite
+        except ImportError:
+            from sqlite_db import write_sqlite
+        try:
+            write_sqlite(area_code, sqlite_file)
+            logger.info(f"SQLite database {sqlite_file} written")
+        except Exception as e:
+            logger.error(f"Write SQLite database error: {e}")
+            exit(1)
+
+    if neighbors_file and not (missing_only and os.path.exists(neighbors_file)):
+        try:
+            from .neighbors import write_neighbors
+        except ImportError:
+            from neighbors import write_neighbors
+        try:
+            write_neighbors(area_code, neighbors_file)
+            logger.info(f"Neighbors {neighbors_file} written")
+        except Exception as e:
+            logger.error(f"Write neighbors error: {e}")
+            exit(1)
+
+
+def _record_vintage(area_code: dict, vintage_store: str, vintage_date: str | None, geoxml_path: str,
+                    areacode_path: str, enname_path: str, stats: PipelineStats) -> None:
+    """
+    將本次結果記錄為一個 vintage，相同日期時取代該 vintage，重複執行結果相同
+    """
+    with stats.stage("vintage") as stage:
+        store = VintageStore.from_json(vintage_store)
+        store.add_vintage(area_code, vintage_date or datetime.date.today(),
+                          sources={"geoxml": os.path.basename(geoxml_path),
+                                   "areacode": os.path.basename(areacode_path),
+                                   "enname": os.path.basename(enname_path)})
+        store.save(vintage_store)
+        stage.rows = len(area_code)
+
+
 def convert(geoxml_path: str = g_path, areacode_path: str = a_path, enname_path: str = e_path,
-            out_file: str = area_code_json_file, write_file: bool = True) -> dict:
+            out_file: str = area_code_json_file, write_file: bool = True, cache_dir: str | None = None,
+            snapshot_file: str | None = None, incremental: bool = False, stats: PipelineStats | None = None,
+            vintage_store: str | None = None, vintage_date: str | None = None,
+            sqlite_file: str | None = None, output_format: str = "pretty", parallel: bool = False,
+            neighbors_file: str | None = None) -> dict:
     """
     Convert the data to AREA_CODES.json format
 
@@ -305,6 +579,21 @@ def convert(geoxml_path: str = g_path, areacode_path: str = a_path, enname_path:
     :param enname_path:
     :param out_file:
     :param write_file:
+    :param cache_dir: 指定時以平行、條件式請求下載來源檔並快取於此目錄，
+                      若三個來源與輸出檔都和上一次相同，則略過解析直接回傳 out_file 的內容
+    :param snapshot_file: 指定時另外輸出 mmap 載入用的二進位快照 (見 snapshot.py)，JSON 仍照常輸出
+    :param incremental: 增量模式 (見 incremental.py)，與上一次的 out_file 比對，保留既有序號只套用差異，
+                        並輸出 Changeset 到 AREA_CODES.changeset.json
+    :param stats: 指定時記錄各階段的執行時間、下載與讀取 bytes、筆數、記憶體峰值 (見 profiling.py)
+    :param vintage_store: 指定時將本次結果記錄為一個 vintage 寫入此檔案 (見 vintage.py)
+    :param vintage_date: vintage 的生效日期 (ISO 或民國年)，預設為今天
+    :param sqlite_file: 指定時另外輸出正規化、含索引的 SQLite 資料庫 (見 sqlite_db.py)
+    :param output_format: out_file 的格式 pretty / compact / ndjson / canonical (見 writer.py)，
+                          以暫存檔 + rename 寫入，內容與既有檔案相同時不寫入
+    :param parallel: 以 process pool 平行解析三個來源，GeoXML 完成後即開始合併 (見 parallel.py)，
+                     fetch_* 與 merge 階段合併記錄為 parallel 階段
+    :param neighbors_file: 指定時另外輸出行政區中心點的距離矩陣與鄰近清單 (見 neighbors.py)，
+                           一般為 neighbors_path(out_file)
     :return: dict
     {
         "1": {
@@ -338,64 +627,108 @@ def convert(geoxml_path: str = g_path, areacode_path: str = a_path, enname_path:
         ...
     }
     """
-    area_code = {}
-
-    area_list = fetch_geoxml(geoxml_path)
-    for c in range(0, len(area_list)):
-
-        area_code[f"{c+1}"] = {
-            "zip_code": area_list[c]["_x0033_碼郵遞區號"],
-            "area_name": area_list[c]["行政區名"],
-            "area_name_en": "",
-            "geo_code_103": "",
-            "county_name": "",
-            "county_name_en": "",
-            "county_geo_code_103": "",
-            "county_full_name": "",
-            "city_name": "",
-            "city_name_en": "",
-            "longitude": float(area_list[c]["中心點經度"]),
-            "latitude":float(area_list[c]["中心點緯度"]),
-        }
+    if stats is None:
+        stats = PipelineStats()
+
+    sources = {}
+    if cache_dir:
+        import requests
+        with stats.stage("download") as stage:
+            try:
+                sources = fetch_sources([geoxml_path, areacode_path, enname_path], cache_dir)
+            except (requests.RequestException, OSError) as e:
+                logger.error(f"Download sources error: {e}")
+                exit(1)
+            stage.rows = len(sources)
+            stage.bytes_downloaded = sum(os.path.getsize(r.path) for r in sources.values()
+                                         if r.path != r.source and not r.not_modified)
+
+        geoxml_path = sources[geoxml_path].path
+        areacode_path = sources[areacode_path].path
+        enname_path = sources[enname_path].path
+
+        area_code = None
+        if is_unchanged(cache_dir, out_file, sources.values(), output_format):
+            try:
+                area_code = load_output(out_file, output_format)
+            except ValueError as e:
+                logger.warning(f"Cannot read {out_file} as {output_format}, convert again: {e}")
+        if area_code is not None:
+            logger.info(f"Sources unchanged, skip parsing and use {out_file}")
+            _write_extra_outputs(area_code, snapshot_file, sqlite_file, neighbors_file, missing_only=True)
+            if write_file and vintage_store:
+                _record_vintage(area_code, vintage_store, vintage_date, geoxml_path, areacode_path, enname_path,
+                                stats)
+            return area_code
+
+    merged = None
+    if parallel:
+        try:
+            from .parallel import parallel_fetch
+        except ImportError:
+            from parallel import parallel_fetch
+        area_list, enname_list, geo_code_103, merged = parallel_fetch(geoxml_path, enname_path, areacode_path,
+                                                                      stats, merge=not incremental)
+    else:
+        with stats.stage("fetch_geoxml") as stage:
+            area_list = fetch_geoxml(geoxml_path, stage=stage)
+            stage.rows = len(area_list)
+        with stats.stage("fetch_enname") as stage:
+            enname_list = fetch_enname(enname_path, stage=stage)
+            stage.rows = len(enname_list)
+        with stats.stage("fetch_areacode") as stage:
+            geo_code_103 = fetch_areacode(areacode_path, stage=stage)
+            stage.rows = len(geo_code_103)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(json.dumps(geo_code_103, indent=4, ensure_ascii=False))
+
+    changeset = None
+    if merged is not None:
+        area_code, report = merged
+        logger.info(f"Merge report: {report.summary()}")
+    else:
+        with stats.stage("merge") as stage:
+            if incremental:
+                area_code, changeset, fingerprints = incremental_rebuild(out_file, area_list, enname_list,
+                                                                         geo_code_103, merge, output_format)
+                if changeset is not None:
+                    logger.info(f"Changeset: {changeset.summary()}")
+            else:
+                area_code, report = merge(area_list, enname_list, geo_code_103)
+                logger.info(f"Merge report: {report.summary()}")
+            stage.rows = len(area_code)
 
-    enname_list = fetch_enname(enname_path)
-    for c in range(0, len(enname_list)):
-        for k, v in area_code.items():
-            if v.get("area_name") == enname_list[c][1]:
-                area_code[k]["area_name_en"] = enname_list[c][2]
-                break
-
-    geo_code_103 = fetch_areacode(areacode_path)
-    logger.debug(json.dumps(geo_code_103, indent=4, ensure_ascii=False))
-    for k, v in area_code.items():
-        """
-            "geo_code_103": "6300500",
-            "area_name": "中正區",
-            "area_name_en": "Jhongjhen District",
-            "county_name": "臺北市",
-            "county_full_name": "臺北市",
-            "county_name_en": "Taipei City",
-            "county_geo_code_103": "63"
-        """
-        area_name = v["area_name"]
-        area_code[k]["county_name"] = geo_code_103.get(area_name, {}).get("county_name", "")
-        area_code[k]["county_name_en"] = geo_code_103.get(area_name, {}).get("county_name_en", "")
-        area_code[k]["county_geo_code_103"] = geo_code_103.get(area_name, {}).get("county_geo_code_103", "")
-        area_code[k]["county_full_name"] = geo_code_103.get(area_name, {}).get("county_full_name", "")
-        area_code[k]["city_name"] = geo_code_103.get(area_name, {}).get("area_name", "")
-        area_code[k]["city_name_en"] = geo_code_103.get(area_name, {}).get("area_name_en", "")
-        area_code[k]["geo_code_103"] = geo_code_103.get(area_name, {}).get("geo_code_103", "")
-
-    logger.debug(json.dumps(area_code, indent=4, ensure_ascii=False))
     logger.debug(f"Total {len(area_code.keys())} area codes.")
 
     if write_file:
-        try:
-            with open(out_file, "w", encoding="utf-8") as output_file:
-                json.dump(area_code, output_file, ensure_ascii=False, indent=4)
-        except Exception as e:
-            logger.error(f"Write file error: {e}")
-            exit(1)
+        with stats.stage("write") as stage:
+            unchanged = changeset is not None and changeset.is_empty()
+            if unchanged:
+                logger.info(f"No area changed, keep {out_file}")
+            else:
+                try:
+                    sha256, written = write_output(area_code, out_file, output_format)
+                except Exception as e:
+                    logger.error(f"Write file error: {e}")
+                    exit(1)
+                if written:
+                    logger.info(f"{out_file} written ({output_format}): {sha256}")
+                else:
+                    logger.info(f"{out_file} unchanged ({output_format}), skip writing: {sha256}")
+                stage.rows = len(area_code)
+
+            _write_extra_outputs(area_code, snapshot_file, sqlite_file, neighbors_file, missing_only=unchanged)
+
+            if incremental:
+                save_state(out_file, fingerprints)
+                if changeset is not None and not unchanged:
+                    save_changeset(out_file, changeset)
+
+            if cache_dir:
+                record_build(cache_dir, out_file, sources.values(), output_format)
+
+        if vintage_store:
+            _record_vintage(area_code, vintage_store, vintage_date, geoxml_path, areacode_path, enname_path, stats)
 
     return area_code
 
@@ -412,9 +745,42 @@ if __name__ == '__main__':
                         help=f"Specify the English name file path. default: {e_path}")
     parser.add_argument("-o", "--outfile", default=area_code_json_file,
                         help=f"Specify the output file name. default: {area_code_json_file}")
+    parser.add_argument("-c", "--cache-dir", default=None,
+                        help="Download sources in parallel into this cache directory, "
+                             "and skip conversion when all sources are unchanged. default: no cache")
+    parser.add_argument("-f", "--format", default="pretty", choices=FORMATS,
+                        help="Output format: pretty (indent=4), compact (minified), ndjson (one area per line) "
+                             "or canonical (sorted, minified, stable hash). default: pretty")
+    parser.add_argument("-s", "--snapshot", default=None,
+                        help="Also write a binary snapshot of the output for mmap loading. default: none")
+    parser.add_argument("-j", "--parallel", action="store_true",
+                        help="Parse the three sources in a process pool and merge as soon as GeoXML is ready")
+    parser.add_argument("-w", "--watch", type=float, default=None, metavar="SECONDS",
+                        help="Keep running and rebuild whenever a source hash changes, checking every SECONDS. "
+                             "URL sources are revalidated with conditional requests. default: run once")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="Patch the previous output file instead of renumbering it, "
+                             "and write the changes to *.changeset.json")
+    parser.add_argument("--sqlite", default=None,
+                        help="Also write a normalized, indexed SQLite database of the output. default: none")
+    parser.add_argument("-n", "--neighbors", nargs="?", const="", default=None, metavar="FILE",
+                        help="Also write the centroid distance matrix and sorted neighbor lists for mmap loading. "
+                             "default file: next to the output, e.g. AREA_CODES.neighbors.bin")
+    parser.add_argument("--vintage-store", default=None,
+                        help="Also record the output as a dated vintage in this store file. default: none")
+    parser.add_argument("--vintage-date", default=None,
+                        help="Effective date of the vintage, ISO (2018-07-06) or ROC (1070706). default: today")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Log every parsed row and the full result at DEBUG level. default: INFO")
+    parser.add_argument("-p", "--profile", action="store_true",
+                        help="Print wall time, bytes, rows and peak memory of every stage")
+    parser.add_argument("--profile-output", default=None,
+                        help="Also run under cProfile and dump the pstats to this file. default: none")
 
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
     if args.geoxml:
         g_path = args.geoxml
 
@@ -429,10 +795,62 @@ if __name__ == '__main__':
     else:
         outfile = area_code_json_file
 
+    neighbors_file = None
+    if args.neighbors is not None:
+        try:
+            from .neighbors import neighbors_path
+        except ImportError:
+            from neighbors import neighbors_path
+        neighbors_file = args.neighbors or neighbors_path(outfile)
+
+    if args.watch:
+        try:
+            from .watch import Watcher
+        except ImportError:
+            from watch import Watcher
+        watcher = Watcher(g_path, a_path, e_path, out_file=outfile, interval=args.watch, cache_dir=args.cache_dir,
+                          snapshot_file=args.snapshot, incremental=args.incremental,
+                          vintage_store=args.vintage_store, vintage_date=args.vintage_date,
+                          sqlite_file=args.sqlite, output_format=args.format, parallel=args.parallel,
+                          neighbors_file=neighbors_file)
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+        exit(0)
+
+    stats = PipelineStats(trace_memory=args.profile)
+    profiler = None
+    if args.profile_output:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
     result = convert(geoxml_path=g_path,
                      areacode_path=a_path,
                      enname_path=e_path,
                      out_file=outfile,
-                     write_file=True)
-
-    logger.debug(json.dumps(result, indent=4, ensure_ascii=False))
+                     write_file=True,
+                     cache_dir=args.cache_dir,
+                     snapshot_file=args.snapshot,
+                     incremental=args.incremental,
+                     stats=stats,
+                     vintage_store=args.vintage_store,
+                     vintage_date=args.vintage_date,
+                     sqlite_file=args.sqlite,
+                     output_format=args.format,
+                     parallel=args.parallel,
+                     neighbors_file=neighbors_file)
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile_output)
+        logger.info(f"cProfile stats written to {args.profile_output}, view with: "
+                    f"python -m pstats {args.profile_output}")
+    if args.profile:
+        print(stats.table())
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(json.dumps(result, indent=4, ensure_ascii=False))
@@ -0,0 +1,174 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+from functools import lru_cache
+from typing import Any, Iterable, NamedTuple
+
+"""
+CWA / NCDR CAP 警報的 geocode 解析
+
+CAP 警報的 <area><geocode> 為 Taiwan_Geocode_103，可能是縣市 (2 或 5 碼，例如 "63"、"10002")、
+鄉鎮 (7 碼，例如 "6300500") 或村里 (鄉鎮代碼再加上村里碼)
+
+CwaCAP 在建立時將每個行政區編為第 i 個 bit，並預先計算：
+- 鄉鎮代碼 -> 該鄉鎮的 bit
+- 縣市代碼 -> 縣市底下所有鄉鎮 bit 的聯集
+解析一則警報只需對每個 geocode 做一次 dict 查詢與 OR，涵蓋全台的警報也只是 22 個縣市 mask 的 OR；
+mask 轉為郵遞區號與鄉鎮代碼的結果會快取，重複出現的警報範圍不需再次展開
+
+    cap = CwaCAP.from_json("AREA_CODES.json")
+    cap.expand_county("63")                      # 臺北市所有鄉鎮的 geo_code_103
+    result = cap.resolve(["63", "6500100"])      # Resolution
+    result.zip_codes                             # 去除重複並排序的郵遞區號
+    cap.resolve_union(alerts)                    # 多則警報合併後的範圍
+"""
+
+Area = dict[str, Any]
+
+TOWNSHIP_CODE_LENGTH = 7
+
+# 0~255 每個值為 1 的 bit 位置
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+class Resolution(NamedTuple):
+    mask: int                       # 第 i 個 bit 為 1 表示涵蓋第 i 個行政區
+    zip_codes: tuple[str, ...]      # 去除重複後排序
+    geo_codes: tuple[str, ...]      # 鄉鎮 geo_code_103，依 AREA_CODES 順序
+    unknown: tuple[str, ...]        # 找不到的 geocode
+
+
+class CwaCAP:
+    """
+    以 convert() 輸出建立的 CAP geocode 解析器
+    """
+
+    def __init__(self, area_codes: dict[str, Area], cache_size: int = 4096):
+        """
+        :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+        :param cache_size: mask 展開結果的快取筆數
+        """
+        self.keys: list[str] = list(area_codes.keys())
+        self.areas: list[Area] = list(area_codes.values())
+        self.all_mask = (1 << len(self.areas)) - 1
+        self._mask_bytes = (len(self.areas) + 7) // 8
+
+        self._masks: dict[str, int] = {}
+        townships: dict[str, list[str]] = {}
+        for i, area in enumerate(self.areas):
+            bit = 1 << i
+            # geo_code_103 為空字串表示不在行政區代碼表中，CAP 警報不會涵蓋
+            geo_code = area.get("geo_code_103", "")
+            county_geo_code = area.get("county_geo_code_103", "")
+            if geo_code:
+                self._masks[geo_code] = self._masks.get(geo_code, 0) | bit
+            if county_geo_code:
+                self._masks[county_geo_code] = self._masks.get(county_geo_code, 0) | bit
+                if geo_code:
+                    townships.setdefault(county_geo_code, []).append(geo_code)
+        self.county_townships: dict[str, tuple[str, ...]] = {k: tuple(v) for k, v in townships.items()}
+
+        self._zip_code_index: list[int] = []
+        zip_codes: dict[str, int] = {}
+        for area in self.areas:
+            self._zip_code_index.append(zip_codes.setdefault(area.get("zip_code", ""), len(zip_codes)))
+        self._zip_codes = list(zip_codes.keys())
+        self._geo_codes = [area.get("geo_code_103", "") for area in self.areas]
+        self._expand = lru_cache(maxsize=cache_size)(self._expand_mask)
+
+    @classmethod
+    def from_json(cls, file_path: str, **kwargs) -> CwaCAP:
+        with open(file_path, "r", encoding="utf-8") as input_file:
+            return cls(json.load(input_file), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.areas)
+
+    def expand_county(self, county_geo_code: str) -> tuple[str, ...]:
+        """
+        :param county_geo_code: 縣市 county_geo_code_103
+        :return: 縣市底下所有鄉鎮的 geo_code_103，找不到時為空 tuple
+        """
+        return self.county_townships.get(county_geo_code, ())
+
+    def geocode_mask(self, geocode: str) -> int:
+        """
+        :param geocode: 縣市、鄉鎮或村里的 Taiwan_Geocode_103
+        :return: 涵蓋的行政區 mask，找不到時為 0
+        """
+        mask = self._masks.get(geocode)
+        if mask is None and len(geocode) > TOWNSHIP_CODE_LENGTH:
+            # 村里代碼以所屬鄉鎮代碼開頭
+            mask = self._masks.get(geocode[:TOWNSHIP_CODE_LENGTH])
+        return mask or 0
+
+    def mask(self, geocodes: Iterable[str]) -> tuple[int, tuple[str, ...]]:
+        """
+        :param geocodes: 一則警報的 geocode
+        :return: (涵蓋的行政區 mask, 找不到的 geocode)
+        """
+        mask = 0
+        unknown = []
+        for geocode in geocodes:
+            geocode_mask = self.geocode_mask(geocode)
+            if geocode_mask:
+                mask |= geocode_mask
+            else:
+                unknown.append(geocode)
+        return mask, tuple(unknown)
+
+    def _expand_mask(self, mask: int) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        rows = self.rows(mask)
+        zip_ids = {self._zip_code_index[i] for i in rows}
+        return tuple(sorted(self._zip_codes[z] for z in zip_ids)), tuple(self._geo_codes[i] for i in rows)
+
+    def rows(self, mask: int) -> list[int]:
+        """
+        :return: mask 中為 1 的 bit 位置 (即 self.areas 的 index)，由小到大
+        """
+        rows = []
+        # 以 byte 為單位查表，全台的 mask 也只需處理 47 個 byte
+        for offset, byte in enumerate(mask.to_bytes(self._mask_bytes, "little")):
+            if byte:
+                base = offset * 8
+                rows.extend(base + bit for bit in _BYTE_BITS[byte])
+        return rows
+
+    def from_mask(self, mask: int, unknown: tuple[str, ...] = ()) -> Resolution:
+        zip_codes, geo_codes = self._expand(mask)
+        return Resolution(mask, zip_codes, geo_codes, unknown)
+
+    def resolve(self, geocodes: Iterable[str]) -> Resolution:
+        """
+        :param geocodes: 一則警報的 geocode
+        :return: Resolution
+        """
+        return self.from_mask(*self.mask(geocodes))
+
+    def resolve_batch(self, alerts: Iterable[Iterable[str]]) -> list[Resolution]:
+        """
+        :param alerts: 多則警報，每則為 geocode 的 iterable
+        :return: 每則警報的 Resolution
+        """
+        return [self.resolve(geocodes) for geocodes in alerts]
+
+    def resolve_union(self, alerts: Iterable[Iterable[str]]) -> Resolution:
+        """
+        :param alerts: 多則警報，每則為 geocode 的 iterable
+        :return: 所有警報合併後的 Resolution
+        """
+        mask = 0
+        unknown: dict[str, None] = {}
+        for geocodes in alerts:
+            alert_mask, alert_unknown = self.mask(geocodes)
+            mask |= alert_mask
+            unknown.update(dict.fromkeys(alert_unknown))
+        return self.from_mask(mask, tuple(unknown))
+
+    def get_areas(self, resolution: Resolution | int) -> list[Area]:
+        """
+        :param resolution: Resolution 或 mask
+        :return: 涵蓋的 area dict，依 AREA_CODES 順序
+        """
+        mask = resolution.mask if isinstance(resolution, Resolution) else resolution
+        return [self.areas[i] for i in self.rows(mask)]
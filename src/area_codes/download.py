@@ -0,0 +1,203 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable, NamedTuple
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+"""
+來源檔案下載與快取
+
+convert() 的三個來源檔 (行政區經緯度、縣市鄉鎮中英對照、行政區代碼表) 以同一個 requests.Session 平行下載，
+下載結果存放在 cache_dir，並記錄 ETag / Last-Modified，下次下載時以 If-None-Match / If-Modified-Since
+發出條件式請求，伺服器回應 304 時直接使用快取檔案
+
+cache_dir 內容：
+    <sha1(url)>.<副檔名>     下載的原始檔案
+    <sha1(url)>.json        {"url", "etag", "last_modified", "sha256"}
+    build.json              上一次成功輸出時的來源 sha256、輸出檔 sha256 與輸出格式，用來判斷是否需要重新轉換
+"""
+
+DOWNLOAD_TIMEOUT = 60
+BUILD_MANIFEST = "build.json"
+
+
+class FetchResult(NamedTuple):
+    source: str             # 原始的 URL 或檔案路徑
+    path: str               # 本機檔案路徑 (URL 為快取檔路徑)
+    sha256: str
+    not_modified: bool      # 伺服器回應 304
+
+
+def is_url(source: str) -> bool:
+    return source.startswith("http://") or source.startswith("https://")
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as input_file:
+        for chunk in iter(lambda: input_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(file_path: str, content: bytes) -> None:
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "wb") as output_file:
+        output_file.write(content)
+    os.replace(tmp_path, file_path)
+
+
+def create_session(pool_size: int = 3, retries: int = 2) -> requests.Session:
+    """
+    建立共用連線池的 Session
+
+    :param pool_size: 每個 host 的連線池大小
+    :param retries: 連線失敗時的重試次數
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class SourceCache:
+    """
+    以 URL 為 key 的本機下載快取
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        # 保留原始副檔名，openpyxl 以副檔名判斷檔案格式
+        ext = os.path.splitext(urlparse(url).path)[1]
+        return os.path.join(self.cache_dir, f"{name}{ext}"), os.path.join(self.cache_dir, f"{name}.json")
+
+    def load_meta(self, url: str) -> dict:
+        body_path, meta_path = self._paths(url)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return {}
+        try:
+            with open(meta_path, "r", encoding="utf-8") as input_file:
+                return json.load(input_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignore broken cache meta {meta_path}: {e}")
+            return {}
+
+    def fetch(self, session: requests.Session, url: str, timeout: float = DOWNLOAD_TIMEOUT) -> FetchResult:
+        """
+        下載 url，有快取時發出條件式請求
+
+        :return: FetchResult
+        """
+        body_path, meta_path = self._paths(url)
+        meta = self.load_meta(url)
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        logger.debug(f"Download {url} (conditional: {bool(headers)})")
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and meta:
+            logger.debug(f"Not modified: {url}")
+            return FetchResult(url, body_path, meta["sha256"], True)
+        response.raise_for_status()
+
+        content = response.content
+        sha256 = hashlib.sha256(content).hexdigest()
+        _write_atomic(body_path, content)
+        _write_atomic(meta_path, json.dumps({
+            "url": url,
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+            "sha256": sha256,
+        }, ensure_ascii=False).encode("utf-8"))
+        logger.debug(f"Downloaded {len(content)} bytes: {url}")
+        return FetchResult(url, body_path, sha256, False)
+
+
+def fetch_sources(sources: Iterable[str], cache_dir: str, timeout: float = DOWNLOAD_TIMEOUT,
+                  session: requests.Session | None = None) -> dict[str, FetchResult]:
+    """
+    平行下載所有 URL 來源到 cache_dir，本機檔案則只計算 sha256
+
+    :param sources: URL 或本機檔案路徑
+    :param cache_dir: 快取目錄
+    :param timeout: 每個請求的 timeout 秒數
+    :param session: 共用的 Session，未指定時建立新的連線池
+    :return: {source: FetchResult}
+    """
+    sources = list(dict.fromkeys(sources))
+    cache = SourceCache(cache_dir)
+    urls = [s for s in sources if is_url(s)]
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=max(1, len(urls)))
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, len(urls))) as executor:
+            futures = {url: executor.submit(cache.fetch, session, url, timeout) for url in urls}
+            for source in sources:
+                if source in futures:
+                    results[source] = futures[source].result()
+                else:
+                    results[source] = FetchResult(source, source, file_sha256(source), False)
+    finally:
+        if own_session:
+            session.close()
+    return results
+
+
+def _manifest(out_file: str, results: Iterable[FetchResult], output_format: str | None) -> dict:
+    return {
+        "out_file": os.path.abspath(out_file),
+        "out_sha256": file_sha256(out_file),
+        "output_format": output_format,
+        "sources": {r.source: r.sha256 for r in results},
+    }
+
+
+def is_unchanged(cache_dir: str, out_file: str, results: Iterable[FetchResult],
+                 output_format: str | None = None) -> bool:
+    """
+    來源檔案、輸出檔與輸出格式都和上一次 record_build() 時相同，表示不需要重新解析
+
+    :param output_format: 本次的輸出格式 (見 writer.py)，與上一次不同時需要重新輸出
+    :return: bool
+    """
+    manifest_path = os.path.join(cache_dir, BUILD_MANIFEST)
+    if not (os.path.exists(manifest_path) and os.path.exists(out_file)):
+        return False
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as input_file:
+            previous = json.load(input_file)
+    except (OSError, ValueError):
+        return False
+    return previous == _manifest(out_file, results, output_format)
+
+
+def record_build(cache_dir: str, out_file: str, results: Iterable[FetchResult],
+                 output_format: str | None = None) -> None:
+    """
+    記錄本次輸出所使用的來源 sha256 與輸出格式
+    """
+    _write_atomic(os.path.join(cache_dir, BUILD_MANIFEST),
+                  json.dumps(_manifest(out_file, results, output_format), ensure_ascii=False, indent=4).encode("utf-8"))
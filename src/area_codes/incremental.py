@@ -0,0 +1,234 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+from typing import Callable
+
+try:
+    from .writer import load_output
+except ImportError:
+    from writer import load_output
+
+logger = logging.getLogger(__name__)
+
+"""
+增量更新 AREA_CODES.json
+
+一般的 convert() 每次都依郵遞區號排序後重新編號，來源只要新增或刪除一筆，後面所有序號 key 都會位移，
+下游以序號為 key 的快取也會全部失效
+
+增量模式下會對三個來源的每一筆資料計算 fingerprint，並與上一次輸出時記錄的 fingerprint 比較：
+- 沒有任何來源資料變動時，直接沿用上一次的輸出，不重新合併也不寫檔
+- 有變動時，只比對受影響的行政區，產生 Changeset (新增、刪除、修改)，並套用到上一次的輸出：
+  既有行政區保留原本的序號，新增的行政區接在最大序號之後，刪除的行政區移除該序號
+
+Changeset 以穩定的 key 表示每個行政區：有 geo_code_103 時使用 geo_code_103，否則使用 "郵遞區號:行政區名"
+
+輸出檔旁的檔案：
+    AREA_CODES.json.state       上一次輸出時各來源的 fingerprint
+    AREA_CODES.changeset.json   最近一次增量更新的 Changeset，下游可只套用差異
+"""
+
+
+def stable_key(area: dict) -> str:
+    """
+    :param area: convert() 輸出中單筆資料
+    :return: geo_code_103，若為空字串則為 "郵遞區號:行政區名"
+    """
+    return area["geo_code_103"] or f"{area['zip_code']}:{area['area_name']}"
+
+
+def state_path(out_file: str) -> str:
+    return f"{out_file}.state"
+
+
+def changeset_path(out_file: str) -> str:
+    return f"{os.path.splitext(out_file)[0]}.changeset.json"
+
+
+def _fingerprint(value) -> str:
+    return hashlib.sha1(json.dumps(value, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _group_fingerprints(rows: list[tuple[str, object]]) -> dict[str, str]:
+    grouped: dict[str, list] = {}
+    for name, row in rows:
+        grouped.setdefault(name, []).append(row)
+    return {name: _fingerprint(group) for name, group in grouped.items()}
+
+
+def source_fingerprints(area_list: list, enname_list: list, geo_code_103: dict) -> dict[str, dict[str, str]]:
+    """
+    計算三個來源每一筆資料的 fingerprint，以合併時使用的行政區名為 key (同名多筆時合併計算)
+
+    :param area_list: fetch_geoxml() 的回傳值
+    :param enname_list: fetch_enname() 的回傳值
+    :param geo_code_103: fetch_areacode() 的回傳值
+    :return: {"geoxml": {行政區名: fingerprint}, "enname": {...}, "areacode": {...}}
+    """
+    return {
+        "geoxml": _group_fingerprints([(row["行政區名"], row) for row in area_list]),
+        "enname": _group_fingerprints([(row[1], list(row)) for row in enname_list]),
+        "areacode": {name: _fingerprint(row) for name, row in geo_code_103.items() if isinstance(name, str)},
+    }
+
+
+def changed_names(previous: dict[str, dict[str, str]], current: dict[str, dict[str, str]]) -> set[str]:
+    """
+    :return: 任一來源中 fingerprint 有變動 (含新增、刪除) 的行政區名
+    """
+    names = set()
+    for source in ("geoxml", "enname", "areacode"):
+        before, after = previous.get(source, {}), current.get(source, {})
+        names.update(name for name in before.keys() | after.keys() if before.get(name) != after.get(name))
+    return names
+
+
+class Changeset:
+    """
+    增量更新的差異，每一筆以 stable_key() 為 key
+
+    - added: {key: {"serial": 序號, "area": area dict}}
+    - removed: {key: {"serial": 序號, "area": 刪除前的 area dict}}
+    - modified: {key: {"serial": 序號, "before": area dict, "after": area dict}}
+    """
+
+    def __init__(self):
+        self.added: dict[str, dict] = {}
+        self.removed: dict[str, dict] = {}
+        self.modified: dict[str, dict] = {}
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.modified)
+
+    def summary(self) -> dict:
+        return {"added": len(self.added), "removed": len(self.removed), "modified": len(self.modified)}
+
+    def to_dict(self) -> dict:
+        return {"added": self.added, "removed": self.removed, "modified": self.modified}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Changeset:
+        changeset = cls()
+        changeset.added = data.get("added", {})
+        changeset.removed = data.get("removed", {})
+        changeset.modified = data.get("modified", {})
+        return changeset
+
+
+def _by_stable_key(areas: list[tuple[str, dict]]) -> dict[str, tuple[str, dict]]:
+    # 以 stable_key() 對應前後兩次的行政區，與同名行政區的數量無關，新增同名行政區時既有行政區的序號不變
+    return {stable_key(area): (serial, area) for serial, area in areas}
+
+
+def diff(previous: dict[str, dict], current: dict[str, dict], names: set[str] | None = None) -> Changeset:
+    """
+    比對上一次輸出與本次合併結果
+
+    :param previous: 上一次的輸出 (序號 key)
+    :param current: 本次 merge() 的結果 (序號 key，序號會被忽略)
+    :param names: 只比對這些行政區名，None 表示全部比對
+    :return: Changeset，新增的行政區依 current 的順序接在 previous 的最大序號之後
+    """
+    def select(area_codes: dict[str, dict]) -> list[tuple[str, dict]]:
+        return [(k, v) for k, v in area_codes.items() if names is None or v["area_name"] in names]
+
+    before = _by_stable_key(select(previous))
+    after = _by_stable_key(select(current))
+    next_serial = max((int(k) for k in previous if k.isdigit()), default=0) + 1
+
+    changeset = Changeset()
+    for key, (serial, area) in before.items():
+        if key not in after:
+            changeset.removed[key] = {"serial": serial, "area": area}
+        elif after[key][1] != area:
+            changeset.modified[key] = {"serial": serial, "before": area, "after": after[key][1]}
+    for key, (_, area) in after.items():
+        if key not in before:
+            changeset.added[key] = {"serial": f"{next_serial}", "area": area}
+            next_serial += 1
+    return changeset
+
+
+def apply_changeset(previous: dict[str, dict], changeset: Changeset) -> dict[str, dict]:
+    """
+    將 Changeset 套用到上一次的輸出，未變動的行政區保留原本的序號與順序
+
+    :return: 新的 AREA_CODES dict
+    """
+    result = dict(previous)
+    for entry in changeset.removed.values():
+        result.pop(entry["serial"], None)
+    for entry in changeset.modified.values():
+        result[entry["serial"]] = entry["after"]
+    for entry in changeset.added.values():
+        result[entry["serial"]] = entry["area"]
+    return result
+
+
+def load_previous(out_file: str, output_format: str | None = None
+                  ) -> tuple[dict[str, dict], dict[str, dict[str, str]]] | None:
+    """
+    :param out_file: 上一次的輸出檔
+    :param output_format: 輸出檔的格式，None 時依副檔名判斷 (見 writer.load_output)
+    :return: (上一次的輸出, 上一次的 fingerprint)，任一檔案不存在或無法讀取時回傳 None
+    """
+    try:
+        previous = load_output(out_file, output_format)
+        with open(state_path(out_file), "r", encoding="utf-8") as input_file:
+            state = json.load(input_file)
+    except (OSError, ValueError):
+        return None
+    return previous, state
+
+
+def _write_json(file_path: str, data: dict) -> None:
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as output_file:
+        json.dump(data, output_file, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, file_path)
+
+
+def save_state(out_file: str, fingerprints: dict[str, dict[str, str]]) -> None:
+    _write_json(state_path(out_file), fingerprints)
+
+
+def save_changeset(out_file: str, changeset: Changeset) -> None:
+    _write_json(changeset_path(out_file), changeset.to_dict())
+
+
+def rebuild(out_file: str, area_list: list, enname_list: list, geo_code_103: dict,
+            merge_func: Callable[[list, list, dict], tuple[dict, object]],
+            output_format: str | None = None) -> tuple[dict, Changeset | None, dict]:
+    """
+    增量模式的合併
+
+    :param out_file: 上一次的輸出檔 (同時讀取旁邊的 .state)
+    :param area_list: fetch_geoxml() 的回傳值
+    :param enname_list: fetch_enname() 的回傳值
+    :param geo_code_103: fetch_areacode() 的回傳值
+    :param merge_func: convert.merge
+    :param output_format: 上一次輸出檔的格式，None 時依副檔名判斷
+    :return: (AREA_CODES dict, Changeset, fingerprints)；沒有上一次的輸出時為完整合併，Changeset 為 None
+    """
+    fingerprints = source_fingerprints(area_list, enname_list, geo_code_103)
+    loaded = load_previous(out_file, output_format)
+    if loaded is None:
+        logger.info(f"No previous build for {out_file}, run full merge")
+        area_code, report = merge_func(area_list, enname_list, geo_code_103)
+        logger.info(f"Merge report: {report.summary()}")
+        return area_code, None, fingerprints
+
+    previous, state = loaded
+    names = changed_names(state, fingerprints)
+    if not names:
+        logger.info("No source rows changed")
+        return previous, Changeset(), fingerprints
+
+    logger.info(f"{len(names)} area names changed in sources")
+    area_code, report = merge_func(area_list, enname_list, geo_code_103)
+    logger.info(f"Merge report: {report.summary()}")
+    changeset = diff(previous, area_code, names)
+    return apply_changeset(previous, changeset), changeset, fingerprints
@@ -0,0 +1,299 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Mapping, NamedTuple
+
+import numpy as np
+
+try:
+    from .area_index import AreaIndex
+    from .reverse_geocode import ReverseGeocoder, _haversine_np, haversine
+    from .writer import content_hash
+except ImportError:
+    from area_index import AreaIndex
+    from reverse_geocode import ReverseGeocoder, _haversine_np, haversine
+    from writer import content_hash
+
+import logging
+logger = logging.getLogger(__name__)
+
+"""
+查詢結果的 LRU 快取
+
+實際的查詢集中在少數郵遞區號與 (四捨五入後的) GPS 位置，CachedLookup 將查詢結果 (含 id 的 record，與 API 回應相同)
+以及序列化後的 JSON bytes 存在容量固定的 LRU 中，key 為：
+- ("zip_code", zip_code)
+- ("geo_code_103", geo_code_103)
+- ("cell", 層, 緯度格, 經度格)   經緯度依 cell_size 度切成網格，不可快取的網格再逐層細分
+
+經緯度的快取與逐點查詢的結果完全相同：第一次查詢某網格時以網格中心計算最近與第二近的行政區，
+兩者距離差大於網格對角線 (網格內任一點到中心的距離不超過半對角線 r，最近點的距離最多增加 r、其他點最多減少 r)
+時，網格內所有點的最近行政區都相同，才快取為該網格的結果；否則記錄為不可快取的網格，改查詢下一層較小的網格，
+最小一層仍不可快取時才逐點計算
+
+資料版本 (content_hash 或指定的 version) 改變時以 update() 替換索引與快取，舊版本的快取整個捨棄；
+attach(watcher) 於 Watcher 發佈新版本時自動更新 (見 watch.py)
+
+    lookup = CachedLookup.from_json("AREA_CODES.json", maxsize=4096)
+    lookup.get_by_zip_code("300")               # [record, ...]
+    lookup.get_by_geo_code("6300500")           # record 或 None
+    lookup.get_data_by_latlng(25.0324, 121.5198)
+    lookup.get_by_zip_code_json("300")          # JSON bytes
+    lookup.stats()                              # {"hits", "misses", "evictions", "invalidations", "size", ...}
+"""
+
+Area = dict[str, Any]
+
+DEFAULT_MAXSIZE = 4096
+DEFAULT_CELL_SIZE = 0.01
+DEFAULT_REFINE = 3
+REFINE_FACTOR = 8
+
+_UNCACHEABLE = object()
+
+
+def _to_json(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class _Entry:
+    __slots__ = ("value", "body")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.body: bytes | None = None
+
+    def json(self) -> bytes:
+        if self.body is None:
+            self.body = _to_json(self.value)
+        return self.body
+
+
+class LRUCache:
+    """
+    容量固定的 LRU，記錄命中、未命中與淘汰次數
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_NOT_FOUND = _Entry(None)
+
+
+class _State(NamedTuple):
+    version: str
+    index: AreaIndex
+    geocoder: ReverseGeocoder | None
+    entries: dict[int, _Entry]      # id(area dict) -> 該行政區 record 的 _Entry，經緯度與 geo_code_103 查詢共用
+    cache: LRUCache
+
+
+class CachedLookup:
+    """
+    以 AreaIndex / ReverseGeocoder 查詢並快取結果，回傳的 record 為共用物件，呼叫端不應修改
+    """
+
+    def __init__(self, area_codes: Mapping[str, Mapping[str, Any]], version: str | None = None,
+                 maxsize: int = DEFAULT_MAXSIZE, cell_size: float = DEFAULT_CELL_SIZE, refine: int = DEFAULT_REFINE):
+        """
+        :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+        :param version: 資料版本，未指定時以 content_hash(area_codes) 計算
+        :param maxsize: 快取的最大項目數
+        :param cell_size: 經緯度快取網格的大小 (度)
+        :param refine: 不可快取的網格再細分的層數，每層邊長為上一層的 1 / REFINE_FACTOR
+        """
+        self.maxsize = maxsize
+        self.cell_size = cell_size
+        self.refine = refine
+        self.invalidations = 0
+        self._hits = self._misses = self._evictions = 0
+        self._state = self._build(area_codes, version)
+
+    @classmethod
+    def from_json(cls, file_path: str, **kwargs) -> CachedLookup:
+        with open(file_path, "r", encoding="utf-8") as input_file:
+            return cls(json.load(input_file), **kwargs)
+
+    def _build(self, area_codes: Mapping[str, Mapping[str, Any]], version: str | None) -> _State:
+        area_codes = {key: dict(area) for key, area in area_codes.items()}
+        entries = {id(area): _Entry({"id": int(key) if key.isdigit() else key, **area})
+                   for key, area in area_codes.items()}
+        geocoder = ReverseGeocoder(area_codes) if area_codes else None
+        return _State(version or content_hash(area_codes), AreaIndex(area_codes), geocoder, entries,
+                      LRUCache(self.maxsize))
+
+    @property
+    def version(self) -> str:
+        return self._state.version
+
+    def __len__(self) -> int:
+        return len(self._state.index)
+
+    def update(self, area_codes: Mapping[str, Mapping[str, Any]], version: str | None = None) -> bool:
+        """
+        資料版本改變時替換索引並捨棄所有快取
+
+        :return: 是否已替換
+        """
+        version = version or content_hash({key: dict(area) for key, area in area_codes.items()})
+        if version == self._state.version:
+            return False
+        state = self._build(area_codes, version)
+        old, self._state = self._state, state
+        self._hits += old.cache.hits
+        self._misses += old.cache.misses
+        self._evictions += old.cache.evictions
+        self.invalidations += 1
+        logger.info(f"Lookup cache invalidated: version {old.version} -> {version}")
+        return True
+
+    def attach(self, watcher) -> Any:
+        """
+        跟隨 Watcher 發佈的版本更新
+
+        :param watcher: watch.Watcher
+        :return: 取消訂閱的函式
+        """
+        if watcher.current is not None:
+            self.update(watcher.current.area_codes, watcher.current.version)
+        return watcher.subscribe(lambda version: self.update(version.area_codes, version.version))
+
+    @staticmethod
+    def _area_entry(state: _State, area: Area | None) -> _Entry:
+        return _NOT_FOUND if area is None else state.entries[id(area)]
+
+    def _zip_code_entry(self, zip_code: str) -> _Entry:
+        state = self._state
+        key = ("zip_code", zip_code)
+        entry = state.cache.get(key)
+        if entry is None:
+            entry = _Entry([state.entries[id(area)].value for area in state.index.get_by_zip_code(zip_code)])
+            state.cache.put(key, entry)
+        return entry
+
+    def _geo_code_entry(self, geo_code_103: str) -> _Entry:
+        state = self._state
+        key = ("geo_code_103", geo_code_103)
+        entry = state.cache.get(key)
+        if entry is None:
+            entry = self._area_entry(state, state.index.get_by_geo_code(geo_code_103))
+            state.cache.put(key, entry)
+        return entry
+
+    def _latlng_entry(self, latitude: float, longitude: float) -> _Entry:
+        state = self._state
+        if state.geocoder is None or not (math.isfinite(latitude) and math.isfinite(longitude)):
+            return _NOT_FOUND
+        # 不可快取的網格 (位於行政區交界附近) 再切成 REFINE_FACTOR x REFINE_FACTOR 的子網格，最多 refine 層
+        size = self.cell_size
+        for level in range(self.refine + 1):
+            row, col = math.floor(latitude / size), math.floor(longitude / size)
+            key = ("cell", level, row, col)
+            entry = state.cache.get(key)
+            if entry is None:
+                entry = self._cell_entry(state, size, row, col)
+                state.cache.put(key, entry)
+            if entry is not _UNCACHEABLE:
+                return entry
+            size /= REFINE_FACTOR
+        return self._area_entry(state, state.geocoder.get_data_by_latlng(latitude, longitude))
+
+    def _cell_entry(self, state: _State, size: float, row: int, col: int) -> _Entry | object:
+        half = size / 2
+        lat, lng = (row + 0.5) * size, (col + 0.5) * size
+        # 靠近赤道一側的角落距離較遠，兩個角落取大者，並保留浮點誤差的餘裕
+        radius = max(haversine(lat, lng, lat + half, lng + half), haversine(lat, lng, lat - half, lng + half))
+        radius = radius * (1 + 1e-6) + 1e-9
+        geocoder = state.geocoder
+        km = _haversine_np(lat, lng, geocoder.latitudes, geocoder.longitudes)
+        if len(km) > 1:
+            first, second = np.argpartition(km, 1)[:2]
+            if not km[second] - km[first] > 2 * radius:
+                return _UNCACHEABLE
+        else:
+            first = 0
+        return self._area_entry(state, geocoder.areas[int(first)])
+
+    def get_by_zip_code(self, zip_code: str) -> list[Area]:
+        """
+        :return: 該郵遞區號所有行政區的 record (含 id)，找不到時回傳空 list
+        """
+        return self._zip_code_entry(zip_code).value
+
+    def get_by_geo_code(self, geo_code_103: str) -> Area | None:
+        """
+        :return: record (含 id)，找不到時回傳 None
+        """
+        return self._geo_code_entry(geo_code_103).value
+
+    def get_data_by_latlng(self, latitude: float, longitude: float) -> Area | None:
+        """
+        :return: 距離最近的行政區 record (含 id)，與 ReverseGeocoder.get_data_by_latlng() 相同，經緯度不合法時回傳 None
+        """
+        return self._latlng_entry(latitude, longitude).value
+
+    def get_by_zip_code_json(self, zip_code: str) -> bytes:
+        return self._zip_code_entry(zip_code).json()
+
+    def get_by_geo_code_json(self, geo_code_103: str) -> bytes:
+        return self._geo_code_entry(geo_code_103).json()
+
+    def get_data_by_latlng_json(self, latitude: float, longitude: float) -> bytes:
+        return self._latlng_entry(latitude, longitude).json()
+
+    def clear(self) -> None:
+        self._state.cache.clear()
+
+    def stats(self) -> dict:
+        """
+        :return: 所有版本累計的 hits / misses / evictions、invalidations 次數與目前的快取項目數
+        """
+        cache = self._state.cache
+        hits, misses = self._hits + cache.hits, self._misses + cache.misses
+        return {
+            "version": self._state.version,
+            "hits": hits,
+            "misses": misses,
+            "evictions": self._evictions + cache.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "size": len(cache),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,187 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+from array import array
+from typing import Iterator, NamedTuple
+
+"""
+AREA_CODES 精簡資料模型
+
+convert() 的輸出每個行政區都是 12 個 key 的 dict，縣市欄位 (county_name、county_name_en、
+county_full_name、county_geo_code_103) 重複存放在每個鄉鎮，序號 key 也是字串
+
+- County: 縣市資料，同一縣市的鄉鎮共用同一個 County
+- Area: 使用 __slots__ 的鄉鎮資料，以 county 參照縣市
+- AreaTable: 欄位式 (struct-of-arrays) 容器，字串欄位共用同一份字串物件，經緯度存放在 array('d')，
+             縣市以 index 參照 counties
+
+to_dict() 可還原為與 convert() 輸出相同的 dict，json.dump 的結果與 AREA_CODES.json 完全一致
+
+    table = AreaTable.from_json("AREA_CODES.json")
+    area = table.get(1)          # Area
+    area.county.name             # "臺北市"
+    table.to_dict()              # 與 AREA_CODES.json 相同
+"""
+
+
+class County(NamedTuple):
+    geo_code_103: str
+    name: str
+    name_en: str
+    full_name: str
+
+
+class Area:
+    """
+    單一行政區 (鄉鎮)
+    """
+    __slots__ = ("serial", "zip_code", "area_name", "area_name_en", "geo_code_103", "county",
+                 "city_name", "city_name_en", "longitude", "latitude")
+
+    def __init__(self, serial: int, zip_code: str, area_name: str, area_name_en: str, geo_code_103: str,
+                 county: County, city_name: str, city_name_en: str, longitude: float, latitude: float):
+        self.serial = serial
+        self.zip_code = zip_code
+        self.area_name = area_name
+        self.area_name_en = area_name_en
+        self.geo_code_103 = geo_code_103
+        self.county = county
+        self.city_name = city_name
+        self.city_name_en = city_name_en
+        self.longitude = longitude
+        self.latitude = latitude
+
+    def __repr__(self) -> str:
+        return f"Area(serial={self.serial}, zip_code={self.zip_code!r}, area_name={self.area_name!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Area):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def to_dict(self) -> dict:
+        """
+        :return: 與 convert() 輸出中單筆資料相同的 dict
+        """
+        return {
+            "zip_code": self.zip_code,
+            "area_name": self.area_name,
+            "area_name_en": self.area_name_en,
+            "geo_code_103": self.geo_code_103,
+            "county_name": self.county.name,
+            "county_name_en": self.county.name_en,
+            "county_geo_code_103": self.county.geo_code_103,
+            "county_full_name": self.county.full_name,
+            "city_name": self.city_name,
+            "city_name_en": self.city_name_en,
+            "longitude": self.longitude,
+            "latitude": self.latitude,
+        }
+
+
+class AreaTable:
+    """
+    欄位式的行政區資料表，第 i 筆的序號為 serials[i]
+    """
+
+    def __init__(self):
+        self.counties: list[County] = []
+        self.serials = array("I")
+        self.county_ids = array("H")
+        self.longitudes = array("d")
+        self.latitudes = array("d")
+        self.zip_codes: list[str] = []
+        self.area_names: list[str] = []
+        self.area_names_en: list[str] = []
+        self.geo_codes_103: list[str] = []
+        self.city_names: list[str] = []
+        self.city_names_en: list[str] = []
+        self._county_ids: dict[County, int] = {}
+        self._strings: dict[str, str] = {}
+        self._rows: dict[int, int] | None = {}
+
+    def _intern(self, value: str) -> str:
+        return self._strings.setdefault(value, value)
+
+    def append(self, serial: int, area: dict) -> None:
+        """
+        加入一筆 convert() 輸出格式的資料
+
+        :param serial: 序號
+        :param area: convert() 輸出中單筆資料的 dict
+        """
+        county = County(*(self._intern(area[f]) for f in ("county_geo_code_103", "county_name",
+                                                          "county_name_en", "county_full_name")))
+        if county not in self._county_ids:
+            self._county_ids[county] = len(self.counties)
+            self.counties.append(county)
+
+        if self._rows is None:
+            self._rows = {s: row for row, s in enumerate(self.serials)}
+        self._rows[serial] = len(self.serials)
+        self.serials.append(serial)
+        self.county_ids.append(self._county_ids[county])
+        self.longitudes.append(area["longitude"])
+        self.latitudes.append(area["latitude"])
+        self.zip_codes.append(self._intern(area["zip_code"]))
+        self.area_names.append(self._intern(area["area_name"]))
+        self.area_names_en.append(self._intern(area["area_name_en"]))
+        self.geo_codes_103.append(self._intern(area["geo_code_103"]))
+        self.city_names.append(self._intern(area["city_name"]))
+        self.city_names_en.append(self._intern(area["city_name_en"]))
+
+    @classmethod
+    def from_dict(cls, area_codes: dict[str, dict]) -> AreaTable:
+        """
+        :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+        :return: AreaTable
+        """
+        table = cls()
+        for key, area in area_codes.items():
+            if not key.isdigit():
+                raise ValueError(f"Serial key must be a positive integer: {key}")
+            table.append(int(key), area)
+        # 載入完成後不再需要字串對照表；序號為 1..N 時以序號直接換算，不保留序號對照表
+        table._strings = {}
+        if all(serial == row + 1 for row, serial in enumerate(table.serials)):
+            table._rows = None
+        return table
+
+    @classmethod
+    def from_json(cls, file_path: str) -> AreaTable:
+        with open(file_path, "r", encoding="utf-8") as input_file:
+            return cls.from_dict(json.load(input_file))
+
+    def __len__(self) -> int:
+        return len(self.serials)
+
+    def __getitem__(self, row: int) -> Area:
+        """
+        :param row: 第幾筆 (從 0 開始)
+        :return: Area
+        """
+        return Area(self.serials[row], self.zip_codes[row], self.area_names[row], self.area_names_en[row],
+                    self.geo_codes_103[row], self.counties[self.county_ids[row]], self.city_names[row],
+                    self.city_names_en[row], self.longitudes[row], self.latitudes[row])
+
+    def __iter__(self) -> Iterator[Area]:
+        return (self[row] for row in range(len(self)))
+
+    def get(self, serial: int | str) -> Area | None:
+        """
+        :param serial: 序號 (AREA_CODES.json 的 key)
+        :return: Area，找不到時回傳 None
+        """
+        if not f"{serial}".isdigit():
+            return None
+        if self._rows is None:
+            row = int(serial) - 1
+            return self[row] if 0 <= row < len(self) else None
+        row = self._rows.get(int(serial))
+        return None if row is None else self[row]
+
+    def to_dict(self) -> dict[str, dict]:
+        """
+        :return: 與 convert() 輸出相同的 dict
+        """
+        return {f"{area.serial}": area.to_dict() for area in self}
@@ -0,0 +1,204 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import unicodedata
+from typing import Any, NamedTuple
+
+import numpy as np
+
+"""
+行政區名稱搜尋 (前綴與模糊比對)
+
+地址正規化時輸入可能是 "台北市中正區"、"Jhongjhen"、"Zhongzheng Dist." 等寫法：
+- 中文名稱有 臺/台 兩種寫法
+- 英文名稱有兩種拼音：area_name_en 來自 county_h_10706.xls (漢語拼音，例如 Zhongzheng Dist.)，
+  city_name_en 來自行政區代碼表 (例如 Jhongjhen District)
+
+所有名稱先正規化 (NFKC、小寫、台 -> 臺、移除空白與標點，例如 "Wang’an" 與 "Wang-an" 皆為 "wangan")，再建立：
+- trie：前綴查詢 (autocomplete)，每個節點預先存放底下所有行政區，查詢只需走過輸入的字元數
+- bigram 倒排索引：模糊比對，以共同 bigram 數計算 Dice 係數排序，不需與每個名稱逐一比對；
+  posting list 為 NumPy 陣列，共同 bigram 數以一次 bincount 計算
+
+    index = NameIndex.from_json("AREA_CODES.json")
+    index.prefix("台北市中")           # [Match, ...]
+    index.fuzzy("Jhongzheng Dist")     # [Match, ...] 依相似度排序
+    index.search("台北市中正區")        # 先完全/前綴比對，找不到時改用模糊比對
+"""
+
+Area = dict[str, Any]
+
+# 正規化時統一的異體字
+CHAR_FOLDING = str.maketrans({"台": "臺"})
+
+NGRAM_SIZE = 2
+
+
+class Match(NamedTuple):
+    key: str        # AREA_CODES 的序號 key
+    area: Area
+    name: str       # 比對到的名稱 (原始寫法)
+    score: float    # 1.0 為完全相同
+
+
+def normalize(text: str) -> str:
+    """
+    :return: NFKC、小寫、台 -> 臺，只保留文字與數字
+    """
+    text = unicodedata.normalize("NFKC", text).lower().translate(CHAR_FOLDING)
+    return "".join(char for char in text if char.isalnum())
+
+
+def ngrams(text: str, n: int = NGRAM_SIZE) -> set[str]:
+    """
+    :param text: 已正規化的字串
+    :return: 前後加上邊界符號後的 n-gram 集合
+    """
+    padded = f"^{text}$"
+    return {padded[i: i + n] for i in range(len(padded) - n + 1)}
+
+
+def area_names(area: Area) -> list[str]:
+    """
+    :return: 行政區可被搜尋的名稱 (中文、兩種英文拼音，含不帶縣市的簡稱)
+    """
+    names = [area.get("area_name", ""), area.get("city_name", ""),
+             f"{area.get('county_full_name', '')}{area.get('city_name', '')}",
+             area.get("area_name_en", ""), area.get("area_name_en", "").split(",")[0],
+             area.get("city_name_en", ""),
+             f"{area.get('city_name_en', '')}, {area.get('county_name_en', '')}"]
+    return [name for name in dict.fromkeys(names) if normalize(name)]
+
+
+class _TrieNode:
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.entries: list[int] = []
+
+
+class NameIndex:
+    """
+    以 convert() 輸出建立的行政區名稱搜尋索引
+    """
+
+    def __init__(self, area_codes: dict[str, Area]):
+        """
+        :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+        """
+        self.keys: list[str] = list(area_codes.keys())
+        self.areas: list[Area] = list(area_codes.values())
+
+        # entry: 一個 (行政區, 名稱) 組合
+        self._entry_area: list[int] = []
+        self._entry_name: list[str] = []
+        self._entry_normalized: list[str] = []
+        self._entry_gram_count: list[int] = []
+        seen = set()
+        for i, area in enumerate(self.areas):
+            for name in area_names(area):
+                normalized = normalize(name)
+                if (i, normalized) in seen:
+                    continue
+                seen.add((i, normalized))
+                self._entry_area.append(i)
+                self._entry_name.append(name)
+                self._entry_normalized.append(normalized)
+                self._entry_gram_count.append(len(ngrams(normalized)))
+
+        # 較短的名稱 (越接近完整比對) 排在前面
+        order = sorted(range(len(self._entry_area)),
+                       key=lambda e: (len(self._entry_normalized[e]), self._entry_area[e]))
+
+        self._root = _TrieNode()
+        for entry in order:
+            node = self._root
+            node.entries.append(entry)
+            for char in self._entry_normalized[entry]:
+                node = node.children.setdefault(char, _TrieNode())
+                node.entries.append(entry)
+
+        postings: dict[str, list[int]] = {}
+        for entry in range(len(self._entry_area)):
+            for gram in ngrams(self._entry_normalized[entry]):
+                postings.setdefault(gram, []).append(entry)
+        self._postings = {gram: np.array(entries, dtype=np.intp) for gram, entries in postings.items()}
+        self._entry_area_array = np.array(self._entry_area, dtype=np.intp)
+        self._entry_gram_array = np.array(self._entry_gram_count, dtype=np.float64)
+
+    @classmethod
+    def from_json(cls, file_path: str) -> NameIndex:
+        with open(file_path, "r", encoding="utf-8") as input_file:
+            return cls(json.load(input_file))
+
+    def __len__(self) -> int:
+        return len(self.areas)
+
+    def _match(self, entry: int, score: float) -> Match:
+        area = self._entry_area[entry]
+        return Match(self.keys[area], self.areas[area], self._entry_name[entry], score)
+
+    def prefix(self, query: str, limit: int = 10) -> list[Match]:
+        """
+        前綴查詢，同一行政區只回傳最短的名稱
+
+        :param query: 輸入文字
+        :param limit: 最多回傳筆數
+        :return: [Match, ...]，完全相同的 score 為 1.0，其餘為 輸入長度 / 名稱長度
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        node = self._root
+        for char in normalized:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        result = []
+        seen = set()
+        for entry in node.entries:
+            area = self._entry_area[entry]
+            if area in seen:
+                continue
+            seen.add(area)
+            result.append(self._match(entry, len(normalized) / len(self._entry_normalized[entry])))
+            if len(result) >= limit:
+                break
+        return result
+
+    def fuzzy(self, query: str, limit: int = 10, min_score: float = 0.3) -> list[Match]:
+        """
+        以 bigram Dice 係數排序的模糊比對，同一行政區只回傳分數最高的名稱
+
+        :param query: 輸入文字
+        :param limit: 最多回傳筆數
+        :param min_score: 最低分數 (0~1)
+        :return: [Match, ...]，依分數由高到低排序
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        query_grams = ngrams(normalized)
+        postings = [self._postings[gram] for gram in query_grams if gram in self._postings]
+        if not postings:
+            return []
+        common = np.bincount(np.concatenate(postings), minlength=len(self._entry_area))
+        scores = 2 * common / (len(query_grams) + self._entry_gram_array)
+        candidates = np.flatnonzero(scores >= min_score)
+        if not candidates.size:
+            return []
+
+        # 依分數由高到低排序後，每個行政區只保留第一個 (分數最高的) 名稱
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+        _, first = np.unique(self._entry_area_array[candidates], return_index=True)
+        ranked = candidates[np.sort(first)[:limit]]
+        return [self._match(int(entry), float(scores[entry])) for entry in ranked]
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.3) -> list[Match]:
+        """
+        先以前綴查詢，沒有結果時改用模糊比對
+
+        :return: [Match, ...]
+        """
+        return self.prefix(query, limit) or self.fuzzy(query, limit, min_score)
@@ -0,0 +1,280 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Any, Mapping, NamedTuple
+
+import numpy as np
+
+try:
+    from .reverse_geocode import EARTH_RADIUS_KM, _to_xyz
+    from .writer import content_hash
+except ImportError:
+    from reverse_geocode import EARTH_RADIUS_KM, _to_xyz
+    from writer import content_hash
+
+"""
+行政區中心點距離矩陣與鄰近行政區
+
+預先以向量運算計算所有行政區中心點兩兩之間的大圓距離 (float32 N x N)，以及每個行政區依距離排序的鄰近行政區，
+存成與 AREA_CODES.json 同目錄的 AREA_CODES.neighbors.bin，以 mmap 開啟，查詢時不需再計算 haversine：
+- k_nearest()      最近的 k 個行政區，直接取排序好的鄰近清單
+- within_radius()  距離 R 公里內的行政區，在排序好的距離上二分搜尋
+
+以 geo_code_103 或 zip_code 指定行政區；郵遞區號對應多個行政區 (例如 300) 時，距離為到其中任一行政區的最短距離
+
+檔案格式 (little-endian，各區段以 8 bytes 對齊)：
+    header (88 bytes)
+        magic "TWNB" | version u16 | header size u16 | 筆數 N u32 | meta bytes u32 | payload bytes u64 |
+        payload sha256 (32 bytes) | 資料的 content_hash (32 bytes，見 writer.py)
+    payload
+        距離矩陣       N x N float32 (公里)
+        鄰近清單       N x (N - 1) u16                  各列依距離由近到遠的行政區 index，不含自己
+        鄰近距離       N x (N - 1) float32              與鄰近清單對應的距離，遞增排序
+        meta          UTF-8 JSON {"keys", "zip_codes", "geo_codes"}
+
+    write_neighbors(area_codes, neighbors_path("AREA_CODES.json"))
+    with NeighborIndex.open("AREA_CODES.neighbors.bin") as neighbors:
+        neighbors.k_nearest("6300500", k=5)        # [Neighbor(key, zip_code, geo_code_103, km), ...]
+        neighbors.within_radius("300", 10.0)
+        neighbors.distance("6300500", "6500100")
+"""
+
+MAGIC = b"TWNB"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHIIQ32s32s")
+HEADER_SIZE = _HEADER.size
+MAX_AREAS = 1 << 16
+
+
+class Neighbor(NamedTuple):
+    key: str            # AREA_CODES 的序號 key
+    zip_code: str
+    geo_code_103: str
+    km: float
+
+
+def neighbors_path(out_file: str) -> str:
+    """
+    :return: 與 convert() 輸出檔同目錄的鄰近資料檔名，例如 AREA_CODES.json -> AREA_CODES.neighbors.bin
+    """
+    return f"{os.path.splitext(out_file)[0]}.neighbors.bin"
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _layout(count: int) -> tuple[int, int, int, int]:
+    """
+    :return: (距離矩陣位移, 鄰近清單位移, 鄰近距離位移, meta 位移)，相對於檔案開頭
+    """
+    matrix_offset = _align(HEADER_SIZE)
+    order_offset = _align(matrix_offset + count * count * 4)
+    km_offset = _align(order_offset + count * max(count - 1, 0) * 2)
+    meta_offset = _align(km_offset + count * max(count - 1, 0) * 4)
+    return matrix_offset, order_offset, km_offset, meta_offset
+
+
+def distance_matrix(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    以單位向量的內積一次計算所有點兩兩之間的大圓距離
+
+    :return: N x N float32 (公里)，對角線為 0
+    """
+    xyz = _to_xyz(np.asarray(latitudes, dtype=np.float64), np.asarray(longitudes, dtype=np.float64))
+    # |a - b|^2 = 2 - 2 a·b，再由弦長換算為弧長
+    chord = np.sqrt(np.clip(2.0 - 2.0 * (xyz @ xyz.T), 0.0, 4.0))
+    km = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0.0, 1.0))
+    np.fill_diagonal(km, 0.0)
+    return km.astype(np.float32)
+
+
+def sorted_neighbors(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    :param matrix: distance_matrix() 的回傳值
+    :return: (N x (N - 1) u16 鄰近 index, N x (N - 1) float32 距離)，各列依距離遞增，距離相同時依 index
+    """
+    count = len(matrix)
+    masked = matrix.astype(np.float64)
+    np.fill_diagonal(masked, np.inf)
+    order = np.argsort(masked, axis=1, kind="stable")[:, :count - 1]
+    return order.astype(np.uint16), np.take_along_axis(matrix, order, axis=1)
+
+
+def write_neighbors(area_codes: Mapping[str, Mapping[str, Any]], file_path: str) -> str:
+    """
+    計算距離矩陣與鄰近清單並寫入檔案，先寫入暫存檔再 rename
+
+    :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+    :param file_path: 輸出檔案路徑，一般為 neighbors_path(out_file)
+    :return: payload 的 sha256
+    """
+    count = len(area_codes)
+    if count > MAX_AREAS:
+        raise ValueError(f"Too many areas for u16 neighbor lists: {count}")
+    areas = list(area_codes.values())
+    matrix = distance_matrix(np.array([float(a["latitude"]) for a in areas]),
+                             np.array([float(a["longitude"]) for a in areas]))
+    order, km = sorted_neighbors(matrix)
+    meta = json.dumps({"keys": list(area_codes.keys()),
+                       "zip_codes": [a.get("zip_code", "") for a in areas],
+                       "geo_codes": [a.get("geo_code_103", "") for a in areas]},
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    matrix_offset, order_offset, km_offset, meta_offset = _layout(count)
+    payload = bytearray(meta_offset - HEADER_SIZE)
+    for offset, array in ((matrix_offset, matrix.astype("<f4")), (order_offset, order.astype("<u2")),
+                          (km_offset, km.astype("<f4"))):
+        data = array.tobytes()
+        payload[offset - HEADER_SIZE: offset - HEADER_SIZE + len(data)] = data
+    payload += meta
+
+    digest = hashlib.sha256(payload).digest()
+    header = _HEADER.pack(MAGIC, VERSION, HEADER_SIZE, count, len(meta), len(payload), digest,
+                          bytes.fromhex(content_hash(area_codes)))
+
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "wb") as output_file:
+        output_file.write(header)
+        output_file.write(payload)
+    os.replace(tmp_path, file_path)
+    return digest.hex()
+
+
+class NeighborIndex:
+    """
+    以 mmap 開啟的唯讀距離矩陣與鄰近清單
+    """
+
+    def __init__(self, buffer: mmap.mmap | bytes, verify: bool = False):
+        """
+        :param buffer: 檔案內容，一般由 NeighborIndex.open() 傳入 mmap
+        :param verify: 是否驗證 payload 的 sha256
+        """
+        if len(buffer) < HEADER_SIZE:
+            raise ValueError("Neighbors file too short")
+        magic, version, header_size, count, meta_size, payload_size, digest, dataset_hash = \
+            _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a neighbors file: magic {magic!r}")
+        if version != VERSION or header_size != HEADER_SIZE:
+            raise ValueError(f"Unsupported neighbors version {version}")
+        if len(buffer) < HEADER_SIZE + payload_size:
+            raise ValueError("Neighbors file truncated")
+        if verify and hashlib.sha256(memoryview(buffer)[HEADER_SIZE:HEADER_SIZE + payload_size]).digest() != digest:
+            raise ValueError("Neighbors payload sha256 mismatch")
+
+        self._buffer = buffer
+        self.count = count
+        self.sha256 = digest.hex()
+        self.version = dataset_hash.hex()
+        matrix_offset, order_offset, km_offset, meta_offset = _layout(count)
+        width = max(count - 1, 0)
+        self.matrix = np.frombuffer(buffer, dtype="<f4", count=count * count, offset=matrix_offset).reshape(count, count)
+        self.order = np.frombuffer(buffer, dtype="<u2", count=count * width, offset=order_offset).reshape(count, width)
+        self.order_km = np.frombuffer(buffer, dtype="<f4", count=count * width, offset=km_offset).reshape(count, width)
+        meta = json.loads(bytes(buffer[meta_offset:meta_offset + meta_size]).decode("utf-8"))
+        self.keys: list[str] = meta["keys"]
+        self.zip_codes: list[str] = meta["zip_codes"]
+        self.geo_codes: list[str] = meta["geo_codes"]
+
+        self._by_code: dict[str, list[int]] = {}
+        for i, zip_code in enumerate(self.zip_codes):
+            self._by_code.setdefault(zip_code, []).append(i)
+        for i, geo_code in enumerate(self.geo_codes):
+            if geo_code:
+                self._by_code[geo_code] = [i]
+
+    @classmethod
+    def open(cls, file_path: str, verify: bool = False) -> NeighborIndex:
+        with open(file_path, "rb") as input_file:
+            buffer = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, verify=verify)
+
+    @classmethod
+    def from_area_codes(cls, area_codes: Mapping[str, Mapping[str, Any]], file_path: str) -> NeighborIndex:
+        """
+        寫入 file_path 後開啟
+        """
+        write_neighbors(area_codes, file_path)
+        return cls.open(file_path)
+
+    def close(self) -> None:
+        """
+        釋放 mmap；呼叫端仍持有 matrix 等陣列 (或其切片) 時，mmap 在這些陣列釋放後才關閉
+        """
+        self.matrix = self.order = self.order_km = None
+        if isinstance(self._buffer, mmap.mmap):
+            try:
+                self._buffer.close()
+            except BufferError:
+                pass
+
+    def __enter__(self) -> NeighborIndex:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def indices(self, code: str) -> list[int]:
+        """
+        :param code: geo_code_103 或 zip_code
+        :return: 對應的行政區 index (郵遞區號可能對應多個)
+        """
+        try:
+            return self._by_code[code]
+        except KeyError:
+            raise KeyError(f"Unknown geo_code_103 or zip_code: {code}") from None
+
+    def _neighbor(self, index: int, km: float) -> Neighbor:
+        return Neighbor(self.keys[index], self.zip_codes[index], self.geo_codes[index], float(km))
+
+    def _union_distances(self, sources: list[int]) -> np.ndarray:
+        km = self.matrix[sources].min(axis=0)
+        km[sources] = np.inf
+        return km
+
+    def distance(self, code_a: str, code_b: str) -> float:
+        """
+        :return: 兩個行政區中心點的距離 (公里)，郵遞區號對應多個行政區時取最短距離
+        """
+        return float(self.matrix[np.ix_(self.indices(code_a), self.indices(code_b))].min())
+
+    def k_nearest(self, code: str, k: int = 5) -> list[Neighbor]:
+        """
+        :param code: geo_code_103 或 zip_code
+        :param k: 回傳的數量
+        :return: 依距離由近到遠排序，不含 code 本身
+        """
+        sources = self.indices(code)
+        if len(sources) == 1:
+            i = sources[0]
+            return [self._neighbor(j, d) for j, d in zip(self.order[i, :k].tolist(), self.order_km[i, :k].tolist())]
+        km = self._union_distances(sources)
+        k = min(k, self.count - len(sources))
+        nearest = np.argpartition(km, k - 1)[:k] if k > 0 else np.array([], dtype=np.int64)
+        nearest = nearest[np.lexsort((nearest, km[nearest]))]
+        return [self._neighbor(j, km[j]) for j in nearest.tolist()]
+
+    def within_radius(self, code: str, radius_km: float) -> list[Neighbor]:
+        """
+        :param code: geo_code_103 或 zip_code
+        :param radius_km: 半徑 (公里)，包含等於半徑的行政區
+        :return: 依距離由近到遠排序，不含 code 本身
+        """
+        sources = self.indices(code)
+        if len(sources) == 1:
+            i = sources[0]
+            end = int(np.searchsorted(self.order_km[i], np.float32(radius_km), side="right"))
+            return [self._neighbor(j, d) for j, d in zip(self.order[i, :end].tolist(), self.order_km[i, :end].tolist())]
+        km = self._union_distances(sources)
+        inside = np.flatnonzero(km <= np.float32(radius_km))
+        inside = inside[np.lexsort((inside, km[inside]))]
+        return [self._neighbor(j, km[j]) for j in inside.tolist()]
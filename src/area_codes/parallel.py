@@ -0,0 +1,156 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any
+
+try:
+    from .profiling import PipelineStats, StageStats
+except ImportError:
+    from profiling import PipelineStats, StageStats
+
+import logging
+logger = logging.getLogger(__name__)
+
+"""
+以 process pool 平行解析三個來源檔
+
+fetch_geoxml()、fetch_enname()、fetch_areacode() 彼此獨立且都是純 Python 的解析 (CPU bound)，
+以三個 process 同時解析，worker 將結果壓成欄位名稱 + tuple 的精簡格式回傳，減少 pickle 的大小與時間，
+主 process 再還原成 fetch_*() 原本的回傳格式
+
+合併不等三個來源都完成：英文名稱與行政區代碼都以 GeoXML 的行政區名對應，GeoXML 完成後即建立 AREA_CODES，
+其餘兩個來源依完成的順序套用 (merge_enname / merge_areacode)，結果與 merge() 相同
+
+    area_list, enname_list, geo_code_103, merged = parallel_fetch(geoxml_path, enname_path, areacode_path)
+    area_code, report = merged
+
+或
+
+    convert(..., parallel=True)
+    python src/area_codes/convert.py --parallel
+"""
+
+SOURCES = ("geoxml", "enname", "areacode")
+
+
+def _convert_module():
+    # worker 在子 process 中才載入 convert，避免與 convert.py 互相 import
+    try:
+        from . import convert
+    except ImportError:
+        import convert
+    return convert
+
+
+def pack(source: str, parsed: Any) -> Any:
+    """
+    將 fetch_*() 的回傳值壓成 tuple 格式
+
+    - geoxml    (欄位名稱, [(值, ...), ...])
+    - enname    [(zip, 中文名稱, 英文名稱), ...]
+    - areacode  (欄位名稱, [(行政區名, 值, ...), ...])
+
+    欄位名稱為所有列的聯集，該列沒有的欄位以 None 表示 (解析出的值都是字串)
+    """
+    if source == "geoxml":
+        fields = tuple(dict.fromkeys(f for row in parsed for f in row))
+        return fields, [tuple(row.get(f) for f in fields) for row in parsed]
+    if source == "enname":
+        return [tuple(row) for row in parsed]
+    if source == "areacode":
+        fields = tuple(dict.fromkeys(f for row in parsed.values() for f in row))
+        return fields, [(name, *(row.get(f) for f in fields)) for name, row in parsed.items()]
+    raise ValueError(f"Unknown source {source!r}, expected one of {SOURCES}")
+
+
+def unpack(source: str, packed: Any) -> Any:
+    """
+    pack() 的反向操作，還原成 fetch_*() 的回傳格式
+    """
+    if source == "geoxml":
+        fields, rows = packed
+        return [{f: v for f, v in zip(fields, row) if v is not None} for row in rows]
+    if source == "enname":
+        return [list(row) for row in packed]
+    if source == "areacode":
+        fields, rows = packed
+        return {row[0]: {f: v for f, v in zip(fields, row[1:]) if v is not None} for row in rows}
+    raise ValueError(f"Unknown source {source!r}, expected one of {SOURCES}")
+
+
+def fetch_packed(source: str, path: str) -> tuple[Any, StageStats]:
+    """
+    worker 執行的函式，解析一個來源檔
+
+    :param source: SOURCES 之一
+    :param path: 來源檔路徑或 URL
+    :return: (pack() 的結果, 該階段的量測結果)
+    """
+    convert = _convert_module()
+    fetch = {"geoxml": convert.fetch_geoxml, "enname": convert.fetch_enname,
+             "areacode": convert.fetch_areacode}[source]
+    stage = StageStats(f"fetch_{source}")
+    start = time.perf_counter()
+    parsed = fetch(path, stage=stage)
+    stage.rows = len(parsed)
+    packed = pack(source, parsed)
+    stage.wall_time = time.perf_counter() - start
+    return packed, stage
+
+
+def parallel_fetch(geoxml_path: str, enname_path: str, areacode_path: str, stats: PipelineStats | None = None,
+                   merge: bool = True) -> tuple[list, list, dict, tuple | None]:
+    """
+    以三個 process 平行解析三個來源，並在 GeoXML 完成後依完成順序合併
+
+    :param geoxml_path: fetch_geoxml() 的來源
+    :param enname_path: fetch_enname() 的來源
+    :param areacode_path: fetch_areacode() 的來源
+    :param stats: 指定時記錄 parallel 階段 (解析 + 合併的總時間、bytes、筆數)，各 worker 的時間寫入 log
+    :param merge: 是否合併，False 時 (例如增量模式) 只回傳解析結果
+    :return: (area_list, enname_list, geo_code_103, (AREA_CODES dict, MergeReport) 或 None)
+    """
+    convert = _convert_module()
+    if stats is None:
+        stats = PipelineStats()
+    paths = {"geoxml": geoxml_path, "enname": enname_path, "areacode": areacode_path}
+    parsed: dict[str, Any] = {}
+    merged = None
+
+    with stats.stage("parallel") as stage:
+        with ProcessPoolExecutor(max_workers=len(SOURCES)) as executor:
+            futures = {executor.submit(fetch_packed, source, path): source for source, path in paths.items()}
+            pending = set(futures)
+            report = convert.MergeReport()
+            area_code = keys_by_name = None
+            applied = set()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source = futures[future]
+                    packed, worker_stage = future.result()
+                    parsed[source] = unpack(source, packed)
+                    stage.bytes_read += worker_stage.bytes_read
+                    stage.bytes_downloaded += worker_stage.bytes_downloaded
+                    logger.info(f"{worker_stage.name}: {worker_stage.rows} rows in {worker_stage.wall_time * 1e3:.1f} ms")
+
+                if not merge:
+                    continue
+                if area_code is None and "geoxml" in parsed:
+                    area_code, keys_by_name = convert.merge_geoxml(parsed["geoxml"], report)
+                if area_code is not None:
+                    if "enname" in parsed and "enname" not in applied:
+                        convert.merge_enname(area_code, keys_by_name, parsed["enname"], report)
+                        applied.add("enname")
+                    if "areacode" in parsed and "areacode" not in applied:
+                        convert.merge_areacode(area_code, keys_by_name, parsed["areacode"], report)
+                        applied.add("areacode")
+
+        if merge:
+            merged = (area_code, report)
+            stage.rows = len(area_code)
+        else:
+            stage.rows = len(parsed["geoxml"])
+
+    return parsed["geoxml"], parsed["enname"], parsed["areacode"], merged
@@ -0,0 +1,126 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+"""
+convert() 各階段的量測
+
+convert() 依序執行 download (指定 cache_dir 時)、fetch_geoxml、fetch_enname、fetch_areacode、merge、write，
+每個階段記錄：
+- wall_time          執行時間 (秒)
+- bytes_downloaded   自網路下載的 bytes
+- bytes_read         自本機檔案讀取的 bytes
+- rows               解析或輸出的筆數
+- peak_memory        階段內的記憶體峰值增量 (bytes)，需以 trace_memory=True 開啟 tracemalloc，否則為 None
+
+    stats = PipelineStats(trace_memory=True)
+    convert(..., stats=stats)
+    print(stats.table())
+    stats.to_dict()
+"""
+
+
+class StageStats:
+    """
+    單一階段的量測結果
+    """
+    __slots__ = ("name", "wall_time", "bytes_downloaded", "bytes_read", "rows", "peak_memory")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_time = 0.0
+        self.bytes_downloaded = 0
+        self.bytes_read = 0
+        self.rows = 0
+        self.peak_memory: int | None = None
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class CountingReader:
+    """
+    計算讀取 bytes 數的 binary file object 包裝，用於串流解析的下載內容
+    """
+
+    def __init__(self, raw: IO[bytes], stage: StageStats | None):
+        self._raw = raw
+        self._stage = stage
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        if self._stage is not None:
+            self._stage.bytes_downloaded += len(data)
+        return data
+
+
+class PipelineStats:
+    """
+    convert() 所有階段的量測結果，依執行順序排列
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        :param trace_memory: 是否以 tracemalloc 量測記憶體峰值 (會使執行變慢)
+        """
+        self.trace_memory = trace_memory
+        self.stages: list[StageStats] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """
+        量測一個階段
+
+            with stats.stage("merge") as stage:
+                ...
+                stage.rows = len(result)
+        """
+        stage = StageStats(name)
+        self.stages.append(stage)
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.wall_time = time.perf_counter() - start
+            if self.trace_memory:
+                stage.peak_memory = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def __getitem__(self, name: str) -> StageStats:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def __contains__(self, name: str) -> bool:
+        return any(stage.name == name for stage in self.stages)
+
+    @property
+    def total_time(self) -> float:
+        return sum(stage.wall_time for stage in self.stages)
+
+    def to_dict(self) -> dict:
+        return {"total_time": self.total_time, "stages": [stage.to_dict() for stage in self.stages]}
+
+    def table(self) -> str:
+        """
+        :return: 各階段量測結果的文字表格
+        """
+        lines = [f"{'stage':<16}{'wall ms':>10}{'downloaded':>14}{'read':>14}{'rows':>8}{'peak MB':>10}"]
+        for stage in self.stages:
+            peak = "-" if stage.peak_memory is None else f"{stage.peak_memory / 2 ** 20:.1f}"
+            lines.append(f"{stage.name:<16}{stage.wall_time * 1e3:>10.1f}{stage.bytes_downloaded:>14,}"
+                         f"{stage.bytes_read:>14,}{stage.rows:>8,}{peak:>10}")
+        lines.append(f"{'total':<16}{self.total_time * 1e3:>10.1f}")
+        return "\n".join(lines)
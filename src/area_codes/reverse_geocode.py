@@ -0,0 +1,279 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import logging
+import math
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+"""
+經緯度反查最近行政區 (get_data_by_latlng)
+
+以 convert() 輸出的行政區中心點經緯度建立網格索引：
+將中心點範圍切成 cell_size 度的網格，每個網格預先算出「可能是最近中心點」的候選清單，
+查詢時只需計算所在網格的少數候選距離，不必對全部 371 個中心點計算 haversine
+
+網格候選清單的判斷 (r 為網格中心到網格角落的最大距離、d_i 為網格中心到中心點 i 的距離)：
+網格內任一點 p 皆滿足 d(p, i) >= d_i - r 且 d(p, j) <= d_j + r，
+因此只有 d_i - r <= min(d_j) + r 的中心點可能成為最近點
+
+距離計算使用球面單位向量，比較大小時以內積取代 haversine，最後再換算為公里
+
+    geocoder = ReverseGeocoder.from_json("AREA_CODES.json")
+    geocoder.get_data_by_latlng(25.0324, 121.5198)           # area dict
+    geocoder.nearest_k(25.0324, 121.5198, k=3)               # [(area dict, km), ...]
+    indices, km = geocoder.query(lat_array, lng_array)       # NumPy 批次查詢
+"""
+
+EARTH_RADIUS_KM = 6371.0088
+
+Area = dict[str, Any]
+
+
+def haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    兩點間的大圓距離
+
+    :return: 公里
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _haversine_np(lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray) -> np.ndarray:
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _to_xyz(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    phi, lam = np.radians(lat), np.radians(lng)
+    cos_phi = np.cos(phi)
+    return np.stack([cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)], axis=-1)
+
+
+def _chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0.0, 1.0))
+
+
+class ReverseGeocoder:
+    """
+    以行政區中心點建立的最近行政區查詢索引
+    """
+
+    def __init__(self, area_codes: dict[str, Area], cell_size: float = 0.1, margin: float = 1.0,
+                 max_candidates: int = 8, chunk_size: int = 65536):
+        """
+        :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+        :param cell_size: 網格大小 (度)
+        :param margin: 網格範圍向外延伸的度數，範圍外的點改以全量比對
+        :param max_candidates: 批次查詢時每個網格最多比對的候選數，超過的網格改以全量比對
+        :param chunk_size: 批次查詢時每次處理的點數，用來限制暫存陣列的記憶體用量
+        """
+        if not area_codes:
+            raise ValueError("area_codes is empty")
+
+        self.keys: list[str] = list(area_codes.keys())
+        self.areas: list[Area] = list(area_codes.values())
+        self.latitudes = np.array([float(a["latitude"]) for a in self.areas], dtype=np.float64)
+        self.longitudes = np.array([float(a["longitude"]) for a in self.areas], dtype=np.float64)
+        self._xyz = _to_xyz(self.latitudes, self.longitudes)
+        self._points = list(zip(self.latitudes.tolist(), self.longitudes.tolist()))
+        self.chunk_size = chunk_size
+
+        self.cell_size = cell_size
+        self._lat0 = float(self.latitudes.min()) - margin
+        self._lng0 = float(self.longitudes.min()) - margin
+        self._rows = int(math.ceil((float(self.latitudes.max()) + margin - self._lat0) / cell_size))
+        self._cols = int(math.ceil((float(self.longitudes.max()) + margin - self._lng0) / cell_size))
+        self._cell_lists, self._cell_candidates, self._cell_overflow = self._build_cells(max_candidates)
+
+        logger.debug(f"ReverseGeocoder built: {len(self.areas)} centroids, {self._rows}x{self._cols} cells, "
+                     f"{int(self._cell_overflow.sum())} cells over {max_candidates} candidates")
+
+    @classmethod
+    def from_json(cls, file_path: str, **kwargs) -> ReverseGeocoder:
+        """
+        由 AREA_CODES.json 建立索引
+
+        :param file_path: JSON 檔案路徑
+        :return: ReverseGeocoder
+        """
+        with open(file_path, "r", encoding="utf-8") as input_file:
+            return cls(json.load(input_file), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.areas)
+
+    def _build_cells(self, max_candidates: int) -> tuple[list[tuple[int, ...]], np.ndarray, np.ndarray]:
+        """
+        計算每個網格的候選中心點
+
+        :return: (每個網格的候選 tuple, (網格數, max_candidates) 的候選 index 陣列, 候選數超過 max_candidates 的網格)
+                 候選數不足的網格以第一個候選補齊，批次查詢時不需另外處理遮罩
+        """
+        cs = self.cell_size
+        rows, cols = np.meshgrid(np.arange(self._rows), np.arange(self._cols), indexing="ij")
+        south = (self._lat0 + rows * cs).ravel()
+        west = (self._lng0 + cols * cs).ravel()
+        center_lat, center_lng = south + cs / 2, west + cs / 2
+
+        radius = np.zeros_like(center_lat)
+        for corner_lat, corner_lng in ((south, west), (south, west + cs), (south + cs, west), (south + cs, west + cs)):
+            radius = np.maximum(radius, _haversine_np(center_lat, center_lng, corner_lat, corner_lng))
+        # 避免浮點誤差造成候選遺漏
+        radius = radius * 1.001 + 1e-6
+
+        cell_lists = []
+        step = 2048
+        for start in range(0, center_lat.size, step):
+            end = start + step
+            dist = _haversine_np(center_lat[start:end, None], center_lng[start:end, None],
+                                 self.latitudes[None, :], self.longitudes[None, :])
+            r = radius[start:end, None]
+            mask = dist - r <= dist.min(axis=1, keepdims=True) + r
+            cell_lists.extend(tuple(np.flatnonzero(m).tolist()) for m in mask)
+
+        table = np.empty((len(cell_lists), max_candidates), dtype=np.intp)
+        overflow = np.zeros(len(cell_lists), dtype=bool)
+        for i, c in enumerate(cell_lists):
+            if len(c) > max_candidates:
+                overflow[i] = True
+                c = c[:1]
+            table[i, :len(c)] = c
+            table[i, len(c):] = c[0]
+        return cell_lists, table, overflow
+
+    def _cell_index(self, lat: np.ndarray, lng: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        with np.errstate(invalid="ignore"):
+            row = np.floor((lat - self._lat0) / self.cell_size)
+            col = np.floor((lng - self._lng0) / self.cell_size)
+            inside = (row >= 0) & (row < self._rows) & (col >= 0) & (col < self._cols)
+        cell = np.zeros(lat.shape, dtype=np.intp)
+        cell[inside] = row[inside].astype(np.intp) * self._cols + col[inside].astype(np.intp)
+        return cell, inside
+
+    def get_data_by_latlng(self, latitude: float, longitude: float) -> Area | None:
+        """
+        查詢距離最近的行政區
+
+        :param latitude: 緯度
+        :param longitude: 經度
+        :return: area dict，經緯度不合法時回傳 None
+        """
+        index, _ = self.nearest(latitude, longitude)
+        return self.areas[index] if index >= 0 else None
+
+    def nearest(self, latitude: float, longitude: float) -> tuple[int, float]:
+        """
+        查詢單點最近的行政區
+
+        :return: (areas 中的 index, 距離公里數)，經緯度不合法時回傳 (-1, nan)
+        """
+        if not (math.isfinite(latitude) and math.isfinite(longitude)):
+            return -1, math.nan
+
+        row = math.floor((latitude - self._lat0) / self.cell_size)
+        col = math.floor((longitude - self._lng0) / self.cell_size)
+        if 0 <= row < self._rows and 0 <= col < self._cols:
+            candidates = self._cell_lists[row * self._cols + col]
+        else:
+            candidates = range(len(self.areas))
+
+        points = self._points
+        best, best_km = -1, math.inf
+        for i in candidates:
+            km = haversine(latitude, longitude, *points[i])
+            if km < best_km:
+                best, best_km = i, km
+        return best, best_km
+
+    def nearest_k(self, latitude: float, longitude: float, k: int = 5) -> list[tuple[Area, float]]:
+        """
+        查詢距離最近的 k 個行政區
+
+        :return: [(area dict, 距離公里數), ...] 依距離由近到遠排序
+        """
+        indices, km = self.query_k(np.array([latitude]), np.array([longitude]), k)
+        return [(self.areas[i], float(d)) for i, d in zip(indices[0], km[0]) if i >= 0]
+
+    def query(self, latitudes: np.ndarray, longitudes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        批次查詢最近的行政區
+
+        :param latitudes: 緯度陣列
+        :param longitudes: 經度陣列
+        :return: (areas 中的 index 陣列, 距離公里數陣列)，經緯度不合法的點 index 為 -1、距離為 nan
+        """
+        lat = np.asarray(latitudes, dtype=np.float64).ravel()
+        lng = np.asarray(longitudes, dtype=np.float64).ravel()
+        if lat.shape != lng.shape:
+            raise ValueError(f"latitudes and longitudes shape mismatch: {lat.shape} != {lng.shape}")
+
+        indices = np.full(lat.shape, -1, dtype=np.intp)
+        km = np.full(lat.shape, np.nan, dtype=np.float64)
+        for start in range(0, lat.size, self.chunk_size):
+            end = start + self.chunk_size
+            indices[start:end], km[start:end] = self._query_chunk(lat[start:end], lng[start:end])
+        return indices, km
+
+    def _query_chunk(self, lat: np.ndarray, lng: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        valid = np.isfinite(lat) & np.isfinite(lng)
+        q = _to_xyz(lat, lng)
+        cell, inside = self._cell_index(lat, lng)
+        inside &= ~self._cell_overflow[cell]
+        indices = np.full(lat.shape, -1, dtype=np.intp)
+
+        in_grid = np.flatnonzero(inside)
+        if in_grid.size:
+            candidates = self._cell_candidates[cell[in_grid]]
+            dots = np.einsum("mkd,md->mk", self._xyz[candidates], q[in_grid])
+            indices[in_grid] = candidates[np.arange(in_grid.size), dots.argmax(axis=1)]
+
+        outside = np.flatnonzero(valid & ~inside)
+        if outside.size:
+            indices[outside] = (q[outside] @ self._xyz.T).argmax(axis=1)
+
+        km = np.full(lat.shape, np.nan, dtype=np.float64)
+        found = indices >= 0
+        km[found] = _chord_to_km(np.linalg.norm(q[found] - self._xyz[indices[found]], axis=1))
+        return indices, km
+
+    def query_k(self, latitudes: np.ndarray, longitudes: np.ndarray, k: int = 5) -> tuple[np.ndarray, np.ndarray]:
+        """
+        批次查詢最近的 k 個行政區
+
+        :return: (index 陣列 shape (N, k), 距離公里數陣列 shape (N, k))，依距離由近到遠排序，
+                 經緯度不合法的點 index 為 -1、距離為 nan
+        """
+        lat = np.asarray(latitudes, dtype=np.float64).ravel()
+        lng = np.asarray(longitudes, dtype=np.float64).ravel()
+        if lat.shape != lng.shape:
+            raise ValueError(f"latitudes and longitudes shape mismatch: {lat.shape} != {lng.shape}")
+        k = max(1, min(k, len(self.areas)))
+
+        indices = np.full((lat.size, k), -1, dtype=np.intp)
+        km = np.full((lat.size, k), np.nan, dtype=np.float64)
+        for start in range(0, lat.size, self.chunk_size):
+            end = start + self.chunk_size
+            c_lat, c_lng = lat[start:end], lng[start:end]
+            valid = np.flatnonzero(np.isfinite(c_lat) & np.isfinite(c_lng))
+            if not valid.size:
+                continue
+            q = _to_xyz(c_lat[valid], c_lng[valid])
+            dots = q @ self._xyz.T
+            if k < len(self.areas):
+                part = np.argpartition(-dots, k - 1, axis=1)[:, :k]
+            else:
+                part = np.broadcast_to(np.arange(k), dots.shape).copy()
+            order = np.argsort(-np.take_along_axis(dots, part, axis=1), axis=1)
+            best = np.take_along_axis(part, order, axis=1)
+            indices[start + valid] = best
+            km[start + valid] = _chord_to_km(np.linalg.norm(q[:, None, :] - self._xyz[best], axis=2))
+        return indices, km
@@ -0,0 +1,276 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from urllib.parse import unquote
+
+try:
+    from .reverse_geocode import ReverseGeocoder
+except ImportError:
+    from reverse_geocode import ReverseGeocoder
+
+logger = logging.getLogger(__name__)
+
+"""
+AREA_CODES 唯讀查詢 API (asyncio)
+
+    python -m src.area_codes.server [-f AREA_CODES.json] [--host 127.0.0.1] [--port 8080]
+
+URIs:
+    /allareas                                       所有行政區
+    /get_data_by_zip_code/{zip_code}                以郵遞區號查詢行政區
+    /get_geo_103_by_zip_code/{zip_code}             以郵遞區號查詢 geo_code_103
+    /get_data_by_latlng/{latitude}/{longitude}      以經緯度查詢最近的行政區
+
+啟動時 (以及檔案變更時) 將 AREA_CODES.json 載入並預先產生所有回應的 JSON bytes、gzip bytes 與 ETag，
+請求處理時只需查表：
+- 支援 If-None-Match，ETag 相同時回應 304
+- Accept-Encoding 含 gzip 時回應預先壓縮的內容
+- 背景定期檢查檔案的 mtime/size，變更時在 thread 中建立新的 AreaDataset，完成後一次替換，
+  處理中的請求繼續使用舊的 AreaDataset，不會讀到一半的資料
+"""
+
+JSON_CONTENT_TYPE = b"application/json; charset=utf-8"
+MAX_HEADER_SIZE = 16 * 1024
+
+STATUS_TEXT = {200: b"OK", 304: b"Not Modified", 400: b"Bad Request", 404: b"Not Found",
+               405: b"Method Not Allowed", 431: b"Request Header Fields Too Large"}
+
+
+class Response:
+    """
+    預先序列化的回應內容
+    """
+    __slots__ = ("status", "body", "gzip_body", "etag")
+
+    def __init__(self, status: int, data: object):
+        self.status = status
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, mtime=0)
+        self.etag = f'"{hashlib.sha1(self.body).hexdigest()}"'.encode("ascii")
+
+
+def _error(status: int, message: str) -> Response:
+    return Response(status, {"error": message})
+
+
+NOT_FOUND = _error(404, "not found")
+BAD_REQUEST = _error(400, "bad request")
+METHOD_NOT_ALLOWED = _error(405, "method not allowed")
+
+
+class AreaDataset:
+    """
+    由 AREA_CODES.json 建立的查詢資料，建立後不再修改
+    """
+
+    def __init__(self, area_codes: dict[str, dict], version: str = ""):
+        """
+        :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+        :param version: 資料版本 (例如檔案的 mtime)，只用於記錄
+        """
+        self.version = version
+        records = [{"id": int(key) if key.isdigit() else key, **area} for key, area in area_codes.items()]
+
+        by_zip: dict[str, list[dict]] = {}
+        for record in records:
+            by_zip.setdefault(record["zip_code"], []).append(record)
+
+        self.all_areas = Response(200, records)
+        self.by_zip_code = {zip_code: Response(200, areas) for zip_code, areas in by_zip.items()}
+        self.geo_103_by_zip_code = {
+            zip_code: Response(200, [{"id": a["id"], "zip_code": a["zip_code"], "area_name": a["area_name"],
+                                      "geo_code_103": a["geo_code_103"]} for a in areas])
+            for zip_code, areas in by_zip.items()
+        }
+        self.by_area = [Response(200, [record]) for record in records]
+        self.geocoder = ReverseGeocoder(area_codes) if area_codes else None
+
+    @classmethod
+    def from_json(cls, file_path: str) -> AreaDataset:
+        stat = os.stat(file_path)
+        with open(file_path, "r", encoding="utf-8") as input_file:
+            return cls(json.load(input_file), version=f"{stat.st_mtime_ns}:{stat.st_size}")
+
+    def route(self, path: str) -> Response:
+        """
+        :param path: 請求路徑 (不含 query string)
+        :return: Response
+        """
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+        if parts == ["allareas"]:
+            return self.all_areas
+        if len(parts) == 2 and parts[0] == "get_data_by_zip_code":
+            return self.by_zip_code.get(parts[1], NOT_FOUND)
+        if len(parts) == 2 and parts[0] == "get_geo_103_by_zip_code":
+            return self.geo_103_by_zip_code.get(parts[1], NOT_FOUND)
+        if len(parts) == 3 and parts[0] == "get_data_by_latlng":
+            try:
+                latitude, longitude = float(parts[1]), float(parts[2])
+            except ValueError:
+                return BAD_REQUEST
+            if self.geocoder is None or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                return BAD_REQUEST
+            index, _ = self.geocoder.nearest(latitude, longitude)
+            return self.by_area[index] if index >= 0 else BAD_REQUEST
+        return NOT_FOUND
+
+
+class AreaServer:
+    """
+    asyncio HTTP/1.1 server，支援 keep-alive、GET / HEAD
+    """
+
+    def __init__(self, file_path: str, host: str = "127.0.0.1", port: int = 8080, reload_interval: float = 2.0):
+        """
+        :param file_path: AREA_CODES.json 路徑
+        :param host: 監聽位址
+        :param port: 監聽 port，0 表示由系統指定
+        :param reload_interval: 檢查檔案變更的間隔秒數，0 表示不自動重新載入
+        """
+        self.file_path = file_path
+        self.host = host
+        self.port = port
+        self.reload_interval = reload_interval
+        self.dataset = AreaDataset.from_json(file_path)
+        self._server: asyncio.base_events.Server | None = None
+        self._watcher: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.reload_interval > 0:
+            self._watcher = asyncio.create_task(self._watch())
+        logger.info(f"Serving {self.file_path} on http://{self.host}:{self.port}")
+
+    async def close(self) -> None:
+        if self._watcher:
+            self._watcher.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def reload(self) -> bool:
+        """
+        檔案有變更時重新載入，載入失敗時保留目前的資料
+
+        :return: 是否已替換為新的資料
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except OSError as e:
+            logger.warning(f"Stat {self.file_path} error: {e}")
+            return False
+        if f"{stat.st_mtime_ns}:{stat.st_size}" == self.dataset.version:
+            return False
+
+        try:
+            dataset = await asyncio.get_running_loop().run_in_executor(None, AreaDataset.from_json, self.file_path)
+        except Exception as e:
+            # 格式錯誤的檔案 ([]、{"1": "x"}、缺少欄位) 會引發 AttributeError / TypeError / KeyError
+            logger.warning(f"Reload {self.file_path} error, keep version {self.dataset.version}: {e!r}")
+            return False
+        self.dataset = dataset
+        logger.info(f"Reloaded {self.file_path}: version {dataset.version}")
+        return True
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception(f"Reload {self.file_path} error")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(self._render(_error(431, "header too large"), {}, False, False))
+                    break
+                if len(head) > MAX_HEADER_SIZE:
+                    writer.write(self._render(_error(431, "header too large"), {}, False, False))
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                request_line = lines[0].split(" ")
+                if len(request_line) != 3:
+                    writer.write(self._render(BAD_REQUEST, {}, False, False))
+                    break
+                method, target, version = request_line
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              if version == "HTTP/1.1" else headers.get("connection", "").lower() == "keep-alive")
+                if method not in ("GET", "HEAD"):
+                    response = METHOD_NOT_ALLOWED
+                else:
+                    response = self.dataset.route(target.split("?", 1)[0])
+                writer.write(self._render(response, headers, method == "HEAD", keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _render(response: Response, headers: dict, head_only: bool, keep_alive: bool) -> bytes:
+        status = response.status
+        body = response.body
+        extra = b""
+        if status == 200 and headers.get("if-none-match") in (response.etag.decode("ascii"), "*"):
+            status, body = 304, b""
+        elif "gzip" in headers.get("accept-encoding", ""):
+            body = response.gzip_body
+            extra = b"Content-Encoding: gzip\r\n"
+
+        return b"".join((
+            b"HTTP/1.1 ", f"{status}".encode("ascii"), b" ", STATUS_TEXT.get(status, b""), b"\r\n",
+            b"Content-Type: ", JSON_CONTENT_TYPE, b"\r\n",
+            b"Content-Length: ", f"{len(body)}".encode("ascii"), b"\r\n",
+            b"ETag: ", response.etag, b"\r\n",
+            b"Vary: Accept-Encoding\r\n",
+            extra,
+            b"Connection: keep-alive\r\n" if keep_alive else b"Connection: close\r\n",
+            b"\r\n",
+            b"" if head_only else body,
+        ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve AREA_CODES.json over HTTP')
+    parser.add_argument("-f", "--file", default="AREA_CODES.json",
+                        help="Specify the AREA_CODES.json file path. default: AREA_CODES.json")
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address. default: 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="Listen port. default: 8080")
+    parser.add_argument("--reload-interval", type=float, default=2.0,
+                        help="Seconds between checks for file changes, 0 to disable. default: 2")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(AreaServer(args.file, args.host, args.port, args.reload_interval).serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,300 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Any, Iterator
+
+"""
+AREA_CODES 二進位快照
+
+AREA_CODES.json 仍是交換格式，快照只是給 API worker、短生命週期 CLI 使用的載入格式：
+以 mmap 開啟，fork 出來的 worker 共用同一份 page cache，載入時只解析 64 bytes 的 header，
+欄位值在存取時才從檔案中讀取
+
+檔案格式 (little-endian，各區段以 8 bytes 對齊)：
+    header (64 bytes)
+        magic "TWAC" | version u16 | header size u16 | 筆數 u32 | 欄位數 u32 | 字串數 u32 |
+        payload bytes u64 | payload sha256 (32 bytes) | flags u32
+    payload
+        欄位表        欄位數 x (欄位名稱字串 id u32, 型別 u32)   型別 0: 字串, 1: float64
+        key 欄位      筆數 x 字串 id u32                       AREA_CODES 的序號 key
+        各欄位資料     字串欄位為 筆數 x 字串 id u32，float64 欄位為 筆數 x f64
+        字串位移表     (字串數 + 1) x u32
+        字串資料       UTF-8，重複的字串 (例如縣市名) 只存一份
+
+    write_snapshot(area_codes, "AREA_CODES.bin")
+    with Snapshot.open("AREA_CODES.bin") as snapshot:
+        snapshot["1"]                     # area dict，與 AREA_CODES.json 相同
+        snapshot.column("zip_code")       # 單一欄位
+        snapshot.float_column("latitude") # memoryview，可直接給 numpy.frombuffer 使用
+"""
+
+MAGIC = b"TWAC"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHIIIQ32sI")
+HEADER_SIZE = _HEADER.size
+
+TYPE_STR = 0
+TYPE_FLOAT = 1
+
+# header flags
+FLAG_SEQUENTIAL_KEYS = 1    # key 為 "1".."N"，查詢時可直接換算為第幾筆
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _layout(count: int, types: list[int]) -> tuple[int, int, list[int], int]:
+    """
+    計算 payload 內各區段的位移 (相對於檔案開頭)
+
+    :return: (欄位表位移, key 欄位位移, [各欄位位移], 字串位移表位移)
+    """
+    offset = HEADER_SIZE
+    fields_offset = offset
+    offset = _align(offset + len(types) * 8)
+    keys_offset = offset
+    offset = _align(offset + count * 4)
+    column_offsets = []
+    for field_type in types:
+        column_offsets.append(offset)
+        offset = _align(offset + count * (8 if field_type == TYPE_FLOAT else 4))
+    return fields_offset, keys_offset, column_offsets, offset
+
+
+def write_snapshot(area_codes: dict[str, dict], file_path: str) -> str:
+    """
+    將 convert() 的輸出寫成二進位快照，先寫入暫存檔再 rename，讀取端不會讀到寫到一半的檔案
+
+    :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+    :param file_path: 輸出檔案路徑
+    :return: payload 的 sha256
+    """
+    areas = list(area_codes.values())
+    fields = list(areas[0].keys()) if areas else []
+    types = []
+    for field in fields:
+        values = [a.get(field) for a in areas]
+        if all(isinstance(v, float) or (isinstance(v, int) and not isinstance(v, bool)) for v in values):
+            types.append(TYPE_FLOAT)
+        elif all(isinstance(v, str) for v in values):
+            types.append(TYPE_STR)
+        else:
+            raise ValueError(f"Field {field} must be all str or all float")
+
+    strings: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    field_table = [(intern(f), t) for f, t in zip(fields, types)]
+    key_ids = [intern(k) for k in area_codes.keys()]
+    columns = []
+    for field, field_type in zip(fields, types):
+        if field_type == TYPE_FLOAT:
+            columns.append(struct.pack(f"<{len(areas)}d", *(float(a[field]) for a in areas)))
+        else:
+            columns.append(struct.pack(f"<{len(areas)}I", *(intern(a[field]) for a in areas)))
+
+    encoded = [s.encode("utf-8") for s in strings]
+    string_offsets = [0]
+    for s in encoded:
+        string_offsets.append(string_offsets[-1] + len(s))
+
+    fields_offset, keys_offset, column_offsets, strings_offset = _layout(len(areas), types)
+    payload = bytearray(strings_offset - HEADER_SIZE)
+    struct.pack_into(f"<{len(field_table) * 2}I", payload, fields_offset - HEADER_SIZE,
+                     *(x for pair in field_table for x in pair))
+    struct.pack_into(f"<{len(key_ids)}I", payload, keys_offset - HEADER_SIZE, *key_ids)
+    for offset, column in zip(column_offsets, columns):
+        payload[offset - HEADER_SIZE: offset - HEADER_SIZE + len(column)] = column
+    payload += struct.pack(f"<{len(string_offsets)}I", *string_offsets)
+    payload += b"".join(encoded)
+
+    digest = hashlib.sha256(payload).digest()
+    flags = FLAG_SEQUENTIAL_KEYS if list(area_codes.keys()) == [f"{i}" for i in range(1, len(areas) + 1)] else 0
+    header = _HEADER.pack(MAGIC, VERSION, HEADER_SIZE, len(areas), len(fields), len(strings), len(payload),
+                          digest, flags)
+
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "wb") as output_file:
+        output_file.write(header)
+        output_file.write(payload)
+    os.replace(tmp_path, file_path)
+    return digest.hex()
+
+
+class Snapshot:
+    """
+    以 mmap 開啟的唯讀二進位快照
+    """
+
+    def __init__(self, buffer: mmap.mmap | bytes, verify: bool = False):
+        """
+        :param buffer: 快照內容，一般由 Snapshot.open() 傳入 mmap
+        :param verify: 是否驗證 payload 的 sha256
+        """
+        self._buffer = buffer
+        if len(buffer) < HEADER_SIZE:
+            raise ValueError("Snapshot too short")
+        (magic, version, header_size, count, n_fields, n_strings, payload_size,
+         digest, flags) = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"Not an AREA_CODES snapshot: magic {magic!r}")
+        if version != VERSION or header_size != HEADER_SIZE:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        if len(buffer) != HEADER_SIZE + payload_size:
+            raise ValueError("Snapshot size mismatch")
+        if verify and hashlib.sha256(buffer[HEADER_SIZE:]).digest() != digest:
+            raise ValueError("Snapshot hash mismatch")
+        self._view = memoryview(buffer)
+
+        self.version = version
+        self.content_hash = digest.hex()
+        self._count = count
+        self._sequential_keys = bool(flags & FLAG_SEQUENTIAL_KEYS)
+
+        fields_offset = HEADER_SIZE
+        field_table = self._view[fields_offset: fields_offset + n_fields * 8].cast("I")
+        types = [field_table[i * 2 + 1] for i in range(n_fields)]
+        _, keys_offset, column_offsets, strings_offset = _layout(count, types)
+
+        self._string_offsets = self._view[strings_offset: strings_offset + (n_strings + 1) * 4].cast("I")
+        self._blob_offset = strings_offset + (n_strings + 1) * 4
+        self._strings: list[str | None] = [None] * n_strings
+
+        self._keys = self._view[keys_offset: keys_offset + count * 4].cast("I")
+        self.fields: list[str] = [self.string(field_table[i * 2]) for i in range(n_fields)]
+        self._columns: dict[str, tuple[int, memoryview]] = {}
+        for field, field_type, offset in zip(self.fields, types, column_offsets):
+            if field_type == TYPE_FLOAT:
+                self._columns[field] = (field_type, self._view[offset: offset + count * 8].cast("d"))
+            else:
+                self._columns[field] = (field_type, self._view[offset: offset + count * 4].cast("I"))
+        self._row_by_key: dict[str, int] | None = None
+
+    @classmethod
+    def open(cls, file_path: str, verify: bool = False) -> Snapshot:
+        """
+        以 mmap 開啟快照檔
+
+        :param file_path: 快照檔案路徑
+        :param verify: 是否驗證 payload 的 sha256
+        :return: Snapshot
+        """
+        with open(file_path, "rb") as input_file:
+            buffer = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(buffer, verify=verify)
+        except Exception:
+            buffer.close()
+            raise
+
+    def close(self) -> None:
+        """
+        釋放 mmap，之後取得的 memoryview 都不能再使用
+        """
+        self._keys.release()
+        self._string_offsets.release()
+        for _, column in self._columns.values():
+            column.release()
+        self._view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self) -> Snapshot:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: str) -> bool:
+        return self._row(key) is not None
+
+    def __getitem__(self, key: str) -> dict:
+        row = self._row(key)
+        if row is None:
+            raise KeyError(key)
+        return self.row(row)
+
+    def get(self, key: str, default: Any = None) -> dict | Any:
+        row = self._row(key)
+        return default if row is None else self.row(row)
+
+    def string(self, string_id: int) -> str:
+        """
+        :param string_id: 字串表 id
+        :return: 解碼後的字串，同一個 id 只解碼一次
+        """
+        value = self._strings[string_id]
+        if value is None:
+            start = self._blob_offset + self._string_offsets[string_id]
+            end = self._blob_offset + self._string_offsets[string_id + 1]
+            value = self._strings[string_id] = str(self._view[start:end], "utf-8")
+        return value
+
+    def _row(self, key: str) -> int | None:
+        if self._sequential_keys:
+            key = f"{key}"
+            if key.isdigit() and not key.startswith("0") and int(key) <= self._count:
+                return int(key) - 1
+            return None
+        if self._row_by_key is None:
+            self._row_by_key = {self.string(k): i for i, k in enumerate(self._keys)}
+        return self._row_by_key.get(f"{key}")
+
+    def keys(self) -> Iterator[str]:
+        return (self.string(k) for k in self._keys)
+
+    def row(self, row: int) -> dict:
+        """
+        :param row: 第幾筆 (從 0 開始)
+        :return: area dict，欄位順序與輸出快照時相同
+        """
+        result = {}
+        for field, (field_type, column) in self._columns.items():
+            result[field] = column[row] if field_type == TYPE_FLOAT else self.string(column[row])
+        return result
+
+    def column(self, field: str) -> list:
+        """
+        :param field: 欄位名稱
+        :return: 該欄位所有值的 list
+        """
+        field_type, column = self._columns[field]
+        if field_type == TYPE_FLOAT:
+            return column.tolist()
+        return [self.string(i) for i in column]
+
+    def float_column(self, field: str) -> memoryview:
+        """
+        :param field: float64 欄位名稱，例如 longitude、latitude
+        :return: 直接指向 mmap 的 memoryview (format "d")，不複製資料
+        """
+        field_type, column = self._columns[field]
+        if field_type != TYPE_FLOAT:
+            raise TypeError(f"Field {field} is not a float column")
+        return column
+
+    def to_dict(self) -> dict[str, dict]:
+        """
+        :return: 與 AREA_CODES.json 相同的 dict
+        """
+        return {self.string(k): self.row(i) for i, k in enumerate(self._keys)}
+
+
+def json_to_snapshot(json_path: str, file_path: str) -> str:
+    """
+    由 AREA_CODES.json 產生快照
+
+    :return: payload 的 sha256
+    """
+    with open(json_path, "r", encoding="utf-8") as input_file:
+        return write_snapshot(json.load(input_file), file_path)
@@ -0,0 +1,233 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import json
+import os
+import sqlite3
+from typing import Any
+
+"""
+AREA_CODES SQLite 資料庫
+
+多個服務、分析人員需要以條件與 join 查詢 (例如縣市底下所有鄉鎮、經緯度範圍內的行政區)，
+每個行程各自載入 JSON 無法擴展到大量的同時讀取者；write_sqlite() 輸出正規化的 SQLite 資料庫：
+
+    county          縣市 (id, geo_code_103, name, name_en, full_name)
+    district        鄉鎮 (id 為 AREA_CODES 的序號 key, zip_code, area_name, area_name_en, geo_code_103,
+                    county_id, city_name, city_name_en, longitude, latitude)
+    district_rtree  中心點的 R*Tree 虛擬表 (id, min_lng, max_lng, min_lat, max_lat)，id 與 district.id 相同
+    area            與 AREA_CODES.json 欄位相同的 view
+
+zip_code、geo_code_103、中英文名稱皆有索引；資料庫先寫入暫存檔再取代，並設定為 WAL 模式
+
+AreaDatabase 以唯讀連線查詢 (每個行程、每個執行緒各自開啟)，查詢皆為固定的參數化 SQL，
+由 sqlite3 的 statement cache 重複使用已編譯的 prepared statement
+
+    write_sqlite(area_codes, "AREA_CODES.sqlite")
+    with AreaDatabase("AREA_CODES.sqlite") as db:
+        db.get_by_zip_code("300")               # [area dict, ...]
+        db.get_by_geo_code("6300500")
+        db.get_by_county_geo_code("63")         # 縣市底下所有鄉鎮
+        db.within_bbox(24.9, 121.4, 25.2, 121.7)
+
+    sqlite3 AREA_CODES.sqlite "SELECT * FROM area WHERE county_name = '臺北市'"
+"""
+
+Area = dict[str, Any]
+
+SCHEMA = """
+CREATE TABLE county (
+    id INTEGER PRIMARY KEY,
+    geo_code_103 TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    name_en TEXT NOT NULL,
+    full_name TEXT NOT NULL
+);
+CREATE INDEX county_name ON county (name);
+CREATE INDEX county_name_en ON county (name_en);
+
+CREATE TABLE district (
+    id INTEGER PRIMARY KEY,
+    zip_code TEXT NOT NULL,
+    area_name TEXT NOT NULL,
+    area_name_en TEXT NOT NULL,
+    geo_code_103 TEXT NOT NULL,
+    county_id INTEGER REFERENCES county (id),
+    city_name TEXT NOT NULL,
+    city_name_en TEXT NOT NULL,
+    longitude REAL,
+    latitude REAL
+);
+CREATE INDEX district_zip_code ON district (zip_code);
+CREATE INDEX district_geo_code_103 ON district (geo_code_103);
+CREATE INDEX district_county_id ON district (county_id);
+CREATE INDEX district_area_name ON district (area_name);
+CREATE INDEX district_area_name_en ON district (area_name_en);
+CREATE INDEX district_city_name ON district (city_name);
+
+CREATE VIRTUAL TABLE district_rtree USING rtree (id, min_lng, max_lng, min_lat, max_lat);
+
+CREATE VIEW area AS
+SELECT d.id AS id, d.zip_code, d.area_name, d.area_name_en, d.geo_code_103,
+       coalesce(c.name, '') AS county_name, coalesce(c.name_en, '') AS county_name_en,
+       coalesce(c.geo_code_103, '') AS county_geo_code_103, coalesce(c.full_name, '') AS county_full_name,
+       d.city_name, d.city_name_en, d.longitude, d.latitude
+FROM district d LEFT JOIN county c ON c.id = d.county_id;
+"""
+
+# area view 的欄位 (id 以外)，與 AREA_CODES.json 的欄位順序相同
+AREA_COLUMNS = ("zip_code", "area_name", "area_name_en", "geo_code_103", "county_name", "county_name_en",
+                "county_geo_code_103", "county_full_name", "city_name", "city_name_en", "longitude", "latitude")
+
+_SELECT = f"SELECT {', '.join(AREA_COLUMNS)} FROM area"
+
+
+def _float(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def write_sqlite(area_codes: dict[str, Area], file_path: str) -> None:
+    """
+    輸出 SQLite 資料庫 (先寫入暫存檔再取代，讀取端不會讀到寫到一半的資料庫)
+
+    :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict (key 需為數字序號)
+    :param file_path: 資料庫檔案路徑
+    """
+    tmp_path = f"{file_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(SCHEMA)
+        counties: dict[str, int] = {}
+        districts = []
+        points = []
+        for key, area in area_codes.items():
+            county_code = area.get("county_geo_code_103", "")
+            county_id = None
+            if county_code:
+                if county_code not in counties:
+                    counties[county_code] = len(counties) + 1
+                    connection.execute("INSERT INTO county VALUES (?, ?, ?, ?, ?)",
+                                       (counties[county_code], county_code, area.get("county_name", ""),
+                                        area.get("county_name_en", ""), area.get("county_full_name", "")))
+                county_id = counties[county_code]
+            lng, lat = _float(area.get("longitude")), _float(area.get("latitude"))
+            districts.append((int(key), area.get("zip_code", ""), area.get("area_name", ""),
+                              area.get("area_name_en", ""), area.get("geo_code_103", ""), county_id,
+                              area.get("city_name", ""), area.get("city_name_en", ""), lng, lat))
+            if lng is not None and lat is not None:
+                points.append((int(key), lng, lng, lat, lat))
+
+        connection.executemany("INSERT INTO district VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", districts)
+        connection.executemany("INSERT INTO district_rtree VALUES (?, ?, ?, ?, ?)", points)
+        connection.commit()
+        connection.execute("ANALYZE")
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    os.replace(tmp_path, file_path)
+
+
+class AreaDatabase:
+    """
+    write_sqlite() 輸出的唯讀查詢介面
+
+    sqlite3 連線不可跨行程或執行緒共用，每個行程 (例如 fork 後的 worker)、每個執行緒各自建立 AreaDatabase
+    """
+
+    def __init__(self, file_path: str, cached_statements: int = 64):
+        """
+        :param file_path: write_sqlite() 輸出的資料庫
+        :param cached_statements: prepared statement 快取數量
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
+        self.file_path = file_path
+        self._connection = sqlite3.connect(f"file:{file_path}?mode=ro", uri=True,
+                                           cached_statements=cached_statements)
+        self._connection.execute("PRAGMA query_only=1")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> AreaDatabase:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT count(*) FROM district").fetchone()[0]
+
+    def _areas(self, sql: str, params: tuple = ()) -> list[Area]:
+        return [dict(zip(AREA_COLUMNS, row)) for row in self._connection.execute(sql, params)]
+
+    def query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        """
+        執行任意唯讀 SQL (連線為唯讀，寫入會失敗)
+        """
+        return self._connection.execute(sql, params).fetchall()
+
+    def get_by_id(self, serial: str | int) -> Area | None:
+        areas = self._areas(f"{_SELECT} WHERE id = ?", (int(serial),))
+        return areas[0] if areas else None
+
+    def get_by_zip_code(self, zip_code: str) -> list[Area]:
+        """
+        :return: 郵遞區號可能對應多個行政區，依序號排序
+        """
+        return self._areas(f"{_SELECT} WHERE zip_code = ? ORDER BY id", (zip_code,))
+
+    def get_by_geo_code(self, geo_code: str) -> Area | None:
+        if not geo_code:
+            return None
+        areas = self._areas(f"{_SELECT} WHERE geo_code_103 = ? ORDER BY id LIMIT 1", (geo_code,))
+        return areas[0] if areas else None
+
+    def get_by_county_geo_code(self, county_geo_code: str) -> list[Area]:
+        """
+        :return: 縣市底下所有鄉鎮，依序號排序
+        """
+        # 以 county 表換算為 county_id，才能使用 district_county_id 索引
+        return self._areas(f"{_SELECT} WHERE id IN (SELECT d.id FROM district d JOIN county c ON c.id = d.county_id "
+                           f"WHERE c.geo_code_103 = ?) ORDER BY id", (county_geo_code,))
+
+    def get_by_name(self, name: str) -> Area | None:
+        """
+        :param name: area_name 或 area_name_en
+        """
+        areas = self._areas(f"{_SELECT} WHERE id IN (SELECT id FROM district WHERE area_name = ? "
+                            f"UNION ALL SELECT id FROM district WHERE area_name_en = ?) ORDER BY id LIMIT 1",
+                            (name, name))
+        return areas[0] if areas else None
+
+    def within_bbox(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> list[Area]:
+        """
+        中心點位於經緯度範圍內的行政區
+
+        R*Tree 以 32-bit float 儲存座標 (範圍會略為放大)，再以 district 的原始座標精確過濾
+        """
+        return self._areas(f"{_SELECT} WHERE id IN (SELECT id FROM district_rtree "
+                           f"WHERE max_lng >= ? AND min_lng <= ? AND max_lat >= ? AND min_lat <= ?) "
+                           f"AND longitude BETWEEN ? AND ? AND latitude BETWEEN ? AND ? ORDER BY id",
+                           (min_lng, max_lng, min_lat, max_lat, min_lng, max_lng, min_lat, max_lat))
+
+    def get_all(self) -> dict[str, Area]:
+        """
+        :return: 與 AREA_CODES.json 相同格式的 dict
+        """
+        return {str(row[0]): dict(zip(AREA_COLUMNS, row[1:]))
+                for row in self._connection.execute(f"SELECT id, {', '.join(AREA_COLUMNS)} FROM area ORDER BY id")}
+
+    @classmethod
+    def from_json(cls, json_path: str, file_path: str) -> AreaDatabase:
+        """
+        由 AREA_CODES.json 輸出資料庫後開啟
+        """
+        with open(json_path, "r", encoding="utf-8") as input_file:
+            write_sqlite(json.load(input_file), file_path)
+        return cls(file_path)
@@ -0,0 +1,306 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import datetime
+import hashlib
+import json
+import logging
+import os
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterator, Union
+
+try:
+    from .incremental import stable_key
+except ImportError:
+    from incremental import stable_key
+
+logger = logging.getLogger(__name__)
+
+"""
+多版本 (vintage) 行政區資料
+
+行政區與代碼會隨時間調整 (來源檔分別為 1050812、10706 版，欄位也是 geo_code_103)，
+回放歷史警報時需要使用當時有效的代碼表；VintageStore 將每次 convert() 的結果記錄為一個 vintage，
+不需保存多份完整的 AREA_CODES.json：
+
+- 每一筆行政區以內容 hash 為 id 只存一份，各 vintage 間沒有變動的資料不重複儲存
+- 每個行政區 (以 incremental.stable_key() 識別) 記錄一串有效區間 [valid_from, valid_to) 與當時的資料 id，
+  valid_to 為 null 表示到最新的 vintage 仍有效
+- 載入時對每個行政區建立依 valid_from 排序的區間索引，"某日當時" 的查詢為一次 bisect，不需還原整份快照
+
+日期為 ISO 格式 "2018-07-06"，或來源檔使用的民國年 "1070706"；早於第一個 vintage 的日期查無資料，
+晚於最後一個 vintage 的日期視為最後一個 vintage
+
+檔案格式 (JSON)：
+    {
+        "vintages": [{"date": "2016-08-12", "areas": 368, "sources": {...}}, ...],
+        "records": {record id: area dict},
+        "intervals": {stable key: [[valid_from, valid_to 或 null, record id], ...]}
+    }
+
+    store = VintageStore.from_json("AREA_CODES.vintages.json")
+    store.add_vintage(convert(...), "2018-07-06")
+    store.save("AREA_CODES.vintages.json")
+    store.get_by_zip_code("300", "2017-01-01")    # [area dict, ...]
+    store.get_by_geo_code("6300500", "1050812")
+    store.history("6300500")                    # [(valid_from, valid_to, area dict), ...]
+"""
+
+Area = dict[str, Any]
+DateLike = Union[str, datetime.date]
+
+
+def parse_date(value: DateLike) -> str:
+    """
+    :param value: datetime.date、ISO 日期字串 "2018-07-06" 或民國年 "1070706"
+    :return: ISO 日期字串，可直接以字串比較先後
+    """
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    text = value.strip()
+    if text.isdigit() and len(text) in (6, 7):
+        # 民國年：年 2~3 碼、月日各 2 碼
+        return datetime.date(int(text[:-4]) + 1911, int(text[-4:-2]), int(text[-2:])).isoformat()
+    return datetime.date.fromisoformat(text).isoformat()
+
+
+def record_id(area: Area) -> str:
+    """
+    :return: area dict 內容的 hash，內容相同的資料 id 相同
+    """
+    text = json.dumps(area, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class _Intervals:
+    """
+    單一行政區的有效區間，依 valid_from 排序且互不重疊
+    """
+    __slots__ = ("starts", "ends", "records")
+
+    def __init__(self, intervals: list[list]):
+        self.starts: list[str] = [start for start, _, _ in intervals]
+        self.ends: list[str | None] = [end for _, end, _ in intervals]
+        self.records: list[str] = [rid for _, _, rid in intervals]
+
+    def find(self, date: str) -> str | None:
+        i = bisect_right(self.starts, date) - 1
+        if i < 0 or (self.ends[i] is not None and date >= self.ends[i]):
+            return None
+        return self.records[i]
+
+
+class VintageStore:
+    """
+    以日期區間記錄各 vintage 的行政區資料
+    """
+
+    def __init__(self, data: dict | None = None):
+        """
+        :param data: save() 寫出的 JSON 內容，None 表示空的 store
+        """
+        data = data or {}
+        self.vintages: list[dict] = list(data.get("vintages", []))
+        self.records: dict[str, Area] = dict(data.get("records", {}))
+        self.intervals: dict[str, list[list]] = {key: [list(i) for i in value]
+                                                 for key, value in data.get("intervals", {}).items()}
+        self._build_index()
+
+    @classmethod
+    def from_json(cls, file_path: str) -> VintageStore:
+        """
+        :param file_path: save() 寫出的檔案，不存在時回傳空的 store
+        """
+        if not os.path.exists(file_path):
+            return cls()
+        with open(file_path, "r", encoding="utf-8") as input_file:
+            return cls(json.load(input_file))
+
+    def __len__(self) -> int:
+        return len(self.vintages)
+
+    @property
+    def dates(self) -> list[str]:
+        return [vintage["date"] for vintage in self.vintages]
+
+    def _build_index(self) -> None:
+        self._index = {key: _Intervals(value) for key, value in self.intervals.items()}
+        # 曾經使用過該郵遞區號的行政區，查詢時再依日期過濾
+        self._keys_by_zip_code: dict[str, list[str]] = {}
+        for key, value in self.intervals.items():
+            for zip_code in dict.fromkeys(self.records[rid].get("zip_code", "") for _, _, rid in value):
+                self._keys_by_zip_code.setdefault(zip_code, []).append(key)
+
+    def _decode(self, key: str, dates: list[str]) -> list[str | None]:
+        """
+        :return: 行政區在每個 vintage 日期的 record id (不存在時為 None)
+        """
+        values: list[str | None] = [None] * len(dates)
+        for start, end, rid in self.intervals.get(key, []):
+            stop = len(dates) if end is None else bisect_left(dates, end)
+            for i in range(bisect_left(dates, start), stop):
+                values[i] = rid
+        return values
+
+    @staticmethod
+    def _encode(values: list[str | None], dates: list[str]) -> list[list]:
+        """
+        將每個 vintage 日期的 record id 合併為區間，相鄰且相同的 id 合併為一個區間
+        """
+        intervals = []
+        for i, rid in enumerate(values):
+            if rid is None:
+                continue
+            if intervals and values[i - 1] == rid:
+                continue
+            intervals.append([dates[i], None, rid])
+            j = i + 1
+            while j < len(values) and values[j] == rid:
+                j += 1
+            if j < len(values):
+                intervals[-1][1] = dates[j]
+        return intervals
+
+    def _append(self, key: str, rid: str | None, date: str, summary: dict) -> None:
+        intervals = self.intervals.get(key, [])
+        last = intervals[-1] if intervals and intervals[-1][1] is None else None
+        if last is None:
+            if rid is not None:
+                summary["added"] += 1
+                self.intervals.setdefault(key, []).append([date, None, rid])
+        elif last[2] == rid:
+            summary["unchanged"] += 1
+        else:
+            summary["modified" if rid is not None else "removed"] += 1
+            last[1] = date
+            if rid is not None:
+                intervals.append([date, None, rid])
+
+    def add_vintage(self, area_codes: dict[str, Area], date: DateLike, sources: dict | None = None) -> dict:
+        """
+        加入一個 vintage，可插入在既有 vintage 之間 (回補歷史資料)，相同日期時取代該 vintage
+
+        :param area_codes: convert() 的回傳值，或 AREA_CODES.json 載入後的 dict
+        :param date: 資料生效日期
+        :param sources: 額外記錄的來源資訊 (例如來源檔名)
+        :return: 與前一個 vintage 相比的 {"added", "removed", "modified", "unchanged"} 筆數
+        """
+        date = parse_date(date)
+        current: dict[str, str] = {}
+        for area in area_codes.values():
+            key = stable_key(area)
+            if key in current:
+                logger.warning(f"Duplicate area {key} in vintage {date}, keep the first one")
+                continue
+            rid = record_id(area)
+            self.records.setdefault(rid, area)
+            current[key] = rid
+
+        dates = self.dates
+        replace = date in dates
+        position = bisect_left(dates, date)
+        new_dates = dates if replace else dates[:position] + [date] + dates[position:]
+
+        summary = {"added": 0, "removed": 0, "modified": 0, "unchanged": 0}
+        append = not replace and position == len(dates)
+        for key in self.intervals.keys() | current.keys():
+            if append:
+                # 新的日期在最後：只需關閉或延續最後一個區間
+                self._append(key, current.get(key), date, summary)
+                continue
+            values = self._decode(key, dates)
+            previous = values[position - 1] if position > 0 else None
+            rid = current.get(key)
+            if replace:
+                values[position] = rid
+            else:
+                values.insert(position, rid)
+            if previous is None and rid is not None:
+                summary["added"] += 1
+            elif previous is not None and rid is None:
+                summary["removed"] += 1
+            elif previous is not None:
+                summary["modified" if previous != rid else "unchanged"] += 1
+
+            intervals = self._encode(values, new_dates)
+            if intervals:
+                self.intervals[key] = intervals
+            else:
+                self.intervals.pop(key, None)
+
+        vintage = {"date": date, "areas": len(current), "sources": sources or {}}
+        if replace:
+            self.vintages[position] = vintage
+        else:
+            self.vintages.insert(position, vintage)
+
+        # 取代 vintage 後不再被引用的資料
+        used = {rid for value in self.intervals.values() for _, _, rid in value}
+        self.records = {rid: area for rid, area in self.records.items() if rid in used}
+        self._build_index()
+        logger.info(f"Vintage {date}: {summary}")
+        return summary
+
+    def save(self, file_path: str) -> None:
+        """
+        寫入 JSON 檔 (先寫入暫存檔再取代，避免讀取端讀到寫到一半的檔案)
+        """
+        data = {"vintages": self.vintages, "records": self.records, "intervals": self.intervals}
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as output_file:
+            json.dump(data, output_file, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, file_path)
+
+    def get(self, key: str, as_of: DateLike) -> Area | None:
+        """
+        :param key: incremental.stable_key() 的值
+        :param as_of: 查詢日期
+        :return: 該日期有效的 area dict，不存在時為 None
+        """
+        intervals = self._index.get(key)
+        if intervals is None:
+            return None
+        rid = intervals.find(parse_date(as_of))
+        return None if rid is None else self.records[rid]
+
+    def get_by_geo_code(self, geo_code: str, as_of: DateLike) -> Area | None:
+        """
+        :param geo_code: 鄉鎮 geo_code_103
+        :param as_of: 查詢日期
+        :return: 該日期有效的 area dict，不存在時為 None
+        """
+        if not geo_code:
+            return None
+        return self.get(geo_code, as_of)
+
+    def get_by_zip_code(self, zip_code: str, as_of: DateLike) -> list[Area]:
+        """
+        :param zip_code: 3 碼郵遞區號
+        :param as_of: 查詢日期
+        :return: 該日期使用此郵遞區號的 area dict (可能有多筆)
+        """
+        date = parse_date(as_of)
+        result = []
+        for key in self._keys_by_zip_code.get(zip_code, []):
+            rid = self._index[key].find(date)
+            if rid is not None and self.records[rid].get("zip_code") == zip_code:
+                result.append(self.records[rid])
+        return result
+
+    def history(self, key: str) -> list[tuple[str, str | None, Area]]:
+        """
+        :param key: incremental.stable_key() 的值
+        :return: [(valid_from, valid_to 或 None, area dict), ...]，依日期排序
+        """
+        return [(start, end, self.records[rid]) for start, end, rid in self.intervals.get(key, [])]
+
+    def iter_as_of(self, as_of: DateLike) -> Iterator[tuple[str, Area]]:
+        """
+        逐筆產生該日期有效的 (stable key, area dict)
+        """
+        date = parse_date(as_of)
+        for key, intervals in self._index.items():
+            rid = intervals.find(date)
+            if rid is not None:
+                yield key, self.records[rid]
@@ -0,0 +1,284 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Callable, Mapping, NamedTuple
+
+try:
+    from .download import file_sha256, fetch_sources, is_url
+    from .writer import content_hash
+except ImportError:
+    from download import file_sha256, fetch_sources, is_url
+    from writer import content_hash
+
+import logging
+logger = logging.getLogger(__name__)
+
+"""
+常駐監看模式
+
+定期檢查三個來源 (URL 以 ETag / Last-Modified 條件式請求，本機檔案以 mtime/size 判斷是否需要重新計算 sha256)，
+任一來源的 sha256 改變時才重新執行 convert()，並將結果以不可變的 DatasetVersion 發佈給同一 process 內的訂閱者：
+
+- Watcher.current 永遠指向最新完成的版本，重建在背景進行，完成後一次替換參考，讀取端不需要鎖也不會等待
+- subscribe(callback) 在每次發佈新版本時呼叫 callback(version)
+- async for version in watcher.updates() 依序取得最新版本 (較慢的讀取端只會拿到最新的版本，不會累積)
+
+輸出內容 (content_hash) 與目前版本相同時只更新來源 sha256 不發佈；重建失敗時保留目前版本，下次檢查再重試
+
+    watcher = Watcher(geoxml_path, areacode_path, enname_path, out_file="AREA_CODES.json", interval=300)
+    watcher.subscribe(lambda version: print(version.version, len(version.area_codes)))
+    watcher.start()                                 # 背景 thread，或 watcher.run() / await watcher.run_async()
+    watcher.current.area_codes["1"]["zip_code"]
+
+    async for version in watcher.updates(): ...
+
+    python src/area_codes/convert.py -g ... -a ... -e ... --watch 300
+"""
+
+DEFAULT_INTERVAL = 300.0
+
+
+def freeze(area_codes: Mapping[str, Mapping[str, Any]]) -> Mapping[str, Mapping[str, Any]]:
+    """
+    :return: 唯讀的 AREA_CODES (外層與每個行政區都是 MappingProxyType)
+    """
+    return MappingProxyType({key: MappingProxyType(dict(area)) for key, area in area_codes.items()})
+
+
+class DatasetVersion(NamedTuple):
+    version: str                                    # 輸出內容的 content_hash()
+    area_codes: Mapping[str, Mapping[str, Any]]     # 唯讀的 AREA_CODES
+    sources: Mapping[str, str]                      # {來源: sha256}
+    created: float                                  # 建立時間 (time.time())
+
+    def to_dict(self) -> dict[str, dict]:
+        """
+        :return: 可修改、可 json.dumps 的 AREA_CODES dict
+        """
+        return {key: dict(area) for key, area in self.area_codes.items()}
+
+
+class Watcher:
+    """
+    監看來源並在變更時重建、發佈新版本
+    """
+
+    def __init__(self, geoxml_path: str, areacode_path: str, enname_path: str, out_file: str | None = None,
+                 interval: float = DEFAULT_INTERVAL, cache_dir: str | None = None, **convert_kwargs):
+        """
+        :param geoxml_path: 行政區經緯度 (URL 或本機檔案)
+        :param areacode_path: 行政區代碼表 (URL 或本機檔案)
+        :param enname_path: 縣市鄉鎮中英對照 (URL 或本機檔案)
+        :param out_file: 指定時每次重建都寫入此檔案 (內容相同時不寫入，見 writer.py)，None 表示只在記憶體中發佈
+        :param interval: 檢查的間隔秒數
+        :param cache_dir: URL 來源的下載快取目錄，未指定時使用暫存目錄 (只在此 process 內保留)
+        :param convert_kwargs: 其他傳給 convert() 的參數，例如 output_format、snapshot_file、parallel
+        """
+        self.paths = (geoxml_path, areacode_path, enname_path)
+        self.out_file = out_file
+        self.interval = interval
+        self.convert_kwargs = convert_kwargs
+        self._tmp_dir = None
+        if cache_dir is None and any(is_url(p) for p in self.paths):
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix="area_codes_watch_")
+            cache_dir = self._tmp_dir.name
+        self.cache_dir = cache_dir
+
+        self.current: DatasetVersion | None = None
+        self._built_sources: dict[str, str] | None = None
+        self._stat_cache: dict[str, tuple[tuple[int, int], str]] = {}
+        self._subscribers: list[Callable[[DatasetVersion], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, callback: Callable[[DatasetVersion], None]) -> Callable[[], None]:
+        """
+        :param callback: 每次發佈新版本時以 callback(version) 呼叫，在執行檢查的 thread 中執行
+        :return: 取消訂閱的函式
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _local_sha256(self, file_path: str) -> str:
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._stat_cache.get(file_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        sha256 = file_sha256(file_path)
+        self._stat_cache[file_path] = (signature, sha256)
+        return sha256
+
+    def source_hashes(self) -> tuple[dict[str, str], dict[str, str]]:
+        """
+        :return: ({來源: sha256}, {來源: 本機檔案路徑})
+        """
+        urls = [p for p in self.paths if is_url(p)]
+        fetched = fetch_sources(urls, self.cache_dir) if urls else {}
+        hashes, local_paths = {}, {}
+        for source in self.paths:
+            if source in fetched:
+                hashes[source], local_paths[source] = fetched[source].sha256, fetched[source].path
+            else:
+                hashes[source], local_paths[source] = self._local_sha256(source), source
+        return hashes, local_paths
+
+    def check(self) -> DatasetVersion | None:
+        """
+        檢查一次來源，有變更時重建並發佈
+
+        :return: 新發佈的版本，沒有變更 (或重建失敗) 時回傳 None
+        """
+        # convert 也 import 本模組 (--watch)，在使用時才載入
+        try:
+            from . import convert as convert_module
+        except ImportError:
+            import convert as convert_module
+
+        try:
+            hashes, local_paths = self.source_hashes()
+        except Exception as e:
+            logger.warning(f"Check sources error, keep version {self._version()}: {e}")
+            return None
+        if hashes == self._built_sources:
+            return None
+
+        geoxml_path, areacode_path, enname_path = (local_paths[p] for p in self.paths)
+        logger.info(f"Sources changed, rebuilding: {hashes}")
+        kwargs = dict(self.convert_kwargs)
+        if self.out_file is not None:
+            kwargs["out_file"] = self.out_file
+        try:
+            area_codes = convert_module.convert(geoxml_path=geoxml_path, areacode_path=areacode_path,
+                                                enname_path=enname_path, write_file=self.out_file is not None,
+                                                **kwargs)
+        except (Exception, SystemExit) as e:
+            logger.warning(f"Rebuild error, keep version {self._version()}: {e!r}")
+            return None
+
+        # 來源在重建期間又被修改時，這次的結果可能混用了新舊內容，下次檢查再重建
+        local = [p for p in self.paths if not is_url(p)]
+        if any(self._stat_cache[p][0] != self._stat_signature(p) for p in local):
+            logger.info("Sources modified during rebuild, retry on next check")
+            return None
+
+        self._built_sources = hashes
+        version = content_hash(area_codes)
+        if self.current is not None and self.current.version == version:
+            logger.info(f"Output unchanged, keep version {version}")
+            return None
+
+        new = DatasetVersion(version, freeze(area_codes), MappingProxyType(dict(hashes)), time.time())
+        self.current = new
+        logger.info(f"Published version {version}: {len(area_codes)} areas")
+        self._publish(new)
+        return new
+
+    @staticmethod
+    def _stat_signature(file_path: str) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _version(self) -> str | None:
+        return self.current.version if self.current is not None else None
+
+    def _publish(self, version: DatasetVersion) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(version)
+            except Exception as e:
+                logger.warning(f"Subscriber {callback!r} error: {e!r}")
+
+    def run(self) -> None:
+        """
+        在目前的 thread 中持續檢查，直到 stop()
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.interval)
+
+    def start(self) -> Watcher:
+        """
+        在背景 daemon thread 中執行 run()
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="area-codes-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
+
+    def __enter__(self) -> Watcher:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    async def run_async(self) -> None:
+        """
+        在 event loop 中定期檢查，下載與重建在 executor 中執行，不阻塞 event loop
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, self.check)
+            await asyncio.sleep(self.interval)
+
+    async def updates(self) -> AsyncIterator[DatasetVersion]:
+        """
+        先回傳目前版本 (若已有)，之後每次發佈時回傳最新版本
+
+            async for version in watcher.updates():
+                dataset = AreaDataset(version.area_codes)
+        """
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def notify(_: DatasetVersion) -> None:
+            try:
+                loop.call_soon_threadsafe(changed.set)
+            except RuntimeError:
+                # event loop 已關閉
+                pass
+
+        unsubscribe = self.subscribe(notify)
+        try:
+            last = None
+            while True:
+                current = self.current
+                if current is not None and current is not last:
+                    last = current
+                    yield current
+                    continue
+                await changed.wait()
+                changed.clear()
+        finally:
+            unsubscribe()
@@ -0,0 +1,160 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import hashlib
+import json
+import os
+from typing import Any, Iterator
+
+try:
+    from .download import file_sha256
+except ImportError:
+    from download import file_sha256
+
+"""
+AREA_CODES 輸出格式
+
+- pretty      json.dump(indent=4, ensure_ascii=False)，與原本的 AREA_CODES.json 相同 (預設)
+- compact     最小化 JSON，沒有縮排與空白
+- ndjson      每行一個行政區 {"id": "1", "zip_code": ..., ...}，串流讀取或只讀部分資料時不需解析整個檔案
+- canonical   依序號 (數值) 排序、欄位依名稱排序的最小化 JSON，相同內容的輸出 bytes 必定相同，
+              檔案的 sha256 即為 content_hash()
+
+寫入時邊序列化邊計算 sha256 寫入暫存檔，若與既有檔案的 sha256 相同則捨棄暫存檔不寫入 (檔案 mtime 不變，
+監看檔案的程式不會重新載入)，否則以 os.replace 取代，mmap 或監看檔案的讀取端不會讀到寫到一半的檔案
+
+    digest, written = write_output(area_codes, "AREA_CODES.json", "compact")
+    content_hash(area_codes)                    # 與輸出格式無關的內容 hash
+    load_output("AREA_CODES.ndjson")            # 依副檔名讀取任一格式
+    load_output("AREA_CODES.json", "ndjson")    # 副檔名與格式不符時指定格式
+    for key, area in iter_ndjson("AREA_CODES.ndjson"): ...
+"""
+
+Area = dict[str, Any]
+
+FORMATS = ("pretty", "compact", "ndjson", "canonical")
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+_BUFFER_SIZE = 1 << 16
+
+
+def _serial_order(key: str) -> tuple:
+    return (0, int(key), "") if key.isdigit() else (1, 0, key)
+
+
+def iter_chunks(area_codes: dict[str, Area], output_format: str = "pretty") -> Iterator[str]:
+    """
+    逐段產生序列化後的字串，不需先組出完整的輸出
+
+    :param area_codes: convert() 的回傳值
+    :param output_format: FORMATS 之一
+    """
+    # 以行政區為單位序列化，每次只需組出一筆的字串
+    if output_format == "pretty":
+        if not area_codes:
+            yield "{}"
+            return
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=4)
+        yield "{"
+        for i, (key, area) in enumerate(area_codes.items()):
+            # JSON 字串內的換行已跳脫，只需將每一行再縮排一層
+            value = encoder.encode(area).replace("\n", "\n    ")
+            yield f"{',' if i else ''}\n    {encoder.encode(key)}: {value}"
+        yield "\n}"
+    elif output_format == "compact":
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        yield "{"
+        for i, (key, area) in enumerate(area_codes.items()):
+            yield f"{',' if i else ''}{encoder.encode(key)}:{encoder.encode(area)}"
+        yield "}"
+    elif output_format == "canonical":
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+        yield "{"
+        for i, key in enumerate(sorted(area_codes, key=_serial_order)):
+            yield f"{',' if i else ''}{encoder.encode(key)}:{encoder.encode(area_codes[key])}"
+        yield "}"
+    elif output_format == "ndjson":
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        for key, area in area_codes.items():
+            yield f"{encoder.encode({'id': key, **area})}\n"
+    else:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {FORMATS}")
+
+
+def content_hash(area_codes: dict[str, Area]) -> str:
+    """
+    :return: canonical 格式的 sha256，與 dict 的順序及輸出格式無關
+    """
+    digest = hashlib.sha256()
+    for chunk in iter_chunks(area_codes, "canonical"):
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def write_output(area_codes: dict[str, Area], file_path: str, output_format: str = "pretty") -> tuple[str, bool]:
+    """
+    以指定格式寫入檔案 (暫存檔 + rename)，內容與既有檔案相同時不寫入
+
+    :param area_codes: convert() 的回傳值
+    :param file_path: 輸出檔案路徑
+    :param output_format: FORMATS 之一
+    :return: (輸出檔的 sha256, 是否有寫入)
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {FORMATS}")
+    digest = hashlib.sha256()
+    tmp_path = f"{file_path}.tmp"
+    try:
+        with open(tmp_path, "wb") as output_file:
+            buffer = []
+            size = 0
+            for chunk in iter_chunks(area_codes, output_format):
+                buffer.append(chunk)
+                size += len(chunk)
+                if size >= _BUFFER_SIZE:
+                    data = "".join(buffer).encode("utf-8")
+                    digest.update(data)
+                    output_file.write(data)
+                    buffer, size = [], 0
+            data = "".join(buffer).encode("utf-8")
+            digest.update(data)
+            output_file.write(data)
+
+        sha256 = digest.hexdigest()
+        if os.path.exists(file_path) and file_sha256(file_path) == sha256:
+            os.remove(tmp_path)
+            return sha256, False
+        os.replace(tmp_path, file_path)
+        return sha256, True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def iter_ndjson(file_path: str) -> Iterator[tuple[str, Area]]:
+    """
+    逐行讀取 ndjson 輸出
+
+    :return: (序號 key, area dict)
+    """
+    with open(file_path, "r", encoding="utf-8") as input_file:
+        for line in input_file:
+            if line.strip():
+                area = json.loads(line)
+                yield str(area.pop("id")), area
+
+
+def load_output(file_path: str, output_format: str | None = None) -> dict[str, Area]:
+    """
+    讀取任一格式的輸出
+
+    :param file_path: 輸出檔案路徑
+    :param output_format: 寫入時的格式 (FORMATS 之一)，None 時依副檔名判斷，.ndjson / .jsonl 視為 ndjson
+    :return: AREA_CODES dict
+    """
+    if output_format is not None and output_format not in FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {FORMATS}")
+    if output_format == "ndjson" or (output_format is None and file_path.endswith(NDJSON_EXTENSIONS)):
+        return dict(iter_ndjson(file_path))
+    with open(file_path, "r", encoding="utf-8") as input_file:
+        return json.load(input_file)
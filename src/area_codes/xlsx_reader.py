@@ -0,0 +1,180 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import IO, Any, Iterator
+
+"""
+輕量 xlsx 讀取
+
+xlsx 為 zip 壓縮的 XML 檔，openpyxl 的 load_workbook 會載入所有工作表與儲存格，
+`行政區代碼表_Taiwan_Geocode.xlsx` 的 `村里` 等頁籤解壓後超過 10 MB，但 fetch_areacode() 只使用
+`縣市`、`鄉鎮` 兩個頁籤的少數欄位
+
+XlsxReader 直接從 zip 內以 iterparse 串流讀取指定工作表的 XML，只保留指定欄位範圍的儲存格，
+其他工作表完全不會解壓縮；回傳值與 openpyxl iter_rows(values_only=True) 相同 (tuple，空白儲存格為 None)
+
+    with XlsxReader("行政區代碼表_Taiwan_Geocode.xlsx") as workbook:
+        for row in workbook.iter_rows("鄉鎮", min_row=2, min_col=5, max_col=9):
+            ...
+"""
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_DOC_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+SHARED_STRINGS_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+
+
+def column_index(cell_ref: str) -> int:
+    """
+    儲存格位置的欄號，例如 "F12" -> 6
+
+    :param cell_ref: 儲存格位置
+    :return: 從 1 開始的欄號
+    """
+    index = 0
+    for char in cell_ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index
+
+
+def _number(text: str) -> int | float:
+    # 與 openpyxl 相同：含小數點或指數的數值為 float，其餘為 int
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    return int(text)
+
+
+def _text(elem: ET.Element) -> str:
+    """
+    <si>、<is> 內的文字，rich text 需串接各 <r> 的 <t>，並忽略注音 <rPh>
+    """
+    t = elem.find(f"{NS_MAIN}t")
+    if t is not None:
+        return t.text or ""
+    return "".join(r_t.text or "" for r_t in elem.iterfind(f"{NS_MAIN}r/{NS_MAIN}t"))
+
+
+class XlsxReader:
+    """
+    只讀取指定工作表與欄位的 xlsx reader
+    """
+
+    def __init__(self, source: str | IO[bytes]):
+        """
+        :param source: xlsx 檔案路徑或 binary file object
+        """
+        self._zip = zipfile.ZipFile(source)
+        self._sheets, self._shared_strings_path = self._read_workbook()
+        self._shared_strings: list[str] | None = None
+
+    def __enter__(self) -> XlsxReader:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def _read_workbook(self) -> tuple[dict[str, str], str | None]:
+        rels_root = ET.fromstring(self._zip.read("xl/_rels/workbook.xml.rels"))
+        targets = {}
+        shared_strings_path = None
+        for rel in rels_root.iter(f"{NS_PKG_REL}Relationship"):
+            target = rel.get("Target", "")
+            path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+            targets[rel.get("Id")] = path
+            if rel.get("Type") == SHARED_STRINGS_TYPE:
+                shared_strings_path = path
+
+        workbook_root = ET.fromstring(self._zip.read("xl/workbook.xml"))
+        sheets = {}
+        for sheet in workbook_root.iter(f"{NS_MAIN}sheet"):
+            sheets[sheet.get("name")] = targets[sheet.get(f"{NS_DOC_REL}id")]
+        return sheets, shared_strings_path
+
+    @property
+    def sheetnames(self) -> list[str]:
+        return list(self._sheets.keys())
+
+    def _load_shared_strings(self) -> list[str]:
+        if self._shared_strings is None:
+            self._shared_strings = []
+            if self._shared_strings_path:
+                with self._zip.open(self._shared_strings_path) as input_file:
+                    for _, elem in ET.iterparse(input_file):
+                        if elem.tag == f"{NS_MAIN}si":
+                            self._shared_strings.append(_text(elem))
+                            elem.clear()
+        return self._shared_strings
+
+    def _value(self, cell: ET.Element) -> Any:
+        cell_type = cell.get("t", "n")
+        if cell_type == "inlineStr":
+            inline = cell.find(f"{NS_MAIN}is")
+            return _text(inline) if inline is not None else None
+
+        v = cell.find(f"{NS_MAIN}v")
+        if v is None or v.text is None:
+            return None
+        if cell_type == "s":
+            return self._load_shared_strings()[int(v.text)]
+        if cell_type == "b":
+            return v.text == "1"
+        if cell_type in ("str", "e", "d"):
+            return v.text
+        return _number(v.text)
+
+    def iter_rows(self, sheet_name: str, min_row: int = 1, max_row: int | None = None,
+                  min_col: int = 1, max_col: int | None = None) -> Iterator[tuple]:
+        """
+        逐列讀取工作表，與 openpyxl 的 iter_rows(values_only=True) 相同，沒有資料的列以全部 None 回傳
+
+        :param sheet_name: 工作表名稱
+        :param min_row: 起始列 (從 1 開始)
+        :param max_row: 結束列，None 表示讀到最後一列
+        :param min_col: 起始欄 (從 1 開始)
+        :param max_col: 結束欄，None 表示讀到每列的最後一個儲存格 (各列長度可能不同)
+        :return: Iterator[tuple]
+        """
+        if sheet_name not in self._sheets:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+
+        width = None if max_col is None else max_col - min_col + 1
+        next_row = min_row
+        with self._zip.open(self._sheets[sheet_name]) as input_file:
+            row_index = 0
+            for _, elem in ET.iterparse(input_file):
+                if elem.tag != f"{NS_MAIN}row":
+                    continue
+
+                row_index = int(elem.get("r")) if elem.get("r") else row_index + 1
+                if row_index < min_row:
+                    elem.clear()
+                    continue
+                if max_row is not None and row_index > max_row:
+                    break
+
+                values: dict[int, Any] = {}
+                col = 0
+                for cell in elem.iterfind(f"{NS_MAIN}c"):
+                    ref = cell.get("r")
+                    col = column_index(ref) if ref else col + 1
+                    if col >= min_col and (max_col is None or col <= max_col):
+                        values[col] = self._value(cell)
+                elem.clear()
+
+                row_width = width if width is not None else max(values, default=min_col - 1) - min_col + 1
+                for _ in range(next_row, row_index):
+                    yield (None,) * (width or 0)
+                yield tuple(values.get(c) for c in range(min_col, min_col + row_width))
+                next_row = row_index + 1
+
+        # 與 openpyxl 相同，指定 max_row 時補滿到 max_row
+        if max_row is not None:
+            for _ in range(next_row, max_row + 1):
+                yield (None,) * (width or 0)
@@ -0,0 +1,48 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import pytest
+from src.area_codes.area_index import AreaIndex
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+
+
+@pytest.fixture(scope="module")
+def index():
+    return AreaIndex.from_json(AREA_CODES_JSON)
+
+
+def test_from_json_and_from_dict_are_equivalent(index):
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+    assert len(AreaIndex(area_codes)) == len(index) == len(area_codes)
+
+
+def test_get_by_zip_code_returns_all_shared_zip_codes(index):
+    result = index.get_by_zip_code("300")
+    assert sorted(a["area_name"] for a in result) == ["新竹市北區", "新竹市東區", "新竹市香山區"]
+    assert index.get_by_zip_code("000") == []
+
+
+def test_get_by_geo_code(index):
+    assert index.get_by_geo_code("6300500")["area_name"] == "臺北市中正區"
+    assert index.get_by_geo_code("") is None
+
+
+def test_get_by_county_geo_code(index):
+    result = index.get_by_county_geo_code("63")
+    assert len(result) == 12
+    assert all(a["county_name"] == "臺北市" for a in result)
+
+
+def test_get_by_name(index):
+    assert index.get_by_name("臺北市大同區")["zip_code"] == "103"
+    assert index.get_by_name("Datong Dist., Taipei City")["zip_code"] == "103"
+    assert index.get_by_name("not exists") is None
+
+
+def test_get_by_id(index):
+    assert index.get_by_id(1) is index.get_by_id("1")
+    assert index.get_by_id(1)["zip_code"] == "100"
@@ -0,0 +1,57 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import csv
+import os
+import pytest
+from src.area_codes.batch_geocode import geocode_file
+from src.area_codes.reverse_geocode import ReverseGeocoder
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+
+
+@pytest.fixture
+def points_csv(tmp_path):
+    path = tmp_path / "points.csv"
+    rows = [["station", "lat", "lon"], ["a", "25.0324", "121.5198"], ["b", "22.6273", "120.3014"],
+            ["c", "", "121.0"], ["d", "not a number", "121.0"], ["e", "24.1477", "120.6736"], ["f", "23.5"]]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows(rows)
+    return str(path)
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_geocode_csv_matches_reverse_geocoder(points_csv, tmp_path, workers):
+    output = str(tmp_path / f"out_{workers}.csv")
+    stats = geocode_file(points_csv, output, AREA_CODES_JSON, lat_column="lat", lng_column="lon",
+                         chunk_size=2, workers=workers)
+    assert stats["rows"] == 6 and stats["matched"] == 3 and stats["rows_per_second"] > 0
+    assert not os.path.exists(f"{output}.tmp")
+
+    rows = _read(output)
+    assert rows[0] == ["station", "lat", "lon", "zip_code", "geo_code_103", "area_name", "distance_km"]
+    geocoder = ReverseGeocoder.from_json(AREA_CODES_JSON)
+    for row in rows[1:]:
+        if row[0] in ("a", "b", "e"):
+            area = geocoder.get_data_by_latlng(float(row[1]), float(row[2]))
+            assert row[3:6] == [area["zip_code"], area["geo_code_103"], area["area_name"]]
+            assert float(row[6]) >= 0
+        else:
+            assert row[-4:] == ["", "", "", ""]
+    assert [row[0] for row in rows[1:]] == ["a", "b", "c", "d", "e", "f"]
+
+
+def test_geocode_csv_options_and_errors(points_csv, tmp_path):
+    output = str(tmp_path / "out.csv")
+    geocode_file(points_csv, output, AREA_CODES_JSON, lat_column="lat", lng_column="lon",
+                 columns=("county_geo_code_103",), distance=False)
+    assert _read(output)[1] == ["a", "25.0324", "121.5198", "63"]
+
+    with pytest.raises(ValueError):
+        geocode_file(points_csv, str(tmp_path / "missing.csv"), AREA_CODES_JSON)
+    assert not os.path.exists(tmp_path / "missing.csv")
@@ -0,0 +1,106 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import struct
+import numpy as np
+import pytest
+from src.area_codes.boundary import BoundaryGeocoder, STRtree, load_geojson, load_shapefile
+from src.area_codes.reverse_geocode import ReverseGeocoder
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+BOUNDARIES_GEOJSON = os.path.join(os.path.dirname(__file__), "boundaries.geojson")
+
+
+@pytest.fixture(scope="module")
+def area_codes():
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def geocoder(area_codes):
+    return BoundaryGeocoder.from_files(area_codes, [BOUNDARIES_GEOJSON])
+
+
+def _write_shapefile(base: str, records: list[tuple[str, list[np.ndarray]]]) -> None:
+    """
+    以最小的 Polygon shapefile 格式寫出測試資料 (.shp、.dbf)
+    """
+    shapes = b""
+    for number, (_, rings) in enumerate(records, 1):
+        points = np.concatenate(rings)
+        parts = np.cumsum([0] + [len(r) for r in rings[:-1]])
+        content = struct.pack("<i4d", 5, *points.min(axis=0), *points.max(axis=0))
+        content += struct.pack(f"<ii{len(rings)}i", len(rings), len(points), *parts)
+        content += points.astype("<f8").tobytes()
+        shapes += struct.pack(">ii", number, len(content) // 2) + content
+    header = struct.pack(">i20xi", 9994, (100 + len(shapes)) // 2) + struct.pack("<ii64x", 1000, 5)
+    with open(f"{base}.shp", "wb") as f:
+        f.write(header + shapes)
+
+    field = struct.pack("<11sc4xBB14x", b"TOWNCODE", b"C", 10, 0)
+    dbf = struct.pack("<B3xIHH20x", 3, len(records), 32 + 32 + 1, 1 + 10) + field + b"\x0D"
+    for code, _ in records:
+        dbf += b" " + code.encode("ascii").ljust(10)
+    with open(f"{base}.dbf", "wb") as f:
+        f.write(dbf + b"\x1A")
+
+
+def test_strtree_returns_every_box_containing_the_point():
+    rng = np.random.default_rng(0)
+    lower = rng.uniform(0, 10, size=(500, 2))
+    boxes = np.column_stack([lower, lower + rng.uniform(0.1, 2, size=(500, 2))])
+    tree = STRtree(boxes, node_size=8)
+    x, y = rng.uniform(0, 12, 300), rng.uniform(0, 12, 300)
+
+    points, hits = tree.query_points(x, y)
+    expected = {(p, b) for p in range(300) for b in range(500)
+                if boxes[b, 0] <= x[p] <= boxes[b, 2] and boxes[b, 1] <= y[p] <= boxes[b, 3]}
+    assert set(zip(points.tolist(), hits.tolist())) == expected
+    assert len(points) == len(expected)
+
+
+def test_boundary_beats_nearest_centroid_near_borders(geocoder, area_codes):
+    # 大同區中心點附近，但在中正區的 polygon 內
+    latitude, longitude = 25.065, 121.515
+    assert ReverseGeocoder(area_codes).get_data_by_latlng(latitude, longitude)["geo_code_103"] == "6300600"
+    assert geocoder.get_data_by_latlng(latitude, longitude)["geo_code_103"] == "6300500"
+    assert geocoder.locate(latitude, longitude)[1]
+
+
+def test_holes_multipolygons_and_fallback(geocoder):
+    assert geocoder.get_data_by_latlng(25.055, 121.515)["geo_code_103"] == "6300600"   # 中正區的內洞
+    assert geocoder.get_data_by_latlng(25.105, 121.61)["geo_code_103"] == "6300600"    # 大同區的第二個 polygon
+    assert geocoder.get_data_by_latlng(25.119, 121.601)["geo_code_103"] != "6300600"   # 在外接矩形內但不在三角形內
+
+    index, inside = geocoder.locate(22.6273, 120.3014)
+    assert not inside
+    assert geocoder.areas[index]["county_name"] == "高雄市"
+    assert geocoder.locate(float("nan"), 121.5) == (-1, False)
+    assert geocoder.covered_codes == {"6300500", "6300600"}
+
+
+def test_batch_query_matches_single_queries(geocoder):
+    rng = np.random.default_rng(1)
+    lat = rng.uniform(24.98, 25.14, 2000)
+    lng = rng.uniform(121.48, 121.64, 2000)
+    indices, inside = geocoder.query(lat, lng)
+    assert inside.any() and not inside.all()
+    for i in range(0, 2000, 37):
+        assert geocoder.locate(lat[i], lng[i]) == (indices[i], inside[i])
+
+
+def test_shapefile_matches_geojson(area_codes, tmp_path):
+    boundaries = load_geojson(BOUNDARIES_GEOJSON)
+    base = str(tmp_path / "towns")
+    _write_shapefile(base, list(boundaries.items()))
+
+    loaded = load_shapefile(f"{base}.shp", code_property="TOWNCODE")
+    assert loaded.keys() == boundaries.keys()
+    for code, rings in boundaries.items():
+        assert all(np.array_equal(a, b) for a, b in zip(loaded[code], rings))
+
+    geocoder = BoundaryGeocoder.from_files(area_codes, [f"{base}.shp"], code_property="TOWNCODE")
+    assert geocoder.get_data_by_latlng(25.055, 121.515)["geo_code_103"] == "6300600"
@@ -54,4 +54,67 @@ def test_convert_returns_expected_result(mock_areacode, mock_enname, mock_geoxml
     mock_enname.return_value = [['100', 'test', 'Test']]
     mock_areacode.return_value = {'test': {'geo_code_103': '6300500'}}
     result = convert.convert()
-    assert result == {'1': {'zip_code': '100', 'area_name': 'test', 'area_name_en': 'Test', 'geo_code_103': '6300500', 'county_name': '', 'county_name_en': '', 'county_geo_code_103': '', 'county_full_name': '', 'city_name': '', 'city_name_en': '', 'longitude': 0.0, 'latitude': 0.0}}
\ No newline at end of file
+    assert result == {'1': {'zip_code': '100', 'area_name': 'test', 'area_name_en': 'Test', 'geo_code_103': '6300500', 'county_name': '', 'county_name_en': '', 'county_geo_code_103': '', 'county_full_name': '', 'city_name': '', 'city_name_en': '', 'longitude': 0.0, 'latitude': 0.0}}
+
+def test_merge_reports_unmatched_and_ambiguous_keys():
+    area_list = [
+        {'_x0033_碼郵遞區號': '100', '行政區名': 'A', '中心點經度': '121.0', '中心點緯度': '25.0'},
+        {'_x0033_碼郵遞區號': '101', '行政區名': 'B', '中心點經度': '121.1', '中心點緯度': '25.1'},
+        {'_x0033_碼郵遞區號': '102', '行政區名': 'B', '中心點經度': '121.2', '中心點緯度': '25.2'},
+        {'_x0033_碼郵遞區號': '103', '行政區名': 'C', '中心點經度': '121.3', '中心點緯度': '25.3'},
+    ]
+    enname_list = [['100', 'A', 'A1'], ['100', 'A', 'A2'], ['101', 'B', 'B1'], ['999', 'X', 'X1']]
+    geo_code_103 = {'A': {'geo_code_103': '6300500', 'county_geo_code_103': '63'}, 'Y': {'geo_code_103': '1'}}
+
+    result, report = convert.merge(area_list, enname_list, geo_code_103)
+
+    assert [v['area_name_en'] for v in result.values()] == ['A2', 'B1', 'B1', '']
+    assert result['1']['geo_code_103'] == '6300500'
+    assert result['1']['county_geo_code_103'] == '63'
+    assert result['1']['longitude'] == 121.0
+    assert report.to_dict() == {
+        'geoxml_ambiguous': {'B': 2},
+        'enname_ambiguous': {'A': 2},
+        'enname_unmatched_areas': ['C'],
+        'enname_unmatched_rows': ['X'],
+        'areacode_unmatched_areas': ['B', 'C'],
+        'areacode_unmatched_rows': ['Y'],
+    }
+    assert not report.is_clean()
+
+
+def test_convert_fixture_files_match_area_codes_json():
+    import json
+    import os
+    base = os.path.dirname(__file__)
+    result = convert.convert(geoxml_path=os.path.join(base, "1050812_行政區經緯度(toPost).xml"),
+                             areacode_path=os.path.join(base, "行政區代碼表_Taiwan_Geocode.xlsx"),
+                             enname_path=os.path.join(base, "county_h_10706.xls"),
+                             write_file=False)
+    with open(os.path.join(base, "..", "..", "AREA_CODES.json"), "r", encoding="utf-8") as f:
+        expected = f.read()
+    assert json.dumps(result, ensure_ascii=False, indent=4) == expected
+
+
+def test_iter_geoxml_yields_typed_records_from_path_bytes_and_stream():
+    import io
+    import os
+    _file = os.path.join(os.path.dirname(__file__), "1050812_行政區經緯度(toPost).xml")
+    with open(_file, "rb") as f:
+        content = f.read()
+
+    from_path = list(convert.iter_geoxml(_file))
+    assert len(from_path) == 371
+    assert from_path[0] == convert.GeoArea("100", "臺北市中正區", 121.5198839, 25.03240487, "")
+    assert list(convert.iter_geoxml(content)) == from_path
+    assert list(convert.iter_geoxml(io.BytesIO(content))) == from_path
+
+    with_url = next(convert.iter_geoxml(content, with_tgos_url=True))
+    assert with_url.tgos_url.endswith("&SHOW_BACK_BUTTON=false")
+
+
+def test_fetch_geoxml_handles_malformed_xml(tmp_path):
+    _file = tmp_path / "broken.xml"
+    _file.write_text("<?xml version='1.0'?><dataroot><a>", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        convert.fetch_geoxml(str(_file))
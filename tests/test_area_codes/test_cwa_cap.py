@@ -0,0 +1,70 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import pytest
+from src.area_codes.cwa_cap import CwaCAP
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+
+
+@pytest.fixture(scope="module")
+def area_codes():
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def cap(area_codes):
+    return CwaCAP(area_codes)
+
+
+def _naive(area_codes, geocodes):
+    zip_codes, geo_codes = set(), set()
+    for geocode in geocodes:
+        for area in area_codes.values():
+            if geocode in (area["geo_code_103"], area["county_geo_code_103"]) and area["geo_code_103"]:
+                zip_codes.add(area["zip_code"])
+                geo_codes.add(area["geo_code_103"])
+    return zip_codes, geo_codes
+
+
+def test_expand_county_lists_all_townships(cap, area_codes):
+    assert cap.expand_county("63") == tuple(a["geo_code_103"] for a in area_codes.values()
+                                            if a["county_geo_code_103"] == "63")
+    assert "6300500" in cap.expand_county("63")
+    assert cap.expand_county("99") == ()
+
+
+def test_resolve_matches_nested_loops(cap, area_codes):
+    for geocodes in (["63"], ["6300500", "6300500"], ["63", "6300500", "10002"],
+                     ["1000201"], sorted({a["county_geo_code_103"] for a in area_codes.values()} - {""})):
+        result = cap.resolve(geocodes)
+        zip_codes, geo_codes = _naive(area_codes, geocodes)
+        assert set(result.zip_codes) == zip_codes
+        assert len(result.zip_codes) == len(zip_codes)
+        assert set(result.geo_codes) == geo_codes
+        assert result.unknown == ()
+
+
+def test_resolve_all_counties_covers_every_coded_area(cap, area_codes):
+    counties = {a["county_geo_code_103"] for a in area_codes.values()} - {""}
+    result = cap.resolve(counties)
+    assert len(result.geo_codes) == sum(1 for a in area_codes.values() if a["geo_code_103"])
+    assert len(cap.get_areas(result)) == len(result.geo_codes)
+
+
+def test_resolve_village_unknown_and_union(cap):
+    village = cap.resolve(["6300500-001"])
+    assert village.geo_codes == ("6300500",)
+
+    result = cap.resolve(["6300500", "9999999", ""])
+    assert result.geo_codes == ("6300500",)
+    assert result.unknown == ("9999999", "")
+
+    alerts = [["6300500"], ["6300600", "bad"], ["6300500", "bad"]]
+    union = cap.resolve_union(alerts)
+    assert union.geo_codes == ("6300500", "6300600")
+    assert union.unknown == ("bad",)
+    assert [r.geo_codes for r in cap.resolve_batch(alerts)] == [("6300500",), ("6300600",), ("6300500",)]
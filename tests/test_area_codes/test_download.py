@@ -0,0 +1,115 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.area_codes import convert
+from src.area_codes.download import fetch_sources
+
+FIXTURES = os.path.dirname(__file__)
+
+
+class StandInServer:
+    """
+    模擬來源網站的本機 HTTP 伺服器，支援 ETag / If-None-Match
+    """
+
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+        self.requests: list[tuple[str, int]] = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                content = stand_in.files.get(self.path)
+                etag = f'"{hashlib.md5(content).hexdigest()}"' if content is not None else ""
+                if content is None:
+                    status = 404
+                elif self.headers.get("If-None-Match") == etag:
+                    status = 304
+                else:
+                    status = 200
+                # 回應前記錄，避免用戶端已收到回應但尚未記錄
+                stand_in.requests.append((self.path, status))
+
+                self.send_response(status)
+                if status == 200:
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", f"{len(content)}")
+                self.end_headers()
+                if status == 200:
+                    self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def statuses(self) -> list[int]:
+        return sorted(status for _, status in self.requests)
+
+
+@pytest.fixture
+def server():
+    stand_in = StandInServer()
+    stand_in.thread.start()
+    yield stand_in
+    stand_in.httpd.shutdown()
+    stand_in.httpd.server_close()
+
+
+def test_fetch_sources_revalidates_with_etag(server, tmp_path):
+    server.files["/a.xml"] = b"<?xml version='1.0'?><a/>"
+    url = server.url("/a.xml")
+
+    first = fetch_sources([url], str(tmp_path))[url]
+    assert not first.not_modified
+    with open(first.path, "rb") as f:
+        assert f.read() == server.files["/a.xml"]
+
+    second = fetch_sources([url], str(tmp_path))[url]
+    assert second.not_modified
+    assert second.sha256 == first.sha256
+
+    server.files["/a.xml"] = b"<?xml version='1.0'?><b/>"
+    third = fetch_sources([url], str(tmp_path))[url]
+    assert not third.not_modified
+    assert third.sha256 != first.sha256
+    assert server.statuses() == [200, 200, 304]
+
+
+def test_fetch_sources_keeps_local_paths(tmp_path):
+    _file = os.path.join(FIXTURES, "county_h_10706.xls")
+    result = fetch_sources([_file], str(tmp_path))[_file]
+    assert result.path == _file
+    assert not result.not_modified
+
+
+def test_convert_skips_parsing_when_sources_unchanged(server, tmp_path, monkeypatch):
+    urls = []
+    for path, name in (("/geo.xml", "1050812_行政區經緯度(toPost).xml"),
+                       ("/geocode.xlsx", "行政區代碼表_Taiwan_Geocode.xlsx"),
+                       ("/enname.xls", "county_h_10706.xls")):
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            server.files[path] = f.read()
+        urls.append(server.url(path))
+    out_file = str(tmp_path / "AREA_CODES.json")
+    cache_dir = str(tmp_path / "cache")
+
+    first = convert.convert(*urls, out_file=out_file, cache_dir=cache_dir)
+    assert len(first) == 371
+
+    def fail(*args, **kwargs):
+        raise AssertionError("sources should not be parsed")
+    monkeypatch.setattr(convert, "fetch_geoxml", fail)
+
+    second = convert.convert(*urls, out_file=out_file, cache_dir=cache_dir)
+    assert second == first
+    assert server.statuses() == [200, 200, 200, 304, 304, 304]
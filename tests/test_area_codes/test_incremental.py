@@ -0,0 +1,113 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import pytest
+from src.area_codes import convert
+from src.area_codes.incremental import apply_changeset, changeset_path, diff, stable_key
+
+
+def geo_row(zip_code, name, lng="121.0", lat="25.0"):
+    return {"_x0033_碼郵遞區號": zip_code, "行政區名": name, "中心點經度": lng, "中心點緯度": lat, "TGOS_URL": ""}
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    data = {
+        "geoxml": [geo_row("100", "臺北市中正區"), geo_row("103", "臺北市大同區"), geo_row("290", "宜蘭縣釣魚臺列嶼")],
+        "enname": [["100", "臺北市中正區", "Zhongzheng Dist., Taipei City"],
+                   ["103", "臺北市大同區", "Datong Dist., Taipei City"]],
+        "areacode": {"臺北市中正區": {"geo_code_103": "6300500", "area_name": "中正區"},
+                     "臺北市大同區": {"geo_code_103": "6300600", "area_name": "大同區"}},
+    }
+    monkeypatch.setattr(convert, "fetch_geoxml", lambda path, stage=None: sorted(data["geoxml"],
+                                                                                 key=lambda x: x["_x0033_碼郵遞區號"]))
+    monkeypatch.setattr(convert, "fetch_enname", lambda path, stage=None: data["enname"])
+    monkeypatch.setattr(convert, "fetch_areacode", lambda path, stage=None: data["areacode"])
+    return data
+
+
+def test_stable_key():
+    assert stable_key({"geo_code_103": "6300500", "zip_code": "100", "area_name": "臺北市中正區"}) == "6300500"
+    assert stable_key({"geo_code_103": "", "zip_code": "290", "area_name": "宜蘭縣釣魚臺列嶼"}) == "290:宜蘭縣釣魚臺列嶼"
+
+
+def test_diff_and_apply_keep_serials():
+    previous = {"1": {"zip_code": "100", "area_name": "A", "geo_code_103": "1", "x": 1},
+                "2": {"zip_code": "200", "area_name": "B", "geo_code_103": "2", "x": 1},
+                "3": {"zip_code": "300", "area_name": "C", "geo_code_103": "", "x": 1}}
+    current = {"1": {"zip_code": "100", "area_name": "A", "geo_code_103": "1", "x": 2},
+               "2": {"zip_code": "150", "area_name": "D", "geo_code_103": "4", "x": 1},
+               "3": {"zip_code": "200", "area_name": "B", "geo_code_103": "2", "x": 1}}
+
+    changeset = diff(previous, current)
+    assert changeset.summary() == {"added": 1, "removed": 1, "modified": 1}
+    assert changeset.added["4"]["serial"] == "4"
+    assert changeset.removed["300:C"]["serial"] == "3"
+    assert changeset.modified["1"]["serial"] == "1"
+
+    result = apply_changeset(previous, changeset)
+    assert list(result.keys()) == ["1", "2", "4"]
+    assert result["1"]["x"] == 2
+    assert result["4"]["area_name"] == "D"
+    assert diff(previous, current, names={"A"}).summary() == {"added": 0, "removed": 0, "modified": 1}
+
+
+def test_diff_keeps_serial_when_duplicate_name_appears():
+    a = {"zip_code": "100", "area_name": "A", "geo_code_103": "111"}
+    b = {"zip_code": "200", "area_name": "A", "geo_code_103": "222"}
+    previous = {"5": a}
+    changeset = diff(previous, {"1": a, "2": b}, names={"A"})
+    assert changeset.summary() == {"added": 1, "removed": 0, "modified": 0}
+    assert changeset.added["222"]["serial"] == "6"
+    assert apply_changeset(previous, changeset) == {"5": a, "6": b}
+
+    # 沒有 geo_code_103 的同名行政區以 "郵遞區號:行政區名" 區分
+    c = {"zip_code": "300", "area_name": "C", "geo_code_103": ""}
+    d = {"zip_code": "301", "area_name": "C", "geo_code_103": ""}
+    changeset = diff({"1": c}, {"1": c, "2": d})
+    assert list(changeset.added) == ["301:C"] and not changeset.removed
+    assert apply_changeset({"1": c}, changeset) == {"1": c, "2": d}
+
+
+def test_convert_incremental(sources, tmp_path):
+    out_file = str(tmp_path / "AREA_CODES.json")
+
+    first = convert.convert(out_file=out_file, incremental=True)
+    assert [v["zip_code"] for v in first.values()] == ["100", "103", "290"]
+    assert not os.path.exists(changeset_path(out_file))
+
+    # 沒有變動時不重寫輸出檔
+    os.utime(out_file, (0, 0))
+    assert convert.convert(out_file=out_file, incremental=True) == first
+    assert os.path.getmtime(out_file) == 0
+
+    # 新增的行政區排序在中間，但既有序號不變
+    sources["geoxml"].append(geo_row("104", "臺北市中山區"))
+    sources["enname"][1][2] = "Datong District, Taipei City"
+    result = convert.convert(out_file=out_file, incremental=True)
+    assert result["1"] == first["1"]
+    assert result["2"]["area_name_en"] == "Datong District, Taipei City"
+    assert result["3"] == first["3"]
+    assert result["4"]["area_name"] == "臺北市中山區"
+    with open(out_file, "r", encoding="utf-8") as f:
+        assert json.load(f) == result
+    with open(changeset_path(out_file), "r", encoding="utf-8") as f:
+        changeset = json.load(f)
+    assert list(changeset["added"].keys()) == ["104:臺北市中山區"]
+    assert list(changeset["modified"].keys()) == ["6300600"]
+    assert changeset["removed"] == {}
+
+
+def test_convert_incremental_writes_missing_outputs_when_unchanged(sources, tmp_path):
+    out_file = str(tmp_path / "AREA_CODES.json")
+    first = convert.convert(out_file=out_file, incremental=True)
+
+    outputs = dict(snapshot_file=str(tmp_path / "AREA_CODES.snapshot"), sqlite_file=str(tmp_path / "AREA_CODES.db"),
+                   neighbors_file=str(tmp_path / "AREA_CODES.neighbors.bin"))
+    os.utime(out_file, (0, 0))
+    assert convert.convert(out_file=out_file, incremental=True, **outputs) == first
+    assert os.path.getmtime(out_file) == 0
+    assert all(os.path.exists(path) for path in outputs.values())
+    assert not os.path.exists(changeset_path(out_file))
@@ -0,0 +1,70 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import pytest
+from src.area_codes.lookup_cache import CachedLookup, LRUCache
+from src.area_codes.reverse_geocode import ReverseGeocoder
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+
+
+@pytest.fixture(scope="module")
+def area_codes():
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_lru_counts_hits_misses_and_evictions():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("c") == 3 and len(cache) == 2
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 1, 1)
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+
+def test_cached_lookups_match_uncached(area_codes):
+    lookup = CachedLookup(area_codes, maxsize=64)
+    geocoder = ReverseGeocoder(area_codes)
+
+    hsinchu = lookup.get_by_zip_code("300")
+    assert [r["area_name"] for r in hsinchu] == [a["area_name"] for a in area_codes.values() if a["zip_code"] == "300"]
+    assert lookup.get_by_zip_code("300") is hsinchu
+    assert lookup.get_by_zip_code_json("300") == json.dumps(hsinchu, ensure_ascii=False,
+                                                            separators=(",", ":")).encode("utf-8")
+    assert lookup.get_by_geo_code("6300500") == {"id": 1, **area_codes["1"]}
+    assert lookup.get_by_geo_code("nope") is None and lookup.get_by_geo_code_json("nope") == b"null"
+    assert lookup.get_by_zip_code("000") == []
+
+    rng = np.random.default_rng(0)
+    for lat, lng in zip(rng.uniform(21.9, 25.3, 3000).tolist(), rng.uniform(119.3, 122.0, 3000).tolist()):
+        for _ in range(2):
+            record = lookup.get_data_by_latlng(lat, lng)
+            expected = geocoder.get_data_by_latlng(lat, lng)
+            assert record["zip_code"] == expected["zip_code"] and record["area_name"] == expected["area_name"]
+    assert lookup.get_data_by_latlng(float("nan"), 121.0) is None
+
+    stats = lookup.stats()
+    assert stats["hits"] > 0 and stats["misses"] > 0 and stats["evictions"] > 0
+    assert stats["size"] == 64 and stats["invalidations"] == 0
+
+
+def test_update_invalidates_on_version_change(area_codes):
+    lookup = CachedLookup(area_codes)
+    before = lookup.get_by_geo_code("6300500")
+    version = lookup.version
+    assert not lookup.update(dict(area_codes))
+    assert lookup.get_by_geo_code("6300500") is before
+
+    changed = {**area_codes, "1": {**area_codes["1"], "area_name_en": "Changed"}}
+    assert lookup.update(changed)
+    assert lookup.version != version and lookup.stats()["invalidations"] == 1
+    assert lookup.get_by_geo_code("6300500")["area_name_en"] == "Changed"
+    assert lookup.stats()["size"] == 1 and lookup.stats()["hits"] == 1
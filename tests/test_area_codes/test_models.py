@@ -0,0 +1,56 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import pytest
+from src.area_codes.models import Area, AreaTable, County
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+
+
+@pytest.fixture(scope="module")
+def table():
+    return AreaTable.from_json(AREA_CODES_JSON)
+
+
+def test_to_dict_is_byte_identical(table):
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        expected = f.read()
+    assert json.dumps(table.to_dict(), ensure_ascii=False, indent=4) == expected
+
+
+def test_counties_are_shared(table):
+    taipei = [area for area in table if area.county.name == "臺北市"]
+    assert len(taipei) == 12
+    assert all(area.county is taipei[0].county for area in taipei)
+    assert taipei[0].county == County("63", "臺北市", "Taipei City", "臺北市")
+    assert len(table.counties) < len(table)
+
+
+def test_get_by_serial(table):
+    area = table.get("1")
+    assert isinstance(area, Area)
+    assert area == table.get(1) == table[0]
+    assert area.serial == 1
+    assert area.zip_code == "100"
+    assert area.latitude == 25.03240487
+    assert table.get(0) is None
+    assert table.get("x") is None
+
+
+def test_area_has_no_instance_dict(table):
+    with pytest.raises(AttributeError):
+        table[0].__dict__
+
+
+def test_from_dict_rejects_non_numeric_keys():
+    with pytest.raises(ValueError):
+        AreaTable.from_dict({"a": {}})
+
+
+def test_append_after_load_keeps_serial_lookup():
+    table = AreaTable.from_json(AREA_CODES_JSON)
+    table.append(1000, table[0].to_dict())
+    assert table.get(1000).area_name == "臺北市中正區"
+    assert table.get(371) == table[370]
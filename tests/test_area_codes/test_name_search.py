@@ -0,0 +1,48 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import pytest
+from src.area_codes.name_search import NameIndex, normalize
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+
+
+@pytest.fixture(scope="module")
+def index():
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        return NameIndex(json.load(f))
+
+
+def test_normalize_folds_variants():
+    assert normalize("台北市 中正區") == normalize("臺北市中正區") == "臺北市中正區"
+    assert normalize("Wang’an Township") == normalize("wang-an township") == "wangantownship"
+    assert normalize("Ｚｈｏｎｇｚｈｅｎｇ Dist.") == "zhongzhengdist"
+
+
+def test_prefix_matches_both_scripts_and_romanizations(index):
+    assert [m.area["area_name"] for m in index.prefix("台北市中正區")] == ["臺北市中正區"]
+    assert index.prefix("台北市中正區")[0].score == 1.0
+    assert {m.area["area_name"] for m in index.prefix("Jhongjhen")} == {"臺北市中正區", "基隆市中正區"}
+    assert {m.area["area_name"] for m in index.prefix("Zhongzheng Dist.")} == {"臺北市中正區", "基隆市中正區"}
+    assert all(m.area["county_name"] == "臺北市" for m in index.prefix("台北市", limit=20))
+    assert len(index.prefix("台北市", limit=20)) == 12
+    assert index.prefix("xyz") == []
+    assert index.prefix("") == []
+
+
+def test_fuzzy_ranks_misspellings(index):
+    matches = index.fuzzy("Jhongzheng Dist")
+    assert {m.area["area_name"] for m in matches[:2]} == {"臺北市中正區", "基隆市中正區"}
+    assert matches[0].score > matches[2].score
+
+    assert index.fuzzy("Taipei Zhongzheng")[0].area["area_name"] == "臺北市中正區"
+    assert index.fuzzy("台北中正區")[0].area["area_name"] == "臺北市中正區"
+    assert index.fuzzy("qqqq") == []
+
+
+def test_search_falls_back_to_fuzzy(index):
+    assert index.search("望安")[0].area["area_name"] == "澎湖縣望安鄉"
+    assert index.search("wang-an")[0].area["area_name"] == "澎湖縣望安鄉"
+    assert index.search("台北中正")[0].area["area_name"] == "臺北市中正區"
@@ -0,0 +1,103 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from src.area_codes import convert
+from src.area_codes.neighbors import NeighborIndex, neighbors_path, write_neighbors
+from src.area_codes.reverse_geocode import haversine
+from src.area_codes.writer import content_hash
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+BASE = os.path.dirname(__file__)
+ROOT = os.path.join(BASE, "..", "..")
+SOURCES = [os.path.join(BASE, "1050812_行政區經緯度(toPost).xml"), os.path.join(BASE, "行政區代碼表_Taiwan_Geocode.xlsx"),
+           os.path.join(BASE, "county_h_10706.xls")]
+
+
+@pytest.fixture(scope="module")
+def area_codes():
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def neighbors(area_codes, tmp_path):
+    path = neighbors_path(str(tmp_path / "AREA_CODES.json"))
+    assert path.endswith("AREA_CODES.neighbors.bin")
+    write_neighbors(area_codes, path)
+    with NeighborIndex.open(path, verify=True) as index:
+        yield index
+
+
+def _brute_force(area_codes, sources):
+    result = []
+    for key, area in area_codes.items():
+        if key in sources:
+            continue
+        km = min(haversine(area_codes[s]["latitude"], area_codes[s]["longitude"], area["latitude"], area["longitude"])
+                 for s in sources)
+        result.append((km, key))
+    return sorted(result)
+
+
+def test_k_nearest_and_within_radius_match_haversine(area_codes, neighbors):
+    assert len(neighbors) == 371 and neighbors.version == content_hash(area_codes)
+    assert neighbors.matrix.shape == (371, 371) and neighbors.matrix[0, 0] == 0
+
+    expected = _brute_force(area_codes, ["1"])
+    nearest = neighbors.k_nearest("6300500", k=5)
+    assert [n.key for n in nearest] == [key for _, key in expected[:5]]
+    assert all(abs(n.km - km) < 1e-3 for n, (km, _) in zip(nearest, expected))
+    assert nearest[0].geo_code_103 == area_codes[nearest[0].key]["geo_code_103"]
+
+    within = neighbors.within_radius("6300500", 5.0)
+    assert [n.key for n in within] == [key for km, key in expected if km <= 5.0]
+    assert abs(neighbors.distance("6300500", "100") - 0.0) < 1e-6
+
+
+def test_zip_code_with_several_districts(area_codes, neighbors):
+    sources = [key for key, area in area_codes.items() if area["zip_code"] == "300"]
+    assert len(sources) > 1
+    expected = _brute_force(area_codes, sources)
+    assert [n.key for n in neighbors.k_nearest("300", k=4)] == [key for _, key in expected[:4]]
+    assert [n.key for n in neighbors.within_radius("300", 12.0)] == [key for km, key in expected if km <= 12.0]
+    assert neighbors.within_radius("6300500", 0.0) == []
+
+    with pytest.raises(KeyError):
+        neighbors.k_nearest("nope")
+
+
+def test_rejects_bad_file(tmp_path):
+    path = tmp_path / "bad.bin"
+    path.write_bytes(b"XXXX" + bytes(100))
+    with pytest.raises(ValueError):
+        NeighborIndex.open(str(path))
+
+
+def test_convert_writes_neighbors(tmp_path):
+    path = neighbors_path(str(tmp_path / "AREA_CODES.json"))
+    geoxml_path, areacode_path, enname_path = SOURCES
+    result = convert.convert(geoxml_path=geoxml_path, areacode_path=areacode_path, enname_path=enname_path,
+                             out_file=str(tmp_path / "AREA_CODES.json"), neighbors_file=path)
+    with NeighborIndex.open(path, verify=True) as index:
+        assert len(index) == len(result) and index.version == content_hash(result)
+
+
+def test_cli_writes_neighbors_next_to_output(tmp_path):
+    out_file = str(tmp_path / "AREA_CODES.json")
+    geoxml_path, areacode_path, enname_path = SOURCES
+    subprocess.run([sys.executable, os.path.join(ROOT, "src", "area_codes", "convert.py"), "-g", geoxml_path,
+                    "-a", areacode_path, "-e", enname_path, "-o", out_file, "-n"], check=True, capture_output=True)
+    with NeighborIndex.open(str(tmp_path / "AREA_CODES.neighbors.bin"), verify=True) as index:
+        with open(out_file, "r", encoding="utf-8") as f:
+            assert index.version == content_hash(json.load(f))
+
+
+def test_convert_imports_numpy_lazily():
+    code = "import sys, src.area_codes.convert; assert 'numpy' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
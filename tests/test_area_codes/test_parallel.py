@@ -0,0 +1,38 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+from src.area_codes import convert
+from src.area_codes.parallel import pack, parallel_fetch, unpack
+from src.area_codes.profiling import PipelineStats
+
+BASE = os.path.dirname(__file__)
+GEOXML = os.path.join(BASE, "1050812_行政區經緯度(toPost).xml")
+AREACODE = os.path.join(BASE, "行政區代碼表_Taiwan_Geocode.xlsx")
+ENNAME = os.path.join(BASE, "county_h_10706.xls")
+
+
+def test_pack_round_trip():
+    geoxml = [{"行政區名": "A", "_x0033_碼郵遞區號": "100"}, {"行政區名": "B", "TGOS_URL": ""}]
+    enname = [["100", "A", "A Dist."]]
+    areacode = {"A": {"geo_code_103": "6300500", "area_name": "A"}}
+    for source, parsed in (("geoxml", geoxml), ("enname", enname), ("areacode", areacode)):
+        assert unpack(source, pack(source, parsed)) == parsed
+
+
+def test_parallel_convert_matches_serial(tmp_path):
+    serial = convert.convert(geoxml_path=GEOXML, areacode_path=AREACODE, enname_path=ENNAME, write_file=False)
+    stats = PipelineStats()
+    out_file = str(tmp_path / "AREA_CODES.json")
+    result = convert.convert(geoxml_path=GEOXML, areacode_path=AREACODE, enname_path=ENNAME,
+                             out_file=out_file, stats=stats, parallel=True)
+    assert json.dumps(result, ensure_ascii=False) == json.dumps(serial, ensure_ascii=False)
+    assert [stage.name for stage in stats.stages] == ["parallel", "write"]
+    assert stats["parallel"].rows == 371 and stats["parallel"].bytes_read > 0
+
+    area_list, enname_list, geo_code_103, merged = parallel_fetch(GEOXML, ENNAME, AREACODE, merge=False)
+    assert merged is None
+    assert area_list == convert.fetch_geoxml(GEOXML)
+    assert geo_code_103 == convert.fetch_areacode(AREACODE)
+    assert convert.merge(area_list, enname_list, geo_code_103)[0] == serial
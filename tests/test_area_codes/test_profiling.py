@@ -0,0 +1,44 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import io
+import os
+import pytest
+from src.area_codes import convert
+from src.area_codes.profiling import CountingReader, PipelineStats
+
+BASE = os.path.dirname(__file__)
+GEOXML = os.path.join(BASE, "1050812_行政區經緯度(toPost).xml")
+AREACODE = os.path.join(BASE, "行政區代碼表_Taiwan_Geocode.xlsx")
+ENNAME = os.path.join(BASE, "county_h_10706.xls")
+
+
+def test_convert_records_every_stage(tmp_path):
+    stats = PipelineStats(trace_memory=True)
+    result = convert.convert(geoxml_path=GEOXML, areacode_path=AREACODE, enname_path=ENNAME,
+                             out_file=str(tmp_path / "AREA_CODES.json"), stats=stats)
+
+    assert [s.name for s in stats.stages] == ["fetch_geoxml", "fetch_enname", "fetch_areacode", "merge", "write"]
+    assert stats["fetch_geoxml"].bytes_read == os.path.getsize(GEOXML)
+    assert stats["fetch_areacode"].bytes_read == os.path.getsize(AREACODE)
+    assert stats["fetch_enname"].rows == 371
+    assert stats["merge"].rows == stats["write"].rows == len(result)
+    assert all(s.wall_time > 0 and s.peak_memory is not None and s.bytes_downloaded == 0 for s in stats.stages)
+    assert stats.total_time == pytest.approx(sum(s.wall_time for s in stats.stages))
+
+    table = stats.table()
+    assert "fetch_areacode" in table and "total" in table
+    assert stats.to_dict()["stages"][0]["name"] == "fetch_geoxml"
+
+
+def test_stage_without_memory_tracing_and_counting_reader():
+    stats = PipelineStats()
+    with stats.stage("download") as stage:
+        reader = CountingReader(io.BytesIO(b"x" * 100), stage)
+        assert reader.read(30) == b"x" * 30
+        reader.read()
+    assert stage.bytes_downloaded == 100
+    assert stage.peak_memory is None
+    assert "download" in stats and "merge" not in stats
+    with pytest.raises(KeyError):
+        stats["merge"]
@@ -0,0 +1,58 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import os
+import numpy as np
+import pytest
+from src.area_codes.reverse_geocode import ReverseGeocoder, haversine
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+
+
+@pytest.fixture(scope="module")
+def geocoder():
+    return ReverseGeocoder.from_json(AREA_CODES_JSON)
+
+
+def brute_force(geocoder, lat, lng):
+    return min(range(len(geocoder)),
+               key=lambda i: haversine(lat, lng, geocoder.latitudes[i], geocoder.longitudes[i]))
+
+
+def test_get_data_by_latlng_on_centroid(geocoder):
+    area = geocoder.get_data_by_latlng(25.03240487, 121.5198839)
+    assert area["area_name"] == "臺北市中正區"
+    assert geocoder.get_data_by_latlng(float("nan"), 121.0) is None
+
+
+def test_nearest_k_is_sorted(geocoder):
+    result = geocoder.nearest_k(25.03240487, 121.5198839, k=4)
+    assert len(result) == 4
+    assert result[0][0]["area_name"] == "臺北市中正區"
+    assert [km for _, km in result] == sorted(km for _, km in result)
+
+
+def test_query_matches_brute_force(geocoder):
+    rng = np.random.default_rng(0)
+    # 含網格外的點 (例如南海、太平洋)
+    lat = rng.uniform(5.0, 30.0, 2000)
+    lng = rng.uniform(112.0, 126.0, 2000)
+    indices, km = geocoder.query(lat, lng)
+    expected = [brute_force(geocoder, a, b) for a, b in zip(lat, lng)]
+    assert indices.tolist() == expected
+    assert np.allclose(km, [haversine(a, b, geocoder.latitudes[i], geocoder.longitudes[i])
+                            for a, b, i in zip(lat, lng, expected)])
+    single = [geocoder.nearest(a, b)[0] for a, b in zip(lat[:200], lng[:200])]
+    assert single == expected[:200]
+
+
+def test_query_k_matches_query(geocoder):
+    rng = np.random.default_rng(1)
+    lat = np.append(rng.uniform(21.8, 25.4, 500), np.nan)
+    lng = np.append(rng.uniform(119.3, 122.1, 500), 121.0)
+    indices, km = geocoder.query_k(lat, lng, k=3)
+    nearest, _ = geocoder.query(lat, lng)
+    assert indices.shape == (501, 3)
+    assert (indices[:, 0] == nearest).all()
+    assert (indices[-1] == -1).all()
+    assert (np.diff(km[:-1], axis=1) >= 0).all()
@@ -0,0 +1,151 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import gzip
+import http.client
+import json
+import os
+import shutil
+from src.area_codes.server import AreaServer
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+
+
+def _get(port: int, path: str, headers: dict | None = None) -> tuple[int, dict, bytes]:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, {k.lower(): v for k, v in response.getheaders()}, response.read()
+    finally:
+        connection.close()
+
+
+def _run(file_path: str, scenario, reload_interval: float = 0) -> None:
+    async def main():
+        server = AreaServer(file_path, port=0, reload_interval=reload_interval)
+        await server.start()
+        try:
+            await scenario(server, lambda *args: asyncio.get_running_loop().run_in_executor(None, _get, *args))
+        finally:
+            await server.close()
+
+    asyncio.run(main())
+
+
+def test_server_routes_match_area_codes_json():
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+
+    async def scenario(server, get):
+        status, _, body = await get(server.port, "/allareas")
+        assert status == 200
+        all_areas = json.loads(body)
+        assert len(all_areas) == len(area_codes)
+        assert all_areas[0] == {"id": 1, **area_codes["1"]}
+
+        status, _, body = await get(server.port, "/get_data_by_zip_code/300")
+        assert status == 200
+        assert sorted(a["id"] for a in json.loads(body)) == sorted(
+            int(k) for k, v in area_codes.items() if v["zip_code"] == "300")
+
+        status, _, body = await get(server.port, "/get_geo_103_by_zip_code/100")
+        assert status == 200
+        assert json.loads(body) == [{"id": 1, "zip_code": "100", "area_name": "臺北市中正區",
+                                     "geo_code_103": "6300500"}]
+
+        status, _, body = await get(server.port, "/get_data_by_latlng/25.0324/121.5198")
+        assert status == 200
+        assert json.loads(body)[0]["area_name"] == "臺北市中正區"
+
+        assert (await get(server.port, "/get_data_by_zip_code/999"))[0] == 404
+        assert (await get(server.port, "/get_data_by_latlng/abc/121"))[0] == 400
+        assert (await get(server.port, "/get_data_by_latlng/95/121"))[0] == 400
+        assert (await get(server.port, "/unknown"))[0] == 404
+
+    _run(AREA_CODES_JSON, scenario)
+
+
+def test_server_etag_and_gzip():
+    async def scenario(server, get):
+        status, headers, body = await get(server.port, "/allareas")
+        etag = headers["etag"]
+
+        status, headers, not_modified = await get(server.port, "/allareas", {"If-None-Match": etag})
+        assert status == 304
+        assert not_modified == b""
+
+        status, headers, compressed = await get(server.port, "/allareas", {"Accept-Encoding": "gzip"})
+        assert status == 200
+        assert headers["content-encoding"] == "gzip"
+        assert gzip.decompress(compressed) == body
+        assert len(compressed) < len(body)
+
+    _run(AREA_CODES_JSON, scenario)
+
+
+def test_server_reloads_changed_file_and_keeps_old_data_on_error(tmp_path):
+    path = str(tmp_path / "AREA_CODES.json")
+    shutil.copy(AREA_CODES_JSON, path)
+
+    async def scenario(server, get):
+        assert not await server.reload()
+        _, headers, _ = await get(server.port, "/get_data_by_zip_code/100")
+        etag = headers["etag"]
+
+        with open(path, "r", encoding="utf-8") as f:
+            area_codes = json.load(f)
+        area_codes["1"]["area_name_en"] = "Changed"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(area_codes, f, ensure_ascii=False)
+        os.utime(path, ns=(1, 1))
+        assert await server.reload()
+
+        status, headers, body = await get(server.port, "/get_data_by_zip_code/100", {"If-None-Match": etag})
+        assert status == 200
+        assert headers["etag"] != etag
+        assert json.loads(body)[0]["area_name_en"] == "Changed"
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{broken")
+        assert not await server.reload()
+        status, _, body = await get(server.port, "/get_data_by_zip_code/100")
+        assert status == 200
+        assert json.loads(body)[0]["area_name_en"] == "Changed"
+
+    _run(path, scenario)
+
+
+def test_server_watch_survives_bad_shape_file(tmp_path):
+    path = str(tmp_path / "AREA_CODES.json")
+    shutil.copy(AREA_CODES_JSON, path)
+    with open(path, "r", encoding="utf-8") as f:
+        area_codes = json.load(f)
+
+    async def wait_for(predicate) -> None:
+        for _ in range(100):
+            if predicate():
+                return
+            await asyncio.sleep(0.02)
+        raise AssertionError("timeout")
+
+    async def scenario(server, get):
+        version = server.dataset.version
+        for i, bad in enumerate(([], {"1": "x"}, {"1": {"zip_code": "100"}}), start=1):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(bad, f)
+            os.utime(path, ns=(i, i))
+            assert not await server.reload()
+            assert server.dataset.version == version
+
+        area_codes["1"]["area_name_en"] = "Changed"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(area_codes, f, ensure_ascii=False)
+        os.utime(path, ns=(10, 10))
+        await wait_for(lambda: server.dataset.version != version)
+        assert not server._watcher.done()
+        _, _, body = await get(server.port, "/get_data_by_zip_code/100")
+        assert json.loads(body)[0]["area_name_en"] == "Changed"
+
+    _run(path, scenario, reload_interval=0.01)
@@ -0,0 +1,69 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import pytest
+from src.area_codes.snapshot import Snapshot, json_to_snapshot, write_snapshot
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+
+
+@pytest.fixture(scope="module")
+def area_codes():
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_snapshot_round_trip_is_identical_to_json(area_codes, tmp_path):
+    path = str(tmp_path / "AREA_CODES.bin")
+    content_hash = json_to_snapshot(AREA_CODES_JSON, path)
+
+    with Snapshot.open(path, verify=True) as snapshot:
+        assert snapshot.content_hash == content_hash
+        assert len(snapshot) == len(area_codes)
+        assert snapshot.to_dict() == area_codes
+        with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+            assert json.dumps(snapshot.to_dict(), ensure_ascii=False, indent=4) == f.read()
+
+
+def test_snapshot_lookup_and_columns(area_codes, tmp_path):
+    path = str(tmp_path / "AREA_CODES.bin")
+    write_snapshot(area_codes, path)
+
+    with Snapshot.open(path) as snapshot:
+        assert snapshot["1"] == area_codes["1"]
+        assert snapshot.get(371) == area_codes["371"]
+        assert snapshot.get("0") is None
+        assert "2" in snapshot
+        assert list(snapshot.keys()) == list(area_codes.keys())
+        assert snapshot.column("zip_code") == [a["zip_code"] for a in area_codes.values()]
+        latitudes = snapshot.float_column("latitude")
+        assert latitudes[0] == area_codes["1"]["latitude"]
+        latitudes.release()
+        with pytest.raises(TypeError):
+            snapshot.float_column("zip_code")
+
+
+def test_snapshot_rejects_corrupt_files(area_codes, tmp_path):
+    path = tmp_path / "AREA_CODES.bin"
+    write_snapshot(area_codes, str(path))
+    content = bytearray(path.read_bytes())
+    content[-1] ^= 0xFF
+    path.write_bytes(bytes(content))
+    with pytest.raises(ValueError):
+        Snapshot.open(str(path), verify=True)
+
+    path.write_bytes(b"NOPE" + bytes(content[4:]))
+    with pytest.raises(ValueError):
+        Snapshot.open(str(path))
+
+
+def test_snapshot_with_non_sequential_keys(tmp_path):
+    area_codes = {"6300500": {"zip_code": "100", "latitude": 25.0}, "6300600": {"zip_code": "103", "latitude": 25.1}}
+    path = str(tmp_path / "AREA_CODES.bin")
+    write_snapshot(area_codes, path)
+    with Snapshot.open(path) as snapshot:
+        assert snapshot["6300600"] == {"zip_code": "103", "latitude": 25.1}
+        assert snapshot.get("2") is None
+        assert snapshot.to_dict() == area_codes
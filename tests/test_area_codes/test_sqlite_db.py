@@ -0,0 +1,74 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import pytest
+from src.area_codes import convert
+from src.area_codes.area_index import AreaIndex
+from src.area_codes.sqlite_db import AreaDatabase, write_sqlite
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+BASE = os.path.dirname(__file__)
+
+
+@pytest.fixture(scope="module")
+def area_codes():
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def db(area_codes, tmp_path):
+    path = str(tmp_path / "AREA_CODES.sqlite")
+    write_sqlite(area_codes, path)
+    with AreaDatabase(path) as db:
+        yield db
+
+
+def test_round_trip_and_lookups_match_area_index(db, area_codes):
+    assert db.get_all() == area_codes
+    assert len(db) == len(area_codes)
+
+    index = AreaIndex(area_codes)
+    assert db.get_by_zip_code("300") == index.get_by_zip_code("300")
+    assert db.get_by_geo_code("6300500") == index.get_by_geo_code("6300500")
+    assert db.get_by_geo_code("") is None
+    assert db.get_by_county_geo_code("63") == index.get_by_county_geo_code("63")
+    assert db.get_by_name("臺北市中正區") == index.get_by_name("臺北市中正區")
+    assert db.get_by_name("Zhongzheng Dist., Taipei City")["geo_code_103"] == "6300500"
+    assert db.get_by_id("1") == area_codes["1"]
+    assert db.get_by_id(9999) is None
+    # 沒有縣市的行政區 (釣魚臺列嶼等) 也完整保留
+    assert db.get_by_zip_code("290")[0]["county_geo_code_103"] == ""
+
+    assert db.query("SELECT count(*) FROM county")[0][0] == 22
+    assert db.query("PRAGMA journal_mode")[0][0] == "wal"
+
+
+def test_within_bbox(db, area_codes):
+    box = (24.9, 121.4, 25.2, 121.7)
+    expected = [area for area in area_codes.values()
+                if box[0] <= area["latitude"] <= box[2] and box[1] <= area["longitude"] <= box[3]]
+    assert db.within_bbox(*box) == expected and expected
+    plan = " ".join(row[-1] for row in db.query("EXPLAIN QUERY PLAN SELECT id FROM district_rtree "
+                                                  "WHERE max_lng >= 121.4 AND min_lng <= 121.7"))
+    assert "VIRTUAL TABLE INDEX" in plan
+
+
+def test_connection_is_read_only(db):
+    with pytest.raises(sqlite3.OperationalError):
+        db.query("DELETE FROM district")
+    with pytest.raises(FileNotFoundError):
+        AreaDatabase(os.path.join(BASE, "missing.sqlite"))
+
+
+def test_convert_writes_sqlite(tmp_path):
+    path = str(tmp_path / "AREA_CODES.sqlite")
+    result = convert.convert(geoxml_path=os.path.join(BASE, "1050812_行政區經緯度(toPost).xml"),
+                             areacode_path=os.path.join(BASE, "行政區代碼表_Taiwan_Geocode.xlsx"),
+                             enname_path=os.path.join(BASE, "county_h_10706.xls"),
+                             out_file=str(tmp_path / "AREA_CODES.json"), sqlite_file=path)
+    with AreaDatabase(path) as db:
+        assert db.get_all() == result
@@ -0,0 +1,100 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import pytest
+from src.area_codes import convert
+from src.area_codes.vintage import VintageStore, parse_date
+
+BASE = os.path.dirname(__file__)
+GEOXML = os.path.join(BASE, "1050812_行政區經緯度(toPost).xml")
+AREACODE = os.path.join(BASE, "行政區代碼表_Taiwan_Geocode.xlsx")
+ENNAME = os.path.join(BASE, "county_h_10706.xls")
+
+
+def area(zip_code, name, geo_code, lng="121.0"):
+    return {"zip_code": zip_code, "area_name": name, "geo_code_103": geo_code, "longitude": lng}
+
+
+def test_parse_date():
+    assert parse_date("1050812") == "2016-08-12"
+    assert parse_date("2018-07-06") == "2018-07-06"
+    assert parse_date(datetime.date(2018, 7, 6)) == "2018-07-06"
+    with pytest.raises(ValueError):
+        parse_date("2018/07/06")
+
+
+def test_point_in_time_lookup_and_dedup(tmp_path):
+    store = VintageStore()
+    assert store.add_vintage({"1": area("100", "A", "1"), "2": area("200", "B", "2"), "3": area("300", "C", "")},
+                             "2016-08-12") == {"added": 3, "removed": 0, "modified": 0, "unchanged": 0}
+    # B 改郵遞區號、C 刪除、D 新增
+    assert store.add_vintage({"1": area("100", "A", "1"), "2": area("201", "B", "2"), "3": area("400", "D", "4")},
+                             "2018-07-06") == {"added": 1, "removed": 1, "modified": 1, "unchanged": 1}
+    # 未變動的 A 只存一份，區間延續
+    assert len(store.records) == 5
+    assert store.intervals["1"] == [["2016-08-12", None, store.intervals["1"][0][2]]]
+
+    assert store.get_by_zip_code("100", "2015-01-01") == []
+    assert store.get_by_zip_code("200", "2017-01-01") == [area("200", "B", "2")]
+    assert store.get_by_zip_code("200", "2018-07-06") == []
+    assert store.get_by_zip_code("201", "1070706") == [area("201", "B", "2")]
+    assert store.get_by_geo_code("2", "2030-01-01") == area("201", "B", "2")
+    assert store.get("300:C", "2018-07-05") == area("300", "C", "")
+    assert store.get("300:C", "2018-07-06") is None
+    assert store.get_by_geo_code("", "2018-07-06") is None
+    assert dict(store.iter_as_of("2017-01-01")).keys() == {"1", "2", "300:C"}
+    assert [(start, end) for start, end, _ in store.history("2")] == [("2016-08-12", "2018-07-06"),
+                                                                      ("2018-07-06", None)]
+
+    path = str(tmp_path / "vintages.json")
+    store.save(path)
+    loaded = VintageStore.from_json(path)
+    assert loaded.dates == ["2016-08-12", "2018-07-06"]
+    assert loaded.get_by_zip_code("200", "2017-01-01") == [area("200", "B", "2")]
+
+
+def test_backfill_and_replace_vintage():
+    store = VintageStore()
+    store.add_vintage({"1": area("100", "A", "1")}, "2016-01-01")
+    store.add_vintage({"1": area("100", "A", "1", lng="122.0")}, "2020-01-01")
+    # 回補中間的 vintage：2018 起經度已改變
+    store.add_vintage({"1": area("100", "A", "1", lng="122.0")}, "2018-01-01")
+    assert [(start, end) for start, end, _ in store.history("1")] == [("2016-01-01", "2018-01-01"),
+                                                                      ("2018-01-01", None)]
+    assert store.get("1", "2019-01-01")["longitude"] == "122.0"
+
+    # 取代 2016 的 vintage 後，舊資料不再被引用而移除
+    store.add_vintage({"1": area("100", "A", "1", lng="122.0")}, "2016-01-01")
+    assert [(start, end) for start, end, _ in store.history("1")] == [("2016-01-01", None)]
+    assert len(store.records) == 1 and len(store) == 3
+
+
+def test_convert_records_vintage(tmp_path):
+    path = str(tmp_path / "AREA_CODES.vintages.json")
+    result = convert.convert(geoxml_path=GEOXML, areacode_path=AREACODE, enname_path=ENNAME,
+                             out_file=str(tmp_path / "AREA_CODES.json"), vintage_store=path, vintage_date="1070706")
+    convert.convert(geoxml_path=GEOXML, areacode_path=AREACODE, enname_path=ENNAME,
+                    out_file=str(tmp_path / "AREA_CODES.json"), vintage_store=path, vintage_date="2020-01-01")
+
+    store = VintageStore.from_json(path)
+    assert store.dates == ["2018-07-06", "2020-01-01"]
+    assert len(store.records) == len(result)
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f)["vintages"][0]["sources"]["enname"] == "county_h_10706.xls"
+    assert store.get_by_geo_code("6300500", "2019-01-01") == result["1"]
+
+
+def test_convert_records_vintage_when_sources_unchanged(tmp_path):
+    path = str(tmp_path / "AREA_CODES.vintages.json")
+    kwargs = dict(geoxml_path=GEOXML, areacode_path=AREACODE, enname_path=ENNAME,
+                  out_file=str(tmp_path / "AREA_CODES.json"), cache_dir=str(tmp_path / "cache"))
+    result = convert.convert(**kwargs)
+    assert convert.convert(**kwargs, vintage_store=path, vintage_date="1070706") == result
+    convert.convert(**kwargs, vintage_store=path, vintage_date="1070706")
+
+    store = VintageStore.from_json(path)
+    assert store.dates == ["2018-07-06"]
+    assert store.get_by_geo_code("6300500", "2019-01-01") == result["1"]
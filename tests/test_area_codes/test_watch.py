@@ -0,0 +1,86 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import shutil
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+import pytest
+from src.area_codes.watch import Watcher
+
+BASE = os.path.dirname(__file__)
+SOURCES = ("1050812_行政區經緯度(toPost).xml", "行政區代碼表_Taiwan_Geocode.xlsx", "county_h_10706.xls")
+
+
+@pytest.fixture
+def sources(tmp_path):
+    for name in SOURCES:
+        shutil.copy(os.path.join(BASE, name), tmp_path / name)
+    return tmp_path
+
+
+def _touch_geoxml(directory, mtime_offset: int = 10) -> None:
+    path = directory / SOURCES[0]
+    content = path.read_text(encoding="utf-8")
+    path.write_text(content.replace("121.5198839", "121.5198840", 1), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime + mtime_offset, stat.st_mtime + mtime_offset))
+
+
+def test_watch_local_files_publishes_only_on_change(sources, tmp_path):
+    out_file = str(tmp_path / "AREA_CODES.json")
+    published = []
+    with Watcher(*(str(sources / name) for name in SOURCES), out_file=out_file, interval=0.01) as watcher:
+        watcher.subscribe(published.append)
+        first = watcher.check()
+        assert first is not None and watcher.current is first and len(first.area_codes) == 371
+        assert os.path.exists(out_file)
+        with pytest.raises(TypeError):
+            first.area_codes["1"]["zip_code"] = "000"
+
+        assert watcher.check() is None
+        os.utime(sources / SOURCES[1])  # mtime 改變但內容相同
+        assert watcher.check() is None
+
+        _touch_geoxml(sources)
+        second = watcher.check()
+        assert second is not None and second.version != first.version
+        assert second.area_codes["1"]["longitude"] == 121.519884
+        assert first.area_codes["1"]["longitude"] == 121.5198839
+        assert published == [first, second]
+
+        os.remove(sources / SOURCES[2])
+        assert watcher.check() is None and watcher.current is second
+
+
+def test_watch_http_sources_and_async_updates(sources, tmp_path):
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(sources))
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_port}/{quote(name)}" for name in SOURCES]
+
+    async def consume(watcher):
+        versions = []
+        async for version in watcher.updates():
+            versions.append(version)
+            if len(versions) == 1:
+                _touch_geoxml(sources)
+            else:
+                return versions
+
+    try:
+        with Watcher(*urls, interval=0.05, cache_dir=str(tmp_path / "cache")) as watcher:
+            first = watcher.check()
+            assert first is not None and watcher.check() is None
+            watcher.start()
+            versions = asyncio.run(asyncio.wait_for(consume(watcher), timeout=30))
+            assert versions[0] is first and versions[1].version != first.version
+            assert versions[1].to_dict()["1"]["longitude"] == 121.519884
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,102 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import json
+import os
+import pytest
+from src.area_codes import convert
+from src.area_codes.writer import FORMATS, content_hash, iter_ndjson, load_output, write_output
+
+AREA_CODES_JSON = os.path.join(os.path.dirname(__file__), "..", "..", "AREA_CODES.json")
+BASE = os.path.dirname(__file__)
+
+
+@pytest.fixture(scope="module")
+def area_codes():
+    with open(AREA_CODES_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_round_trip_and_skip_unchanged(area_codes, tmp_path, output_format):
+    path = str(tmp_path / ("AREA_CODES.ndjson" if output_format == "ndjson" else "AREA_CODES.json"))
+    sha256, written = write_output(area_codes, path, output_format)
+    assert written
+    assert load_output(path) == area_codes
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+    mtime = os.stat(path).st_mtime_ns
+    assert write_output(area_codes, path, output_format) == (sha256, False)
+    assert os.stat(path).st_mtime_ns == mtime
+
+    changed = {**area_codes, "1": {**area_codes["1"], "zip_code": "999"}}
+    assert write_output(changed, path, output_format)[1]
+    assert load_output(path)["1"]["zip_code"] == "999"
+
+
+def test_pretty_matches_json_dump_and_canonical_is_stable(area_codes, tmp_path):
+    path = str(tmp_path / "pretty.json")
+    write_output(area_codes, path)
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == json.dumps(area_codes, ensure_ascii=False, indent=4)
+
+    # dict 順序與欄位順序不同，canonical 輸出與 content_hash 仍相同
+    shuffled = {key: dict(reversed(list(area.items()))) for key, area in reversed(list(area_codes.items()))}
+    first = write_output(area_codes, str(tmp_path / "a.json"), "canonical")[0]
+    second = write_output(shuffled, str(tmp_path / "b.json"), "canonical")[0]
+    assert first == second == content_hash(area_codes) == content_hash(shuffled)
+    with open(tmp_path / "a.json", "r", encoding="utf-8") as f:
+        assert list(json.load(f))[:3] == ["1", "2", "3"]
+
+    write_output(area_codes, str(tmp_path / "c.ndjson"), "ndjson")
+    key, area = next(iter_ndjson(str(tmp_path / "c.ndjson")))
+    assert (key, area) == ("1", area_codes["1"])
+
+    with pytest.raises(ValueError):
+        write_output(area_codes, str(tmp_path / "d.json"), "yaml")
+
+
+def test_convert_output_format(tmp_path):
+    out_file = str(tmp_path / "AREA_CODES.ndjson")
+    result = convert.convert(geoxml_path=os.path.join(BASE, "1050812_行政區經緯度(toPost).xml"),
+                             areacode_path=os.path.join(BASE, "行政區代碼表_Taiwan_Geocode.xlsx"),
+                             enname_path=os.path.join(BASE, "county_h_10706.xls"),
+                             out_file=out_file, output_format="ndjson")
+    with open(out_file, "r", encoding="utf-8") as f:
+        assert sum(1 for _ in f) == len(result)
+    assert load_output(out_file) == result
+
+
+def test_convert_ndjson_with_json_extension(tmp_path):
+    paths = dict(geoxml_path=os.path.join(BASE, "1050812_行政區經緯度(toPost).xml"),
+                 areacode_path=os.path.join(BASE, "行政區代碼表_Taiwan_Geocode.xlsx"),
+                 enname_path=os.path.join(BASE, "county_h_10706.xls"))
+    out_file = str(tmp_path / "AREA_CODES.json")
+    cache_dir = str(tmp_path / "cache")
+    first = convert.convert(**paths, out_file=out_file, cache_dir=cache_dir, output_format="ndjson")
+    assert load_output(out_file, "ndjson") == first
+    # 來源未變更，讀回 NDJSON 輸出
+    assert convert.convert(**paths, out_file=out_file, cache_dir=cache_dir, output_format="ndjson") == first
+
+    # 增量更新沿用上一次輸出的序號，不重新編號
+    assert convert.convert(**paths, out_file=out_file, incremental=True, output_format="ndjson") == first
+    shifted = {str(int(key) + 1000): area for key, area in first.items()}
+    write_output(shifted, out_file, "ndjson")
+    assert convert.convert(**paths, out_file=out_file, incremental=True, output_format="ndjson") == shifted
+    assert load_output(out_file, "ndjson") == shifted
+
+
+def test_convert_rewrites_output_when_format_changes(tmp_path):
+    paths = dict(geoxml_path=os.path.join(BASE, "1050812_行政區經緯度(toPost).xml"),
+                 areacode_path=os.path.join(BASE, "行政區代碼表_Taiwan_Geocode.xlsx"),
+                 enname_path=os.path.join(BASE, "county_h_10706.xls"))
+    out_file = str(tmp_path / "AREA_CODES.json")
+    cache_dir = str(tmp_path / "cache")
+    first = convert.convert(**paths, out_file=out_file, cache_dir=cache_dir, output_format="pretty")
+    with open(out_file, "r", encoding="utf-8") as f:
+        assert f.read().startswith('{\n    "1": {\n')
+
+    # 來源未變更但輸出格式不同，仍需重新輸出
+    assert convert.convert(**paths, out_file=out_file, cache_dir=cache_dir, output_format="compact") == first
+    with open(out_file, "r", encoding="utf-8") as f:
+        assert f.read().startswith('{"1":{')
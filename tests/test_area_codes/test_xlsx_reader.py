@@ -0,0 +1,54 @@
+# -*- coding:utf-8 -*-
+from __future__ import annotations
+
+import io
+import os
+import pytest
+from openpyxl import Workbook, load_workbook
+from src.area_codes.xlsx_reader import XlsxReader, column_index
+
+GEOCODE_XLSX = os.path.join(os.path.dirname(__file__), "行政區代碼表_Taiwan_Geocode.xlsx")
+
+
+@pytest.fixture(scope="module")
+def openpyxl_workbook():
+    return load_workbook(GEOCODE_XLSX)
+
+
+def test_column_index():
+    assert column_index("A1") == 1
+    assert column_index("I20") == 9
+    assert column_index("AH369") == 34
+
+
+@pytest.mark.parametrize("sheet_name, min_col, max_col", [("縣市", 6, 9), ("鄉鎮", 5, 9)])
+def test_iter_rows_matches_openpyxl(openpyxl_workbook, sheet_name, min_col, max_col):
+    sheet = openpyxl_workbook[sheet_name]
+    expected = list(sheet.iter_rows(min_row=2, max_row=sheet.max_row, min_col=min_col, max_col=max_col,
+                                    values_only=True))
+    with XlsxReader(GEOCODE_XLSX) as workbook:
+        assert list(workbook.iter_rows(sheet_name, min_row=2, min_col=min_col, max_col=max_col)) == expected
+
+
+def test_iter_rows_types_and_gaps():
+    wb = Workbook()
+    sheet = wb.active
+    sheet.title = "s"
+    sheet["A1"] = "name"
+    sheet["B1"] = 63
+    sheet["C1"] = 1.5
+    sheet["D1"] = True
+    sheet["B3"] = "臺北市"
+    content = io.BytesIO()
+    wb.save(content)
+
+    with XlsxReader(content) as workbook:
+        assert workbook.sheetnames == ["s"]
+        assert list(workbook.iter_rows("s", max_col=4)) == [
+            ("name", 63, 1.5, True),
+            (None, None, None, None),
+            (None, "臺北市", None, None),
+        ]
+        assert list(workbook.iter_rows("s", min_row=2, max_row=2, min_col=2, max_col=3)) == [(None, None)]
+        with pytest.raises(KeyError):
+            next(workbook.iter_rows("not exists"))